@@ -5,7 +5,7 @@ Provides plan execution, dependency resolution, and rollback capabilities.
 """
 
 from .engine import ExecutionResult, ExecutionStatus, PlanExecutor
-from .planner import DependencyResolver, ExecutionPlan, Phase
+from .planner import DependencyResolver, ExecutionPlan, FileSpec, Phase
 from .snapshot import SnapshotManager, StateSnapshot
 
 __all__ = [
@@ -14,6 +14,7 @@ __all__ = [
     "ExecutionStatus",
     "DependencyResolver",
     "ExecutionPlan",
+    "FileSpec",
     "Phase",
     "StateSnapshot",
     "SnapshotManager",
@@ -1,7 +1,7 @@
 """Command execution engine for template generation."""
 
+import asyncio
 import pathlib
-import subprocess
 from dataclasses import dataclass
 from typing import List, Optional
 
@@ -24,7 +24,7 @@ class CommandExecutor:
         self.working_directory = working_directory or pathlib.Path.cwd()
         self.allowed_commands = {"dotnet", "git", "npm", "yarn", "python", "pip"}
 
-    def execute(self, command: str, args: List[str], cwd: Optional[pathlib.Path] = None) -> CommandResult:
+    async def execute(self, command: str, args: List[str], cwd: Optional[pathlib.Path] = None) -> CommandResult:
         """Execute a command with safety checks."""
         if not self._is_command_allowed(command):
             raise ValueError(f"Command '{command}' is not allowed")
@@ -33,30 +33,34 @@ class CommandExecutor:
         full_command = [command] + args
 
         try:
-            result = subprocess.run(
-                full_command,
-                cwd=cwd,
-                capture_output=True,
-                text=True,
-                timeout=300,  # 5 minute timeout
+            process = await asyncio.create_subprocess_exec(
+                *full_command,
+                cwd=str(cwd),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
             )
 
-            return CommandResult(
-                success=result.returncode == 0,
-                stdout=result.stdout,
-                stderr=result.stderr,
-                return_code=result.returncode,
-                executed_command=" ".join(full_command),
-            )
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=300)  # 5 minute timeout
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                return CommandResult(
+                    success=False,
+                    stdout="",
+                    stderr="Command timed out after 5 minutes",
+                    return_code=-1,
+                    executed_command=" ".join(full_command),
+                )
 
-        except subprocess.TimeoutExpired:
             return CommandResult(
-                success=False,
-                stdout="",
-                stderr="Command timed out after 5 minutes",
-                return_code=-1,
+                success=process.returncode == 0,
+                stdout=stdout.decode(errors="replace"),
+                stderr=stderr.decode(errors="replace"),
+                return_code=process.returncode,
                 executed_command=" ".join(full_command),
             )
+
         except Exception as e:
             return CommandResult(
                 success=False, stdout="", stderr=str(e), return_code=-1, executed_command=" ".join(full_command)
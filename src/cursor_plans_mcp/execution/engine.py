@@ -2,17 +2,178 @@
 Main execution engine for development plans.
 """
 
+import asyncio
+import logging
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
 
 import yaml
 
-from .planner import DependencyResolver, ExecutionPlan
+from .planner import DependencyResolver, ExecutionPlan, FileSpec
 from .snapshot import SnapshotManager
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+logger = logging.getLogger(__name__)
+
+# Top-level sections every plan file must define
+_REQUIRED_SECTIONS = frozenset({"project", "target_state", "resources", "phases"})
+
+# Maximum number of parsed plans kept by PlanExecutor
+_PLAN_CACHE_SIZE = 32
+
+# File templates keyed by template name
+_TEMPLATES: Dict[str, str] = {
+    "fastapi_main": """from fastapi import FastAPI
+
+app = FastAPI(title="API Service")
+
+@app.get("/")
+async def root():
+    return {"message": "Hello World"}
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8000)
+""",
+    "fastapi_model": """from pydantic import BaseModel
+from typing import Optional
+
+class BaseModel(BaseModel):
+    class Config:
+        from_attributes = True
+""",
+    "requirements": """fastapi>=0.68.0
+uvicorn>=0.15.0
+pydantic>=1.8.0
+""",
+    # .NET Templates
+    "dotnet_program": """using Microsoft.AspNetCore.Builder;
+using Microsoft.Extensions.DependencyInjection;
+using Microsoft.Extensions.Hosting;
+using Microsoft.OpenApi.Models;
+
+var builder = WebApplication.CreateBuilder(args);
+
+// Add services to the container.
+builder.Services.AddControllers();
+builder.Services.AddEndpointsApiExplorer();
+builder.Services.AddSwaggerGen(c =>
+{
+    c.SwaggerDoc("v1", new OpenApiInfo { Title = "API Service", Version = "v1" });
+});
+
+var app = builder.Build();
+
+// Configure the HTTP request pipeline.
+if (app.Environment.IsDevelopment())
+{
+    app.UseSwagger();
+    app.UseSwaggerUI();
+}
+
+app.UseHttpsRedirection();
+app.UseAuthorization();
+app.MapControllers();
+
+app.Run();
+""",
+    "dotnet_controller": """using Microsoft.AspNetCore.Mvc;
+
+namespace API.Controllers;
+
+[ApiController]
+[Route("api/[controller]")]
+public class BaseController : ControllerBase
+{
+    [HttpGet]
+    public IActionResult Get()
+    {
+        return Ok(new { message = "Hello from API" });
+    }
+}
+""",
+    "ef_dbcontext": """using Microsoft.EntityFrameworkCore;
+
+namespace API.Models;
+
+public class AppDbContext : DbContext
+{
+    public AppDbContext(DbContextOptions<AppDbContext> options) : base(options)
+    {
+    }
+
+    // Add DbSet properties for your entities here
+    // public DbSet<YourEntity> YourEntities { get; set; }
+}
+""",
+    "dotnet_service": """namespace API.Services;
+
+public interface IAuthService
+{
+    Task<bool> ValidateUserAsync(string username, string password);
+    Task<string> GenerateTokenAsync(string username);
+}
+
+public class AuthService : IAuthService
+{
+    public async Task<bool> ValidateUserAsync(string username, string password)
+    {
+        // TODO: Implement user validation logic
+        return await Task.FromResult(true);
+    }
+
+    public async Task<string> GenerateTokenAsync(string username)
+    {
+        // TODO: Implement JWT token generation
+        return await Task.FromResult("sample-token");
+    }
+}
+""",
+    "dotnet_csproj": """<Project Sdk="Microsoft.NET.Sdk.Web">
+
+  <PropertyGroup>
+    <TargetFramework>net8.0</TargetFramework>
+    <Nullable>enable</Nullable>
+    <ImplicitUsings>enable</ImplicitUsings>
+  </PropertyGroup>
+
+  <ItemGroup>
+    <PackageReference Include="Microsoft.AspNetCore.Authentication.JwtBearer" Version="8.0.0" />
+    <PackageReference Include="Microsoft.EntityFrameworkCore.SqlServer" Version="8.0.0" />
+    <PackageReference Include="Swashbuckle.AspNetCore" Version="6.5.0" />
+  </ItemGroup>
+
+</Project>
+""",
+}
+
+# Fallback for templates without dedicated content
+_BASIC_TEMPLATE = """# {file_name}
+# Generated by Cursor Plans MCP
+# File type: {file_type}
+# Template: {template}
+
+# TODO: Implement {file_type} functionality
+"""
+
+
+def _create_new_file(path: Path, content: str) -> bool:
+    """Write content to a file that must not exist yet; return False if it does."""
+    try:
+        with open(path, "x", encoding="utf-8") as f:
+            f.write(content)
+    except FileExistsError:
+        return False
+    return True
+
 
 class ExecutionStatus(Enum):
     """Execution status enumeration."""
@@ -24,7 +185,7 @@ class ExecutionStatus(Enum):
     ROLLED_BACK = "rolled_back"
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionResult:
     """Result of plan execution."""
 
@@ -54,10 +215,22 @@ class PlanExecutor:
     - Rollback capabilities
     """
 
+    # Map common tasks to handler methods
+    _TASK_ACTIONS: Dict[str, str] = {
+        "setup_project_structure": "_setup_project_structure",
+        "install_dependencies": "_install_dependencies",
+        "create_models": "_create_models",
+        "create_endpoints": "_create_endpoints",
+        "implement_jwt": "_implement_jwt",
+        "add_auth_middleware": "_add_auth_middleware",
+        "setup_testing": "_setup_testing",
+    }
+
     def __init__(self, project_dir: str = "."):
         self.project_dir = Path(project_dir)
         self.snapshot_manager = SnapshotManager(self.project_dir)
         self.dependency_resolver = DependencyResolver()
+        self._plan_cache: Dict[Tuple[str, int, int], Mapping[str, Any]] = {}
 
     async def execute_plan(self, plan_file: str, dry_run: bool = False) -> ExecutionResult:
         """
@@ -72,21 +245,30 @@ class PlanExecutor:
         """
         start_time = datetime.now()
 
+        # Snapshot the project while the plan is parsed; dry runs never modify files
+        snapshot_task = None
+        if not dry_run:
+            snapshot_task = asyncio.create_task(
+                self.snapshot_manager.create_snapshot(f"pre-execution-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+            )
+
         snapshot_id = None
         try:
-            # Load and validate plan
-            plan_data = await self._load_plan(plan_file)
+            try:
+                # Load and validate plan
+                plan_data = await self._load_plan(plan_file)
 
-            # Create execution plan with dependency resolution
-            execution_plan = self.dependency_resolver.create_execution_plan(plan_data)
+                # Create execution plan with dependency resolution
+                execution_plan = self.dependency_resolver.create_execution_plan(plan_data)
+            except Exception:
+                if snapshot_task is not None:
+                    await self._discard_snapshot(snapshot_task)
+                raise
 
-            if dry_run:
+            if snapshot_task is None:
                 return await self._dry_run_execution(execution_plan, start_time)
 
-            # Create snapshot before execution
-            snapshot_id = await self.snapshot_manager.create_snapshot(
-                f"pre-execution-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
-            )
+            snapshot_id = await snapshot_task
 
             # Execute the plan
             result = await self._execute_plan(execution_plan, snapshot_id, start_time)
@@ -142,26 +324,54 @@ class PlanExecutor:
         """List available snapshots."""
         return await self.snapshot_manager.list_snapshots()
 
-    async def _load_plan(self, plan_file: str) -> Dict[str, Any]:
+    async def _discard_snapshot(self, snapshot_task: "asyncio.Task[str]"):
+        """Cancel, or delete once finished, a pre-execution snapshot that is no longer needed.
+
+        A cancelled create_snapshot removes its own partial directory before
+        the task finishes, so awaiting it here leaves nothing behind.
+        """
+        snapshot_task.cancel()
+        try:
+            snapshot_id = await snapshot_task
+        except (asyncio.CancelledError, Exception):
+            return
+
+        await self.snapshot_manager.delete_snapshot(snapshot_id)
+
+    async def _load_plan(self, plan_file: str) -> Mapping[str, Any]:
         """Load and validate plan file."""
         plan_path = Path(plan_file)
-        if not plan_path.exists():
+        try:
+            stat = plan_path.stat()
+        except FileNotFoundError:
             raise FileNotFoundError(f"Plan file not found: {plan_file}")
 
-        with open(plan_path, "r") as f:
-            plan_data = yaml.safe_load(f)
+        # Unchanged plan files are served from the cache
+        cache_key = (str(plan_path.resolve()), stat.st_mtime_ns, stat.st_size)
+        if cache_key in self._plan_cache:
+            return self._plan_cache[cache_key]
+
+        content = await asyncio.to_thread(plan_path.read_bytes)
+
+        plan_data = await asyncio.to_thread(yaml.load, content, _YamlLoader)
 
         # Ensure plan_data is a dict
         if not isinstance(plan_data, dict):
             raise ValueError("Plan file must contain valid YAML with a dictionary structure")
 
         # Basic validation
-        required_sections = ["project", "target_state", "resources", "phases"]
-        for section in required_sections:
-            if section not in plan_data:
-                raise ValueError(f"Missing required section: {section}")
+        missing = _REQUIRED_SECTIONS.difference(plan_data)
+        if missing:
+            raise ValueError(f"Missing required sections: {sorted(missing)}")
+
+        # Plans are shared read-only between runs instead of being copied
+        plan_view = MappingProxyType(plan_data)
 
-        return plan_data
+        if len(self._plan_cache) >= _PLAN_CACHE_SIZE:
+            del self._plan_cache[next(iter(self._plan_cache))]
+        self._plan_cache[cache_key] = plan_view
+
+        return plan_view
 
     async def _dry_run_execution(self, execution_plan: ExecutionPlan, start_time: datetime) -> ExecutionResult:
         """Perform a dry run showing what would be executed."""
@@ -172,12 +382,8 @@ class PlanExecutor:
             changes.append(f"Phase: {phase_name}")
 
             # Simulate file creation
-            if "resources" in execution_plan.plan_data:
-                resources = execution_plan.plan_data["resources"]
-                if "files" in resources:
-                    for file_resource in resources["files"]:
-                        if isinstance(file_resource, dict) and "path" in file_resource:
-                            changes.append(f"Would create: {file_resource['path']}")
+            for file_spec in execution_plan.files:
+                changes.append(f"Would create: {file_spec.path}")
 
         return ExecutionResult(
             success=True,
@@ -198,14 +404,14 @@ class PlanExecutor:
         try:
             for phase in execution_plan.phases:
                 phase_name = phase.name
-                print(f"Executing phase: {phase_name}")
+                logger.info("Executing phase: %s", phase_name)
 
                 # Execute phase
-                phase_changes = await self._execute_phase(phase, execution_plan.plan_data)
+                phase_changes = await self._execute_phase(phase, execution_plan)
                 changes_made.extend(phase_changes)
                 executed_phases.append(phase_name)
 
-                print(f"Completed phase: {phase_name}")
+                logger.info("Completed phase: %s", phase_name)
 
             return ExecutionResult(
                 success=True,
@@ -217,58 +423,69 @@ class PlanExecutor:
             )
 
         except Exception as e:
-            # Execution failed - rollback
-            await self._rollback_on_failure(snapshot_id, str(e))
+            # Execution failed - rollback here so execute_plan does not restore a second time
+            error_message = str(e)
+            try:
+                await self._rollback_on_failure(snapshot_id, error_message)
+            except Exception as rollback_error:
+                error_message = f"{error_message} (rollback failed: {rollback_error})"
 
             return ExecutionResult(
                 success=False,
                 status=ExecutionStatus.FAILED,
                 executed_phases=executed_phases,
-                failed_phase=phase_name if "phase_name" in locals() else None,
-                error_message=str(e),
+                failed_phase=phase_name,
+                error_message=error_message,
                 snapshot_id=snapshot_id,
                 changes_made=changes_made,
                 execution_time=(datetime.now() - start_time).total_seconds(),
             )
 
-    async def _execute_phase(self, phase, plan_data: Dict[str, Any]) -> List[str]:
+    async def _execute_phase(self, phase, execution_plan: ExecutionPlan) -> List[str]:
         """Execute a single phase."""
         changes = []
         phase_name = phase.name
         phase_data = phase.data
+        plan_data = execution_plan.plan_data
 
         # Get tasks for this phase
-        tasks = phase_data.get("tasks", [])
+        tasks = [task for task in phase_data.get("tasks", []) if isinstance(task, str)]
+        task_dependencies = phase_data.get("task_dependencies") or {}
 
-        for task in tasks:
-            if isinstance(task, str):
-                task_changes = await self._execute_task(task, plan_data)
+        # Only dependencies on tasks within this phase constrain ordering
+        deps: Dict[str, Set[str]] = {
+            task: {dep for dep in task_dependencies.get(task, []) if dep in tasks and dep != task} for task in tasks
+        }
+
+        # Run tasks in waves: every task whose dependencies are done runs concurrently
+        done: Set[str] = set()
+        pending = list(dict.fromkeys(tasks))
+        while pending:
+            ready = [task for task in pending if deps[task] <= done]
+            if not ready:
+                raise ValueError(f"Circular task dependency in phase '{phase_name}': {', '.join(pending)}")
+
+            results = await asyncio.gather(*[self._execute_task(task, plan_data) for task in ready])
+            for task_changes in results:
                 changes.extend(task_changes)
 
+            done.update(ready)
+            pending = [task for task in pending if task not in done]
+
         # Handle file resources for this phase
-        if "resources" in plan_data and "files" in plan_data["resources"]:
-            file_changes = await self._create_files(plan_data["resources"]["files"], phase_name)
+        if execution_plan.files:
+            file_changes = await self._create_files(execution_plan.files, phase_name)
             changes.extend(file_changes)
 
         return changes
 
-    async def _execute_task(self, task: str, plan_data: Dict[str, Any]) -> List[str]:
+    async def _execute_task(self, task: str, plan_data: Mapping[str, Any]) -> List[str]:
         """Execute a single task."""
         changes = []
 
-        # Map common tasks to actions
-        task_actions = {
-            "setup_project_structure": self._setup_project_structure,
-            "install_dependencies": self._install_dependencies,
-            "create_models": self._create_models,
-            "create_endpoints": self._create_endpoints,
-            "implement_jwt": self._implement_jwt,
-            "add_auth_middleware": self._add_auth_middleware,
-            "setup_testing": self._setup_testing,
-        }
-
-        if task in task_actions:
-            task_changes = await task_actions[task](plan_data)
+        handler_name = self._TASK_ACTIONS.get(task)
+        if handler_name is not None:
+            task_changes = await getattr(self, handler_name)(plan_data)
             changes.extend(task_changes)
         else:
             # Generic task - create a placeholder file
@@ -276,53 +493,58 @@ class PlanExecutor:
 
         return changes
 
-    async def _create_files(self, files: List[Dict[str, Any]], phase_name: str) -> List[str]:
+    async def _create_files(self, files: List[FileSpec], phase_name: str) -> List[str]:
         """Create files based on plan resources."""
         changes = []
 
-        for file_resource in files:
-            if isinstance(file_resource, dict) and "path" in file_resource:
-                file_path = file_resource["path"]
-                file_type = file_resource.get("type", "file")
-                template = file_resource.get("template", "basic")
-
-                try:
-                    # Create the file
-                    created = await self._create_file(file_path, file_type, template)
-                    if created:
-                        changes.append(f"Created: {file_path}")
-                except PermissionError as e:
-                    changes.append(f"❌ Permission denied: {file_path} - {e}")
-                    raise  # Re-raise to stop execution
-                except OSError as e:
-                    changes.append(f"❌ OS Error: {file_path} - {e}")
-                    raise  # Re-raise to stop execution
-                except Exception as e:
-                    changes.append(f"❌ Error creating {file_path}: {e}")
-                    raise  # Re-raise to stop execution
+        # Create each parent directory once rather than once per file
+        self._create_directories({(self.project_dir / file_spec.path).parent for file_spec in files})
+        self._render_files(files)
 
-        return changes
+        for file_spec in files:
+            file_path = file_spec.path
 
-    async def _create_file(self, file_path: str, file_type: str, template: str) -> bool:
-        """Create a single file based on template."""
-        try:
-            full_path = self.project_dir / file_path
+            try:
+                # Create the file
+                created = await self._create_file(file_path, file_spec.content or "")
+                if created:
+                    changes.append(f"Created: {file_path}")
+            except PermissionError as e:
+                changes.append(f"❌ Permission denied: {file_path} - {e}")
+                raise  # Re-raise to stop execution
+            except OSError as e:
+                changes.append(f"❌ OS Error: {file_path} - {e}")
+                raise  # Re-raise to stop execution
+            except Exception as e:
+                changes.append(f"❌ Error creating {file_path}: {e}")
+                raise  # Re-raise to stop execution
+
+        return changes
 
-            # Ensure directory exists
+    def _create_directories(self, directories: Set[Path]):
+        """Create the given directories, each exactly once."""
+        for directory in sorted(directories):
             try:
-                full_path.parent.mkdir(parents=True, exist_ok=True)
+                directory.mkdir(parents=True, exist_ok=True)
             except PermissionError as e:
-                raise PermissionError(f"Cannot create directory {full_path.parent}: {e}")
+                raise PermissionError(f"Cannot create directory {directory}: {e}")
             except OSError as e:
-                raise OSError(f"Failed to create directory {full_path.parent}: {e}")
+                raise OSError(f"Failed to create directory {directory}: {e}")
 
-            # Generate content based on template
-            content = self._generate_file_content(file_path, file_type, template)
+    def _render_files(self, files: List[FileSpec]):
+        """Render each file's template once; later phases reuse the content."""
+        for file_spec in files:
+            if file_spec.content is None:
+                file_spec.content = self._generate_file_content(file_spec.path, file_spec.type, file_spec.template)
 
-            # Write file with proper error handling
+    async def _create_file(self, file_path: str, content: str) -> bool:
+        """Write a single rendered file (its directory must already exist)."""
+        try:
+            full_path = self.project_dir / file_path
+
+            # Write file off the event loop with proper error handling
             try:
-                with open(full_path, "w") as f:
-                    f.write(content)
+                await asyncio.to_thread(full_path.write_text, content, encoding="utf-8")
             except PermissionError as e:
                 raise PermissionError(f"Cannot write to file {full_path}: {e}")
             except OSError as e:
@@ -339,171 +561,34 @@ class PlanExecutor:
 
     def _generate_file_content(self, file_path: str, file_type: str, template: str) -> str:
         """Generate file content based on template and type."""
-        file_name = Path(file_path).name
-
-        # Basic template content
-        templates = {
-            "fastapi_main": """from fastapi import FastAPI
-
-app = FastAPI(title="API Service")
-
-@app.get("/")
-async def root():
-    return {"message": "Hello World"}
-
-if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
-""",
-            "fastapi_model": """from pydantic import BaseModel
-from typing import Optional
-
-class BaseModel(BaseModel):
-    class Config:
-        from_attributes = True
-""",
-            "requirements": """fastapi>=0.68.0
-uvicorn>=0.15.0
-pydantic>=1.8.0
-""",
-            # .NET Templates
-            "dotnet_program": """using Microsoft.AspNetCore.Builder;
-using Microsoft.Extensions.DependencyInjection;
-using Microsoft.Extensions.Hosting;
-using Microsoft.OpenApi.Models;
-
-var builder = WebApplication.CreateBuilder(args);
-
-// Add services to the container.
-builder.Services.AddControllers();
-builder.Services.AddEndpointsApiExplorer();
-builder.Services.AddSwaggerGen(c =>
-{
-    c.SwaggerDoc("v1", new OpenApiInfo { Title = "API Service", Version = "v1" });
-});
-
-var app = builder.Build();
-
-// Configure the HTTP request pipeline.
-if (app.Environment.IsDevelopment())
-{
-    app.UseSwagger();
-    app.UseSwaggerUI();
-}
-
-app.UseHttpsRedirection();
-app.UseAuthorization();
-app.MapControllers();
-
-app.Run();
-""",
-            "dotnet_controller": """using Microsoft.AspNetCore.Mvc;
-
-namespace API.Controllers;
-
-[ApiController]
-[Route("api/[controller]")]
-public class BaseController : ControllerBase
-{
-    [HttpGet]
-    public IActionResult Get()
-    {
-        return Ok(new { message = "Hello from API" });
-    }
-}
-""",
-            "ef_dbcontext": """using Microsoft.EntityFrameworkCore;
+        content = _TEMPLATES.get(template)
+        if content is None:
+            content = _BASIC_TEMPLATE.format(file_name=Path(file_path).name, file_type=file_type, template=template)
+        return content
 
-namespace API.Models;
-
-public class AppDbContext : DbContext
-{
-    public AppDbContext(DbContextOptions<AppDbContext> options) : base(options)
-    {
-    }
-
-    // Add DbSet properties for your entities here
-    // public DbSet<YourEntity> YourEntities { get; set; }
-}
-""",
-            "dotnet_service": """namespace API.Services;
-
-public interface IAuthService
-{
-    Task<bool> ValidateUserAsync(string username, string password);
-    Task<string> GenerateTokenAsync(string username);
-}
-
-public class AuthService : IAuthService
-{
-    public async Task<bool> ValidateUserAsync(string username, string password)
-    {
-        // TODO: Implement user validation logic
-        return await Task.FromResult(true);
-    }
-
-    public async Task<string> GenerateTokenAsync(string username)
-    {
-        // TODO: Implement JWT token generation
-        return await Task.FromResult("sample-token");
-    }
-}
-""",
-            "dotnet_csproj": """<Project Sdk="Microsoft.NET.Sdk.Web">
-
-  <PropertyGroup>
-    <TargetFramework>net8.0</TargetFramework>
-    <Nullable>enable</Nullable>
-    <ImplicitUsings>enable</ImplicitUsings>
-  </PropertyGroup>
-
-  <ItemGroup>
-    <PackageReference Include="Microsoft.AspNetCore.Authentication.JwtBearer" Version="8.0.0" />
-    <PackageReference Include="Microsoft.EntityFrameworkCore.SqlServer" Version="8.0.0" />
-    <PackageReference Include="Swashbuckle.AspNetCore" Version="6.5.0" />
-  </ItemGroup>
-
-</Project>
-""",
-            "basic": f"""# {file_name}
-# Generated by Cursor Plans MCP
-# File type: {file_type}
-# Template: {template}
-
-# TODO: Implement {file_type} functionality
-""",
-        }
-
-        return templates.get(template, templates["basic"])
-
-    async def _setup_project_structure(self, plan_data: Dict[str, Any]) -> List[str]:
+    async def _setup_project_structure(self, plan_data: Mapping[str, Any]) -> List[str]:
         """Setup basic project structure."""
-        changes = []
-
         # Create common directories
         directories = ["src", "tests", "docs"]
-        for directory in directories:
-            dir_path = self.project_dir / directory
-            dir_path.mkdir(exist_ok=True)
-            changes.append(f"Created directory: {directory}")
+        await asyncio.gather(
+            *[asyncio.to_thread((self.project_dir / directory).mkdir, exist_ok=True) for directory in directories]
+        )
 
-        return changes
+        return [f"Created directory: {directory}" for directory in directories]
 
-    async def _install_dependencies(self, plan_data: Dict[str, Any]) -> List[str]:
+    async def _install_dependencies(self, plan_data: Mapping[str, Any]) -> List[str]:
         """Install project dependencies."""
         changes = []
 
-        # Create requirements.txt if it doesn't exist
+        # Create requirements.txt unless it already exists
         requirements_file = self.project_dir / "requirements.txt"
-        if not requirements_file.exists():
-            content = self._generate_file_content("requirements.txt", "dependencies", "requirements")
-            with open(requirements_file, "w") as f:
-                f.write(content)
+        content = self._generate_file_content("requirements.txt", "dependencies", "requirements")
+        if await asyncio.to_thread(_create_new_file, requirements_file, content):
             changes.append("Created: requirements.txt")
 
         return changes
 
-    async def _create_models(self, plan_data: Dict[str, Any]) -> List[str]:
+    async def _create_models(self, plan_data: Mapping[str, Any]) -> List[str]:
         """Create data models."""
         changes = []
 
@@ -512,15 +597,13 @@ public class AuthService : IAuthService
         models_dir.mkdir(parents=True, exist_ok=True)
 
         models_file = models_dir / "models.py"
-        if not models_file.exists():
-            content = self._generate_file_content("src/models/models.py", "models", "fastapi_model")
-            with open(models_file, "w") as f:
-                f.write(content)
+        content = self._generate_file_content("src/models/models.py", "models", "fastapi_model")
+        if await asyncio.to_thread(_create_new_file, models_file, content):
             changes.append("Created: src/models/models.py")
 
         return changes
 
-    async def _create_endpoints(self, plan_data: Dict[str, Any]) -> List[str]:
+    async def _create_endpoints(self, plan_data: Mapping[str, Any]) -> List[str]:
         """Create API endpoints."""
         changes = []
 
@@ -529,8 +612,7 @@ public class AuthService : IAuthService
         routes_dir.mkdir(parents=True, exist_ok=True)
 
         router_file = routes_dir / "main.py"
-        if not router_file.exists():
-            content = """from fastapi import APIRouter
+        content = """from fastapi import APIRouter
 
 router = APIRouter()
 
@@ -538,13 +620,12 @@ router = APIRouter()
 async def health_check():
     return {"status": "healthy"}
 """
-            with open(router_file, "w") as f:
-                f.write(content)
+        if await asyncio.to_thread(_create_new_file, router_file, content):
             changes.append("Created: src/routes/main.py")
 
         return changes
 
-    async def _implement_jwt(self, plan_data: Dict[str, Any]) -> List[str]:
+    async def _implement_jwt(self, plan_data: Mapping[str, Any]) -> List[str]:
         """Implement JWT authentication."""
         changes = []
 
@@ -553,8 +634,7 @@ async def health_check():
         auth_dir.mkdir(parents=True, exist_ok=True)
 
         jwt_file = auth_dir / "jwt.py"
-        if not jwt_file.exists():
-            content = """import jwt
+        content = """import jwt
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -571,13 +651,12 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 """
-            with open(jwt_file, "w") as f:
-                f.write(content)
+        if await asyncio.to_thread(_create_new_file, jwt_file, content):
             changes.append("Created: src/auth/jwt.py")
 
         return changes
 
-    async def _add_auth_middleware(self, plan_data: Dict[str, Any]) -> List[str]:
+    async def _add_auth_middleware(self, plan_data: Mapping[str, Any]) -> List[str]:
         """Add authentication middleware."""
         changes = []
 
@@ -586,8 +665,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         middleware_dir.mkdir(parents=True, exist_ok=True)
 
         auth_middleware_file = middleware_dir / "auth.py"
-        if not auth_middleware_file.exists():
-            content = """from fastapi import Request, HTTPException
+        content = """from fastapi import Request, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 security = HTTPBearer()
@@ -598,15 +676,14 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = security):
         raise HTTPException(status_code=401, detail="Invalid token")
     return credentials.credentials
 """
-            with open(auth_middleware_file, "w") as f:
-                f.write(content)
+        if await asyncio.to_thread(_create_new_file, auth_middleware_file, content):
             changes.append("Created: src/middleware/auth.py")
 
         return changes
 
-    async def _setup_testing(self, plan_data: Dict[str, Any]) -> List[str]:
+    async def _setup_testing(self, plan_data: Mapping[str, Any]) -> List[str]:
         """Setup testing infrastructure."""
-        changes = []
+        changes: List[str] = []
 
         # Create test files
         test_files = [
@@ -633,25 +710,29 @@ def client():
             ),
         ]
 
-        for file_path, content in test_files:
-            full_path = self.project_dir / file_path
-            full_path.parent.mkdir(parents=True, exist_ok=True)
+        (self.project_dir / "tests").mkdir(parents=True, exist_ok=True)
 
-            if not full_path.exists():
-                with open(full_path, "w") as f:
-                    f.write(content)
-                changes.append(f"Created: {file_path}")
+        # Write the missing test files concurrently, leaving existing ones alone
+        created = await asyncio.gather(
+            *[
+                asyncio.to_thread(_create_new_file, self.project_dir / file_path, content)
+                for file_path, content in test_files
+            ]
+        )
+        changes.extend(
+            f"Created: {file_path}" for (file_path, _), was_created in zip(test_files, created) if was_created
+        )
 
         return changes
 
     async def _rollback_on_failure(self, snapshot_id: str, error_message: str):
         """Rollback to snapshot on execution failure."""
-        print(f"Execution failed: {error_message}")
-        print(f"Rolling back to snapshot: {snapshot_id}")
+        logger.warning("Execution failed: %s", error_message)
+        logger.info("Rolling back to snapshot: %s", snapshot_id)
 
         try:
             await self.snapshot_manager.restore_snapshot(snapshot_id)
-            print("Rollback completed successfully")
+            logger.info("Rollback completed successfully")
         except Exception as e:
-            print(f"Rollback failed: {str(e)}")
+            logger.error("Rollback failed: %s", e)
             raise
@@ -2,9 +2,16 @@
 Dependency resolution and execution planning.
 """
 
-from collections import defaultdict
-from dataclasses import dataclass
-from typing import Any, Dict, List
+import heapq
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+from ..schema import DevelopmentPlan
+
+# Number of resolved execution plans kept per resolver
+_PLAN_CACHE_SIZE = 32
 
 
 @dataclass
@@ -17,12 +24,60 @@ class Phase:
     dependencies: List[str]
 
 
+@dataclass
+class FileSpec:
+    """A file resource declared in the plan."""
+
+    path: str
+    type: str = "file"
+    template: str = "basic"
+    # Rendered template, filled in once per plan before the first write
+    content: Optional[str] = None
+
+
+@dataclass
+class PhaseGraph:
+    """Dependency graph over a list of phases, built once and shared."""
+
+    phase_map: Dict[str, Phase]
+    dependents: Dict[str, List[str]]
+    in_degree: Dict[str, int]
+
+
 @dataclass
 class ExecutionPlan:
     """Complete execution plan with resolved dependencies."""
 
     phases: List[Phase]
-    plan_data: Dict[str, Any]
+    plan_data: Mapping[str, Any]
+    files: Optional[List[FileSpec]] = None
+    # Phases grouped so each level depends only on earlier levels; phases
+    # within a level are independent of each other
+    levels: List[List[Phase]] = field(default_factory=list)
+    # Phase name -> names of the phases that depend on it, built with the plan
+    dependents: Dict[str, List[str]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.files is None:
+            self.files = normalize_files(self.plan_data)
+
+
+def normalize_files(plan_data: Mapping[str, Any]) -> List[FileSpec]:
+    """Extract the well-formed file resources from plan data."""
+    resources = plan_data.get("resources")
+    files = resources.get("files") if isinstance(resources, dict) else None
+    if not isinstance(files, list):
+        return []
+
+    return [
+        FileSpec(
+            path=file_resource["path"],
+            type=file_resource.get("type", "file"),
+            template=file_resource.get("template", "basic"),
+        )
+        for file_resource in files
+        if isinstance(file_resource, dict) and "path" in file_resource
+    ]
 
 
 class DependencyResolver:
@@ -36,27 +91,84 @@ class DependencyResolver:
     - Priority-based ordering
     """
 
-    def create_execution_plan(self, plan_data: Dict[str, Any]) -> ExecutionPlan:
+    def __init__(self):
+        # Resolved phase order, levels and dependents, as names, keyed by each phase's
+        # name, priority and dependencies in declaration order; least recently used first
+        self._plan_cache: OrderedDict[Tuple[Any, ...], Tuple[List[str], List[List[str]], Dict[str, List[str]]]] = (
+            OrderedDict()
+        )
+
+    def create_execution_plan(self, plan_data: Union[Mapping[str, Any], DevelopmentPlan]) -> ExecutionPlan:
         """
         Create an execution plan from plan data.
 
         Args:
-            plan_data: Parsed plan data
+            plan_data: Parsed plan data, or a plan already validated against the schema
 
         Returns:
             ExecutionPlan with phases in correct execution order
         """
-        phases = self._parse_phases(plan_data)
-
-        # Validate dependencies
-        self._validate_dependencies(phases)
-
-        # Resolve execution order
-        ordered_phases = self._resolve_execution_order(phases)
+        if isinstance(plan_data, DevelopmentPlan):
+            plan_data = plan_data.model_dump()
+            parse_phases = self._parse_phases_validated
+        else:
+            parse_phases = self._parse_phases
+
+        # Parsing is linear; the cache saves the graph, validation and ordering
+        phases = parse_phases(plan_data)
+        cache_key = self._plan_cache_key(phases)
+        cached = self._plan_cache.get(cache_key) if cache_key is not None else None
+        if cached is None:
+            graph = self._build_graph(phases)
+
+            # Validate dependencies
+            self._validate_dependencies(phases, graph)
+
+            # Resolve execution order
+            ordered_phases = self._resolve_execution_order(phases, graph)
+            levels = self._resolve_execution_levels(phases, graph)
+
+            if cache_key is not None:
+                self._plan_cache[cache_key] = (
+                    [phase.name for phase in ordered_phases],
+                    [[phase.name for phase in level] for level in levels],
+                    graph.dependents,
+                )
+                if len(self._plan_cache) > _PLAN_CACHE_SIZE:
+                    self._plan_cache.popitem(last=False)
+            return ExecutionPlan(
+                phases=ordered_phases,
+                plan_data=plan_data,
+                levels=levels,
+                dependents={name: list(names) for name, names in graph.dependents.items()},
+            )
 
-        return ExecutionPlan(phases=ordered_phases, plan_data=plan_data)
+        # Map the cached order onto this call's phases, whose data belongs to plan_data
+        self._plan_cache.move_to_end(cache_key)
+        ordered_names, level_names, dependents = cached
+        phase_map = {phase.name: phase for phase in phases}
+        return ExecutionPlan(
+            phases=[phase_map[name] for name in ordered_names],
+            plan_data=plan_data,
+            levels=[[phase_map[name] for name in level] for level in level_names],
+            dependents={name: list(names) for name, names in dependents.items()},
+        )
+
+    def _plan_cache_key(self, phases: List[Phase]) -> Optional[Tuple[Any, ...]]:
+        """
+        Key the plan cache on what ordering depends on, or None if that is unhashable.
 
-    def _parse_phases(self, plan_data: Dict[str, Any]) -> List[Phase]:
+        Phases stay in declaration order: it breaks priority ties, so plans
+        that differ only in that order must not share an entry.
+        """
+        key = tuple((phase.name, phase.priority, tuple(phase.dependencies)) for phase in phases)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def _parse_phases(self, plan_data: Mapping[str, Any]) -> List[Phase]:
         """Parse phases from plan data."""
         phases: List[Phase] = []
 
@@ -90,129 +202,148 @@ class DependencyResolver:
 
         return phases
 
-    def _validate_dependencies(self, phases: List[Phase]):
-        """Validate that all dependencies exist and detect cycles."""
-        phase_names = {phase.name for phase in phases}
-
-        # Check for missing dependencies
-        for phase in phases:
-            for dep in phase.dependencies:
-                if dep not in phase_names:
-                    raise ValueError(f"Phase '{phase.name}' depends on unknown phase '{dep}'")
+    def _parse_phases_validated(self, plan_data: Mapping[str, Any]) -> List[Phase]:
+        """Parse phases from schema-validated plan data, whose field types are already guaranteed."""
+        return [
+            Phase(
+                name=phase_name,
+                data=phase_data,
+                priority=phase_data["priority"],
+                dependencies=phase_data["dependencies"] or [],
+            )
+            for phase_name, phase_data in plan_data["phases"].items()
+        ]
 
-        # Check for cycles
-        if self._has_cycles(phases):
-            raise ValueError("Circular dependency detected in phases")
+    def _build_graph(self, phases: List[Phase]) -> PhaseGraph:
+        """Build the phase map, dependents adjacency and in-degree counts in one pass."""
+        phase_map = {phase.name: phase for phase in phases}
+        dependents: Dict[str, List[str]] = {name: [] for name in phase_map}
+        in_degree = dict.fromkeys(phase_map, 0)
 
-    def _has_cycles(self, phases: List[Phase]) -> bool:
-        """Check for cycles in the dependency graph using DFS."""
-        # Build adjacency list
-        graph = defaultdict(list)
         for phase in phases:
             for dep in phase.dependencies:
-                graph[phase.name].append(dep)
-
-        # DFS to detect cycles
-        visited = set()
-        rec_stack = set()
-
-        def has_cycle_dfs(node: str) -> bool:
-            visited.add(node)
-            rec_stack.add(node)
+                if dep in dependents:
+                    dependents[dep].append(phase.name)
+                else:
+                    dependents[dep] = [phase.name]
+                in_degree[phase.name] += 1
 
-            for neighbor in graph[node]:
-                if neighbor not in visited:
-                    if has_cycle_dfs(neighbor):
-                        return True
-                elif neighbor in rec_stack:
-                    return True
+        return PhaseGraph(phase_map=phase_map, dependents=dependents, in_degree=in_degree)
 
-            rec_stack.remove(node)
-            return False
+    def _validate_dependencies(self, phases: List[Phase], graph: Optional[PhaseGraph] = None):
+        """Validate that all dependencies exist (cycles are caught while ordering)."""
+        phase_map = (graph or self._build_graph(phases)).phase_map
 
-        # Check all nodes
+        # Check for missing dependencies
         for phase in phases:
-            if phase.name not in visited:
-                if has_cycle_dfs(phase.name):
-                    return True
-
-        return False
+            for dep in phase.dependencies:
+                if dep not in phase_map:
+                    raise ValueError(f"Phase '{phase.name}' depends on unknown phase '{dep}'")
 
-    def _resolve_execution_order(self, phases: List[Phase]) -> List[Phase]:
+    def _resolve_execution_order(self, phases: List[Phase], graph: Optional[PhaseGraph] = None) -> List[Phase]:
         """
         Resolve execution order using topological sort with priority tie-breaking.
 
-        Returns phases in the order they should be executed.
+        Returns phases in the order they should be executed. Raises ValueError
+        if the dependencies contain a cycle.
         """
-        # Build adjacency list and in-degree count
-        graph = defaultdict(list)
-        in_degree = defaultdict(int)
-
-        for phase in phases:
-            in_degree[phase.name] = 0
+        if graph is None:
+            graph = self._build_graph(phases)
 
-        for phase in phases:
-            for dep in phase.dependencies:
-                graph[dep].append(phase.name)
-                in_degree[phase.name] += 1
+        # Work on a copy so the shared graph can be reused
+        in_degree = dict(graph.in_degree)
+        phase_map = graph.phase_map
+        dependents = graph.dependents
 
-        # Topological sort with priority queue
-        from queue import PriorityQueue
-
-        # Queue of (priority, phase_name) tuples
-        queue: PriorityQueue = PriorityQueue()
+        # Topological sort with a heap of (priority, sequence, phase_name) entries;
+        # the sequence number breaks priority ties in the order phases became ready
+        heap: List[Tuple[int, int, str]] = []
+        sequence = count()
 
         # Add phases with no dependencies
         for phase in phases:
             if in_degree[phase.name] == 0:
-                queue.put((phase.priority, phase.name))
+                heapq.heappush(heap, (phase.priority, next(sequence), phase.name))
 
         ordered_phases = []
-        phase_map = {phase.name: phase for phase in phases}
 
-        while not queue.empty():
-            priority, phase_name = queue.get()
+        while heap:
+            _, _, phase_name = heapq.heappop(heap)
             phase = phase_map[phase_name]
             ordered_phases.append(phase)
 
             # Process dependents
-            for dependent in graph[phase_name]:
+            for dependent in dependents[phase_name]:
                 in_degree[dependent] -= 1
                 if in_degree[dependent] == 0:
                     dependent_phase = phase_map[dependent]
-                    queue.put((dependent_phase.priority, dependent))
+                    heapq.heappush(heap, (dependent_phase.priority, next(sequence), dependent))
 
-        # Check if all phases were processed
+        # Any phase left unprocessed is on, or behind, a dependency cycle
         if len(ordered_phases) != len(phases):
-            raise ValueError("Circular dependency detected (should have been caught earlier)")
+            remaining = [phase.name for phase in phases if in_degree[phase.name] > 0]
+            raise ValueError(f"Circular dependency detected among phases: {', '.join(remaining)}")
 
         return ordered_phases
 
-    def get_execution_graph(self, phases: List[Phase]) -> Dict[str, List[str]]:
-        """Get the execution dependency graph for visualization."""
-        graph = defaultdict(list)
+    def _resolve_execution_levels(self, phases: List[Phase], graph: Optional[PhaseGraph] = None) -> List[List[Phase]]:
+        """
+        Group phases into dependency levels.
 
-        for phase in phases:
-            for dep in phase.dependencies:
-                graph[dep].append(phase.name)
+        Each round takes every phase whose dependencies are all in earlier
+        levels; within a level, phases keep the priority tie-breaking used by
+        the linear order. Expects an acyclic graph.
+        """
+        if graph is None:
+            graph = self._build_graph(phases)
+
+        in_degree = dict(graph.in_degree)
+        declaration_order = {phase.name: index for index, phase in enumerate(phases)}
+
+        levels = []
+        ready = [phase for phase in phases if in_degree[phase.name] == 0]
+        while ready:
+            ready.sort(key=lambda phase: (phase.priority, declaration_order[phase.name]))
+            levels.append(ready)
+
+            next_ready = []
+            for phase in ready:
+                for dependent in graph.dependents[phase.name]:
+                    in_degree[dependent] -= 1
+                    if in_degree[dependent] == 0:
+                        next_ready.append(graph.phase_map[dependent])
+            ready = next_ready
+
+        return levels
+
+    def _dependents_for(self, phases: Union[List[Phase], ExecutionPlan]) -> Dict[str, List[str]]:
+        """Return a resolved plan's dependents map, or build one for a bare phase list."""
+        if isinstance(phases, ExecutionPlan):
+            return phases.dependents
+        return self._build_graph(phases).dependents
+
+    def get_execution_graph_items(self, phases: Union[List[Phase], ExecutionPlan]) -> Iterator[Tuple[str, str]]:
+        """Yield (phase, dependent) edges of the execution graph without copying it."""
+        for phase_name, names in self._dependents_for(phases).items():
+            for dependent in names:
+                yield phase_name, dependent
+
+    def get_execution_graph(self, phases: Union[List[Phase], ExecutionPlan]) -> Dict[str, List[str]]:
+        """Get the execution dependency graph for visualization."""
+        dependents = self._dependents_for(phases)
 
-        return dict(graph)
+        return {phase_name: names.copy() for phase_name, names in dependents.items() if names}
 
-    def get_phase_dependencies(self, phase_name: str, phases: List[Phase]) -> List[str]:
+    def get_phase_dependencies(self, phase_name: str, phases: Union[List[Phase], ExecutionPlan]) -> List[str]:
         """Get all dependencies for a specific phase."""
-        phase_map = {phase.name: phase for phase in phases}
+        phase_list = phases.phases if isinstance(phases, ExecutionPlan) else phases
+        phase = next((phase for phase in phase_list if phase.name == phase_name), None)
 
-        if phase_name not in phase_map:
+        if phase is None:
             return []
 
-        return phase_map[phase_name].dependencies.copy()
+        return phase.dependencies.copy()
 
-    def get_dependent_phases(self, phase_name: str, phases: List[Phase]) -> List[str]:
+    def get_dependent_phases(self, phase_name: str, phases: Union[List[Phase], ExecutionPlan]) -> List[str]:
         """Get all phases that depend on the specified phase."""
-        dependents = []
-
-        for phase in phases:
-            if phase_name in phase.dependencies:
-                dependents.append(phase.name)
-
-        return dependents
+        return self._dependents_for(phases).get(phase_name, []).copy()
@@ -2,14 +2,85 @@
 State snapshot management for rollback capabilities.
 """
 
+import asyncio
 import hashlib
 import json
 import os
+import secrets
 import shutil
+import sqlite3
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, suppress
 from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Directory names that are never descended into when walking the project
+_EXCLUDED_DIRS = frozenset({".devstate", ".git", "__pycache__", ".pytest_cache", ".venv", "node_modules"})
+
+# File names and suffixes left out of snapshots
+_EXCLUDED_FILES = frozenset({".DS_Store"})
+_EXCLUDED_SUFFIXES = (".pyc",)
+
+# Top-level directories snapshotted recursively; limiting the scope avoids
+# walking unrelated or system directories under the project root
+_PROJECT_DIRS = frozenset({"cursor-plans", "src", "tests", "docs", "examples"})
+
+# Read size used when hashing files into the object store
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Per-thread scratch buffers that file hashing reads into
+_hash_buffers = threading.local()
+
+# Worker threads used to copy files into and out of snapshots
+_COPY_WORKERS = 16
+
+# Files modified this recently before a snapshot are re-hashed next time
+_RACY_WINDOW_NS = 2_000_000_000
+
+# Snapshot index columns; any other metadata keys are kept in extra_json
+_INDEX_COLUMNS = ("description", "created_at", "file_count", "total_size", "restored_at", "backup_created")
+
+# Metadata kept only in each snapshot's metadata.json, not in the index
+_UNINDEXED_KEYS = frozenset({"project_files"})
+
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id TEXT PRIMARY KEY,
+    description TEXT,
+    created_at TEXT,
+    file_count INTEGER,
+    total_size INTEGER,
+    restored_at TEXT,
+    backup_created TEXT,
+    extra_json TEXT
+)
+"""
+
+_INDEX_UPSERT = "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+
+
+def _write_json(path: Path, data: Any):
+    """Write JSON in one call; without indentation the C encoder does the work."""
+    path.write_bytes(json.dumps(data).encode())
+
+
+def _read_json(path: Path) -> Any:
+    """Read a JSON file written by _write_json."""
+    return json.loads(path.read_bytes())
+
+
+def _hash_buffer() -> memoryview:
+    """Return this thread's reusable read buffer for hashing files."""
+    buffer: Optional[memoryview] = getattr(_hash_buffers, "buffer", None)
+    if buffer is None:
+        buffer = _hash_buffers.buffer = memoryview(bytearray(_HASH_CHUNK_SIZE))
+    return buffer
 
 
 @dataclass
@@ -40,8 +111,12 @@ class SnapshotManager:
         self.snapshots_dir = self.project_dir / ".devstate" / "snapshots"
         self.snapshots_dir.mkdir(parents=True, exist_ok=True)
 
-        # Create metadata file
-        self.metadata_file = self.project_dir / ".devstate" / "snapshots.json"
+        # Content-addressed file store shared by all snapshots
+        self.objects_dir = self.project_dir / ".devstate" / "objects"
+        self.hash_cache_file = self.project_dir / ".devstate" / "index.json"
+
+        # Create metadata index
+        self.metadata_file = self.project_dir / ".devstate" / "snapshots.db"
         self._ensure_metadata_file()
 
     async def create_snapshot(self, description: str = "") -> str:
@@ -59,10 +134,19 @@ class SnapshotManager:
 
         # Create snapshot directory
         snapshot_dir = self.snapshots_dir / snapshot_id
-        snapshot_dir.mkdir(exist_ok=True)
+        snapshot_dir.mkdir(parents=True, exist_ok=True)
 
-        # Copy project files
-        file_count, total_size = await self._copy_project_files(snapshot_dir)
+        # Walk the project once for both the copy and the file list, off the
+        # event loop so callers can overlap other work with the snapshot, then
+        # copy project files; a snapshot cancelled or failed part way through
+        # is removed along with any objects only it had stored
+        try:
+            entries = await asyncio.to_thread(lambda: list(self._walk_project()))
+            file_count, total_size = await self._copy_project_files(snapshot_dir, entries)
+        except BaseException:
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+            self._sweep_objects()
+            raise
 
         # Create metadata
         metadata = {
@@ -70,13 +154,12 @@ class SnapshotManager:
             "file_count": file_count,
             "total_size": total_size,
             "created_at": timestamp.isoformat(),
-            "project_files": await self._get_project_file_list(),
+            "project_files": [relative_path for relative_path, _, _ in entries],
         }
 
         # Save metadata
         metadata_file = snapshot_dir / "metadata.json"
-        with open(metadata_file, "w") as f:
-            json.dump(metadata, f, indent=2)
+        _write_json(metadata_file, metadata)
 
         # Update snapshots index
         await self._add_snapshot_to_index(snapshot_id, metadata)
@@ -101,8 +184,7 @@ class SnapshotManager:
         try:
             # Read metadata
             metadata_file = snapshot_dir / "metadata.json"
-            with open(metadata_file, "r") as f:
-                metadata = json.load(f)
+            metadata = _read_json(metadata_file)
 
             # Create backup of current state before restoration
             backup_id = await self.create_snapshot("Auto-backup before restoration")
@@ -134,10 +216,7 @@ class SnapshotManager:
             return snapshots
 
         try:
-            with open(self.metadata_file, "r") as f:
-                snapshots_data = json.load(f)
-
-            for snapshot_id, metadata in snapshots_data.items():
+            for snapshot_id, metadata in self._read_index().items():
                 snapshot_info = {
                     "id": snapshot_id,
                     "description": metadata.get("description", ""),
@@ -149,9 +228,6 @@ class SnapshotManager:
                 }
                 snapshots.append(snapshot_info)
 
-            # Sort by creation time (newest first)
-            snapshots.sort(key=lambda x: x["created_at"], reverse=True)
-
         except Exception as e:
             print(f"Failed to load snapshots: {str(e)}")
 
@@ -173,8 +249,9 @@ class SnapshotManager:
             return False
 
         try:
-            # Remove snapshot directory
+            # Remove snapshot directory, then any objects it alone referenced
             shutil.rmtree(snapshot_dir)
+            self._sweep_objects()
 
             # Remove from index
             await self._remove_snapshot_from_index(snapshot_id)
@@ -187,180 +264,370 @@ class SnapshotManager:
 
     def _generate_snapshot_id(self) -> str:
         """Generate a unique snapshot ID."""
-        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-        random_suffix = hashlib.md5(f"{timestamp}-{os.getpid()}".encode()).hexdigest()[:8]
-        return f"snapshot-{timestamp}-{random_suffix}"
+        return f"snapshot-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(4)}"
+
+    def _walk_project(self) -> Iterator[Tuple[str, bool, int]]:
+        """
+        Walk the project once, yielding (relative_path, is_dir, size) entries.
+
+        Excluded directories are pruned rather than descended into, and only
+        the known project directories are walked below the top level.
+        """
+        root = str(self.project_dir)
+
+        for dirpath, dirnames, filenames in os.walk(root):
+            relative_dir = os.path.relpath(dirpath, root) if dirpath != root else ""
 
-    async def _copy_project_files(self, snapshot_dir: Path) -> tuple[int, int]:
-        """Copy project files to snapshot directory."""
+            dirnames[:] = [name for name in dirnames if name not in _EXCLUDED_DIRS]
+            for name in dirnames:
+                yield os.path.join(relative_dir, name), True, 0
+
+            for name in filenames:
+                if name in _EXCLUDED_FILES or name.endswith(_EXCLUDED_SUFFIXES):
+                    continue
+                try:
+                    size = os.stat(os.path.join(dirpath, name)).st_size
+                except OSError:
+                    continue
+                yield os.path.join(relative_dir, name), False, size
+
+            if not relative_dir:
+                # Other top-level directories are recorded but not descended into
+                dirnames[:] = [name for name in dirnames if name in _PROJECT_DIRS]
+
+    async def _copy_project_files(
+        self, snapshot_dir: Path, entries: Optional[List[Tuple[str, bool, int]]] = None
+    ) -> tuple[int, int]:
+        """
+        Link project files into the snapshot directory from the object store.
+
+        Each file is stored once per distinct content; the snapshot tree holds
+        hard links to the stored objects, and a manifest.json records the hash
+        and permission bits of every file.
+        """
         file_count = 0
         total_size = 0
+        manifest: Dict[str, Dict[str, Any]] = {}
+
+        if entries is None:
+            entries = list(self._walk_project())
+
+        # Create every directory up front so the file copies can run in parallel
+        files = [(relative_path, size) for relative_path, is_dir, size in entries if not is_dir]
+        directories = {snapshot_dir / relative_path for relative_path, is_dir, _ in entries if is_dir}
+        directories.update((snapshot_dir / relative_path).parent for relative_path, _ in files)
+        for directory in sorted(directories):
+            directory.mkdir(parents=True, exist_ok=True)
+
+        # Files whose size and mtime match the hash cache are not read again;
+        # files modified just before the snapshot started are never cached,
+        # since a same-size edit within the mtime granularity would go unseen
+        hash_cache = self._load_hash_cache()
+        racy_after_ns = time.time_ns() - _RACY_WINDOW_NS
+
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=_COPY_WORKERS) as pool:
+            results = await asyncio.gather(
+                *[
+                    loop.run_in_executor(
+                        pool,
+                        self._snapshot_file,
+                        relative_path,
+                        snapshot_dir / relative_path,
+                        hash_cache.get(relative_path),
+                    )
+                    for relative_path, _ in files
+                ]
+            )
 
-        # Files/directories to exclude
-        exclude_patterns = [
-            ".devstate",
-            ".git",
-            "__pycache__",
-            "*.pyc",
-            ".pytest_cache",
-            ".venv",
-            "node_modules",
-            ".DS_Store",
-        ]
-
-        # Use limited scope scanning to avoid system directories
-        project_dirs = ["cursor-plans", "src", "tests", "docs", "examples"]
-
-        # First, get immediate files
-        for item in self.project_dir.iterdir():
-            # Skip excluded patterns
-            if any(pattern in str(item) for pattern in exclude_patterns):
+        new_hash_cache: Dict[str, Dict[str, Any]] = {}
+        for (relative_path, size), stored in zip(files, results):
+            if stored is None:
                 continue
+            digest, file_stat = stored
+            manifest[relative_path] = {"hash": digest, "mode": stat.S_IMODE(file_stat.st_mode)}
+            if file_stat.st_mtime_ns < racy_after_ns:
+                new_hash_cache[relative_path] = {
+                    "mtime_ns": file_stat.st_mtime_ns,
+                    "size": file_stat.st_size,
+                    "hash": digest,
+                }
+            file_count += 1
+            total_size += size
 
-            # Skip the snapshot directory itself
-            if item.is_relative_to(snapshot_dir):
-                continue
+        _write_json(snapshot_dir / "manifest.json", manifest)
+        _write_json(self.hash_cache_file, new_hash_cache)
+
+        return file_count, total_size
+
+    def _load_hash_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Load the path -> (mtime_ns, size, hash) cache from the previous snapshot."""
+        try:
+            hash_cache: Dict[str, Dict[str, Any]] = _read_json(self.hash_cache_file)
+        except (FileNotFoundError, ValueError):
+            return {}
+        return hash_cache
+
+    def _snapshot_file(
+        self, relative_path: str, target_path: Path, cached: Optional[Dict[str, Any]] = None
+    ) -> Optional[Tuple[str, os.stat_result]]:
+        """Store one project file and link it into a snapshot; None if it cannot be read."""
+        source_path = self.project_dir / relative_path
+        try:
+            file_stat = os.stat(source_path)
+            if (
+                cached is not None
+                and cached["mtime_ns"] == file_stat.st_mtime_ns
+                and cached["size"] == file_stat.st_size
+                and self._object_path(cached["hash"]).exists()
+            ):
+                digest = cached["hash"]
+            else:
+                digest = self._store_object(source_path)
+            try:
+                self._link_object(digest, target_path)
+            except FileNotFoundError:
+                # A concurrent sweep removed the object after it was looked up
+                digest = self._store_object(source_path)
+                self._link_object(digest, target_path)
+        except OSError:
+            return None
+        return digest, file_stat
+
+    def _object_path(self, digest: str) -> Path:
+        """Return the object store location for a content hash."""
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def _store_object(self, source_path: Path) -> str:
+        """Hash a file and add it to the object store unless its content is already there."""
+        digest = self._hash_file(source_path)
+        if not self._object_path(digest).exists():
+            # Copy under a temporary name, hashing what was actually copied, and
+            # move into place so a partial or since-modified copy is never
+            # stored under the wrong hash
+            self.objects_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = self.objects_dir / f"{os.getpid()}-{threading.get_ident()}.tmp"
+            try:
+                digest = self._copy_and_hash(source_path, temp_path)
+                object_path = self._object_path(digest)
+                object_path.parent.mkdir(exist_ok=True)
+                os.replace(temp_path, object_path)
+            finally:
+                temp_path.unlink(missing_ok=True)
+
+        return digest
+
+    def _hash_file(self, source_path: Path) -> str:
+        """Return the content hash of a file."""
+        hasher = hashlib.blake2b(digest_size=16)
+        buffer = _hash_buffer()
+        with open(source_path, "rb", buffering=0) as f:
+            for size in iter(partial(f.readinto, buffer), 0):
+                hasher.update(buffer[:size])
+        return hasher.hexdigest()
+
+    def _copy_and_hash(self, source_path: Path, target_path: Path) -> str:
+        """Copy a file and return the content hash of the bytes written."""
+        hasher = hashlib.blake2b(digest_size=16)
+        buffer = _hash_buffer()
+        with open(source_path, "rb", buffering=0) as src, open(target_path, "wb") as dst:
+            for size in iter(partial(src.readinto, buffer), 0):
+                chunk = buffer[:size]
+                hasher.update(chunk)
+                dst.write(chunk)
+        return hasher.hexdigest()
+
+    def _link_object(self, digest: str, target_path: Path):
+        """Hard link a stored object into a snapshot, copying where links are unsupported."""
+        object_path = self._object_path(digest)
+        try:
+            os.link(object_path, target_path)
+        except OSError:
+            shutil.copyfile(object_path, target_path)
+
+    def _sweep_objects(self):
+        """Remove stored objects that no snapshot references any more.
 
-            relative_path = item.relative_to(self.project_dir)
-            target_path = snapshot_dir / relative_path
-
-            if item.is_file():
-                # Copy file
-                target_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(item, target_path)
-                file_count += 1
-                total_size += item.stat().st_size
-            elif item.is_dir():
-                # Create directory
-                target_path.mkdir(parents=True, exist_ok=True)
-
-        # Then scan specific project directories
-        for dir_name in project_dirs:
-            project_subdir = self.project_dir / dir_name
-            if project_subdir.exists() and project_subdir.is_dir():
+        References are read from the remaining manifests; objects still hard
+        linked elsewhere, such as by a snapshot being created, are kept.
+        """
+        referenced = set()
+        for manifest_file in self.snapshots_dir.glob("*/manifest.json"):
+            try:
+                manifest = _read_json(manifest_file)
+            except (OSError, ValueError):
+                return
+            referenced.update(entry["hash"] for entry in manifest.values())
+
+        for dirpath, _, filenames in os.walk(self.objects_dir):
+            prefix = os.path.basename(dirpath)
+            for name in filenames:
+                if prefix + name in referenced or name.endswith(".tmp"):
+                    continue
+                object_path = os.path.join(dirpath, name)
                 try:
-                    for item in project_subdir.rglob("*"):
-                        # Skip excluded patterns
-                        if any(pattern in str(item) for pattern in exclude_patterns):
-                            continue
-
-                        # Skip the snapshot directory itself
-                        if item.is_relative_to(snapshot_dir):
-                            continue
-
-                        relative_path = item.relative_to(self.project_dir)
-                        target_path = snapshot_dir / relative_path
-
-                        if item.is_file():
-                            # Copy file
-                            target_path.parent.mkdir(parents=True, exist_ok=True)
-                            shutil.copy2(item, target_path)
-                            file_count += 1
-                            total_size += item.stat().st_size
-                        elif item.is_dir():
-                            # Create directory
-                            target_path.mkdir(parents=True, exist_ok=True)
-                except (PermissionError, OSError):
+                    if os.stat(object_path).st_nlink == 1:
+                        os.unlink(object_path)
+                except OSError:
                     continue
 
-        return file_count, total_size
-
     async def _restore_project_files(self, snapshot_dir: Path, project_files: List[str]):
-        """Restore project files from snapshot."""
-        # First, remove existing files (except .devstate)
-        for item in self.project_dir.iterdir():
-            if item.name == ".devstate":
-                continue
+        """Restore project files from snapshot.
 
-            if item.is_file():
-                item.unlink()
-            elif item.is_dir():
-                shutil.rmtree(item)
+        The snapshot is materialised in a staging tree under .devstate first, so
+        the live project is only touched once every file has been copied.
+        """
+        token = secrets.token_hex(4)
+        staging_dir = self.project_dir / ".devstate" / f"restore-{token}"
+        replaced_dir = self.project_dir / ".devstate" / f"replaced-{token}"
+        staging_dir.mkdir(parents=True)
 
+        swapped = False
+        try:
+            await self._materialize_snapshot(snapshot_dir, project_files, staging_dir)
+            self._swap_project_tree(staging_dir, replaced_dir)
+            swapped = True
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            if swapped:
+                shutil.rmtree(replaced_dir, ignore_errors=True)
+            else:
+                # A failed swap puts the original entries back; the directory is
+                # only left behind if that did not succeed, so nothing is lost
+                with suppress(OSError):
+                    replaced_dir.rmdir()
+
+    async def _materialize_snapshot(self, snapshot_dir: Path, project_files: List[str], target_root: Path):
+        """Write a snapshot's files and directories under target_root."""
         # Separate files and directories
         files = [f for f in project_files if not (snapshot_dir / f).is_dir()]
         directories = [d for d in project_files if (snapshot_dir / d).is_dir()]
 
-        # First restore directories
-        for dir_path in directories:
-            source_path = snapshot_dir / dir_path
-            target_path = self.project_dir / dir_path
+        # First recreate directories, each once; every file inside them is listed too
+        target_dirs = {target_root / dir_path for dir_path in directories}
+        target_dirs.update((target_root / file_path).parent for file_path in files)
+        for directory in sorted(target_dirs):
+            directory.mkdir(parents=True, exist_ok=True)
+
+        # Then restore individual files in parallel, as copies so later edits
+        # cannot change the stored objects
+        manifest = self._read_manifest(snapshot_dir)
+
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=_COPY_WORKERS) as pool:
+            await asyncio.gather(
+                *[
+                    loop.run_in_executor(
+                        pool, self._restore_file, snapshot_dir, file_path, manifest.get(file_path), target_root
+                    )
+                    for file_path in files
+                ]
+            )
 
-            if source_path.exists():
-                target_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copytree(source_path, target_path, dirs_exist_ok=True)
+    def _swap_project_tree(self, staging_dir: Path, replaced_dir: Path):
+        """Move the live top-level entries aside and rename the staged ones into place.
 
-        # Then restore individual files
-        for file_path in files:
-            source_path = snapshot_dir / file_path
-            target_path = self.project_dir / file_path
+        Directories that snapshots never capture (.devstate, .git, virtualenvs, ...)
+        stay where they are. If any rename fails, the original entries are put back.
+        """
+        replaced_dir.mkdir()
+        moved: List[str] = []
+        placed: List[str] = []
 
-            if source_path.exists():
-                target_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(source_path, target_path)
+        try:
+            for item in list(self.project_dir.iterdir()):
+                if item.name in _EXCLUDED_DIRS:
+                    continue
+                os.replace(item, replaced_dir / item.name)
+                moved.append(item.name)
+
+            for item in list(staging_dir.iterdir()):
+                os.replace(item, self.project_dir / item.name)
+                placed.append(item.name)
+        except OSError:
+            for name in placed:
+                target = self.project_dir / name
+                if target.is_dir() and not target.is_symlink():
+                    shutil.rmtree(target)
+                else:
+                    target.unlink()
+            for name in moved:
+                os.replace(replaced_dir / name, self.project_dir / name)
+            raise
+
+    def _restore_file(self, snapshot_dir: Path, file_path: str, entry: Optional[Dict[str, Any]], target_root: Path):
+        """Copy one file from the object store or the snapshot tree to target_root."""
+        target_path = target_root / file_path
+
+        source_path = snapshot_dir / file_path
+
+        if entry is not None:
+            object_path = self._object_path(entry["hash"])
+            shutil.copyfile(object_path if object_path.exists() else source_path, target_path)
+            os.chmod(target_path, entry["mode"])
+            return
+
+        if source_path.exists():
+            shutil.copy2(source_path, target_path)
+
+    def _read_manifest(self, snapshot_dir: Path) -> Dict[str, Dict[str, Any]]:
+        """Read a snapshot's object manifest; snapshots taken before the store have none."""
+        try:
+            manifest: Dict[str, Dict[str, Any]] = _read_json(snapshot_dir / "manifest.json")
+        except FileNotFoundError:
+            return {}
+        return manifest
 
     async def _get_project_file_list(self) -> List[str]:
         """Get list of project files (relative paths)."""
-        files = []
-
-        exclude_patterns = [
-            ".devstate",
-            ".git",
-            "__pycache__",
-            "*.pyc",
-            ".pytest_cache",
-            ".venv",
-            "node_modules",
-            ".DS_Store",
-        ]
-
-        # Use limited scope scanning to avoid system directories
-        project_dirs = ["cursor-plans", "src", "tests", "docs", "examples"]
-
-        # First, get immediate files
-        for item in self.project_dir.iterdir():
-            # Skip excluded patterns
-            if any(pattern in str(item) for pattern in exclude_patterns):
-                continue
+        return [relative_path for relative_path, _, _ in self._walk_project()]
 
-            if item.is_file() or item.is_dir():
-                relative_path = item.relative_to(self.project_dir)
-                files.append(str(relative_path))
+    def _connect(self) -> sqlite3.Connection:
+        """Open the snapshot index database."""
+        conn = sqlite3.connect(self.metadata_file)
+        conn.row_factory = sqlite3.Row
+        return conn
 
-        # Then scan specific project directories
-        for dir_name in project_dirs:
-            project_subdir = self.project_dir / dir_name
-            if project_subdir.exists() and project_subdir.is_dir():
-                try:
-                    for item in project_subdir.rglob("*"):
-                        # Skip excluded patterns
-                        if any(pattern in str(item) for pattern in exclude_patterns):
-                            continue
-
-                        if item.is_file() or item.is_dir():
-                            relative_path = item.relative_to(self.project_dir)
-                            files.append(str(relative_path))
-                except (PermissionError, OSError):
-                    continue
+    def _ensure_metadata_file(self):
+        """Ensure the snapshots metadata index exists."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_INDEX_SCHEMA)
+
+            # Carry over snapshots recorded in the JSON index used previously
+            legacy_file = self.metadata_file.with_suffix(".json")
+            if legacy_file.exists():
+                legacy_data = _read_json(legacy_file)
+                conn.executemany(
+                    _INDEX_UPSERT,
+                    [self._index_row(snapshot_id, metadata) for snapshot_id, metadata in legacy_data.items()],
+                )
+                legacy_file.unlink()
+
+    def _index_row(self, snapshot_id: str, metadata: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Convert snapshot metadata to an index row."""
+        extra = {
+            key: value for key, value in metadata.items() if key not in _INDEX_COLUMNS and key not in _UNINDEXED_KEYS
+        }
+        return (snapshot_id, *(metadata.get(column) for column in _INDEX_COLUMNS), json.dumps(extra))
 
-        return files
+    def _row_metadata(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert an index row back to snapshot metadata."""
+        metadata = {column: row[column] for column in _INDEX_COLUMNS if row[column] is not None}
+        metadata.update(json.loads(row["extra_json"] or "{}"))
+        return metadata
 
-    def _ensure_metadata_file(self):
-        """Ensure the snapshots metadata file exists."""
-        if not self.metadata_file.exists():
-            with open(self.metadata_file, "w") as f:
-                json.dump({}, f)
+    def _read_index(self) -> Dict[str, Dict[str, Any]]:
+        """Read the whole snapshot index, newest snapshot first."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT * FROM snapshots ORDER BY created_at DESC").fetchall()
+        return {row["id"]: self._row_metadata(row) for row in rows}
 
     async def _add_snapshot_to_index(self, snapshot_id: str, metadata: Dict[str, Any]):
         """Add snapshot to the metadata index."""
         try:
-            with open(self.metadata_file, "r") as f:
-                snapshots_data = json.load(f)
-
-            snapshots_data[snapshot_id] = metadata
-
-            with open(self.metadata_file, "w") as f:
-                json.dump(snapshots_data, f, indent=2)
+            with closing(self._connect()) as conn, conn:
+                conn.execute(_INDEX_UPSERT, self._index_row(snapshot_id, metadata))
 
         except Exception as e:
             print(f"Failed to update snapshot index: {str(e)}")
@@ -368,14 +635,8 @@ class SnapshotManager:
     async def _remove_snapshot_from_index(self, snapshot_id: str):
         """Remove snapshot from the metadata index."""
         try:
-            with open(self.metadata_file, "r") as f:
-                snapshots_data = json.load(f)
-
-            if snapshot_id in snapshots_data:
-                del snapshots_data[snapshot_id]
-
-            with open(self.metadata_file, "w") as f:
-                json.dump(snapshots_data, f, indent=2)
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM snapshots WHERE id = ?", (snapshot_id,))
 
         except Exception as e:
             print(f"Failed to remove snapshot from index: {str(e)}")
@@ -383,14 +644,12 @@ class SnapshotManager:
     async def _update_snapshot_metadata(self, snapshot_id: str, updates: Dict[str, Any]):
         """Update snapshot metadata."""
         try:
-            with open(self.metadata_file, "r") as f:
-                snapshots_data = json.load(f)
-
-            if snapshot_id in snapshots_data:
-                snapshots_data[snapshot_id].update(updates)
-
-            with open(self.metadata_file, "w") as f:
-                json.dump(snapshots_data, f, indent=2)
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute("SELECT * FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+                if row is not None:
+                    metadata = self._row_metadata(row)
+                    metadata.update(updates)
+                    conn.execute(_INDEX_UPSERT, self._index_row(snapshot_id, metadata))
 
         except Exception as e:
             print(f"Failed to update snapshot metadata: {str(e)}")
@@ -407,8 +666,7 @@ class SnapshotManager:
             return None
 
         try:
-            with open(metadata_file, "r") as f:
-                metadata = json.load(f)
+            metadata = _read_json(metadata_file)
 
             return {"id": snapshot_id, "directory": str(snapshot_dir), **metadata}
 
@@ -1,10 +1,47 @@
 """Schema validation for development plan files."""
 
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, FrozenSet, List, Optional, Union
 
 import yaml
 from pydantic import BaseModel, Field, field_validator
 
+try:
+    from yaml import CSafeDumper as _YamlDumper
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as _YamlDumper
+    from yaml import SafeLoader as _YamlLoader
+
+# Templates accepted in resources.files: those actually implemented, plus
+# referenced templates that are not implemented yet but allowed
+_ALLOWED_TEMPLATES: FrozenSet[str] = frozenset(
+    {
+        # Implemented
+        "fastapi_main",
+        "fastapi_model",
+        "requirements",
+        "basic",
+        "stub",
+        "dotnet_program",
+        "dotnet_controller",
+        "ef_dbcontext",
+        "dotnet_service",
+        "dotnet_csproj",
+        # Referenced
+        "basic_readme",
+        "python_main",
+        "sqlalchemy_models",
+        "jwt_auth",
+        "fastapi_requirements",
+        "vue_main",
+        "vue_app",
+        "vue_router",
+        "pinia_store",
+        "vue_component",
+        "vue_package_json",
+    }
+)
+
 
 class Project(BaseModel):
     """Project metadata."""
@@ -63,6 +100,7 @@ class Phase(BaseModel):
     description: Optional[str] = None
     dependencies: Optional[List[str]] = Field(default_factory=list)
     tasks: List[str] = Field(..., description="Phase tasks")
+    task_dependencies: Optional[Dict[str, List[str]]] = Field(default_factory=dict)
 
 
 class Validation(BaseModel):
@@ -104,43 +142,17 @@ class DevelopmentPlan(BaseModel):
     @classmethod
     def validate_resources(cls, v):
         """Validate resource templates."""
-        # Actually implemented templates
-        implemented_templates = [
-            "fastapi_main",
-            "fastapi_model",
-            "requirements",
-            "basic",
-            "stub",
-            "dotnet_program",
-            "dotnet_controller",
-            "ef_dbcontext",
-            "dotnet_service",
-            "dotnet_csproj",
-        ]
-
-        # Referenced templates (not yet implemented but allowed)
-        referenced_templates = [
-            "basic_readme",
-            "python_main",
-            "sqlalchemy_models",
-            "jwt_auth",
-            "fastapi_requirements",
-            "vue_main",
-            "vue_app",
-            "vue_router",
-            "pinia_store",
-            "vue_component",
-            "vue_package_json",
-        ]
-
-        # All allowed templates
-        allowed_templates = implemented_templates + referenced_templates
-
-        for file in v.files:
-            if not file.template.startswith("custom_") and file.template not in allowed_templates:
-                raise ValueError(
-                    f"Unknown template '{file.template}'. Use 'custom_{file.template}' for custom templates"
-                )
+        unknown = list(
+            dict.fromkeys(
+                file.template
+                for file in v.files
+                if not file.template.startswith("custom_") and file.template not in _ALLOWED_TEMPLATES
+            )
+        )
+        if unknown:
+            names = ", ".join(f"'{template}'" for template in unknown)
+            suggestions = ", ".join(f"'custom_{template}'" for template in unknown)
+            raise ValueError(f"Unknown template {names}. Use {suggestions} for custom templates")
         return v
 
 
@@ -152,12 +164,12 @@ def validate_plan_content(content: str) -> tuple[bool, str, Optional[Development
     """
     try:
         # Parse YAML
-        data = yaml.safe_load(content)
+        data = yaml.load(content, Loader=_YamlLoader)
         if not data:
             return False, "Empty plan content", None
 
         # Validate against schema
-        plan = DevelopmentPlan(**data)
+        plan = DevelopmentPlan.model_validate(data)
         return True, "", plan
 
     except yaml.YAMLError as e:
@@ -174,10 +186,10 @@ def create_validated_plan_content(plan_data: Dict[str, Any]) -> str:
             plan_data["schema_version"] = "1.0"
 
         # Validate and create plan
-        plan = DevelopmentPlan(**plan_data)
+        plan = DevelopmentPlan.model_validate(plan_data)
 
         # Convert back to YAML
-        return yaml.dump(plan.dict(), default_flow_style=False, sort_keys=False)
+        return yaml.dump(plan.model_dump(), Dumper=_YamlDumper, default_flow_style=False, sort_keys=False)
 
     except Exception as e:
         raise ValueError(f"Failed to create validated plan: {str(e)}")
@@ -1,18 +1,30 @@
 """Cursor Plans MCP Server - Development Planning DSL for Cursor."""
 
+import copy
+import errno
+import functools
 import json
 import os
+import re
+import shutil
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
 
 import anyio
 import click
 import mcp.types as types
+import yaml
 from mcp.server.lowlevel import Server
 
-from .execution import PlanExecutor
+from .execution import ExecutionResult, PlanExecutor
+from .schema import validate_plan_content
 from .validation import ValidationEngine
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
 # Message templates for consistent user communication
 PLAN_CREATION_SUCCESS_TEMPLATE = """✅ **Development Plan Created**
 
@@ -77,6 +89,41 @@ INIT_SUCCESS_TEMPLATE = """🚀 **Development Planning Initialized**
    ```
 """
 
+DRY_RUN_HEADER_TEMPLATE = "🔍 **Dry Run Results**\n\n✅ Would execute {phase_count} phases:\n"
+
+EXECUTION_SUCCESS_HEADER_TEMPLATE = "✅ **Plan Execution Completed**\n\n🎯 **Executed {phase_count} phases:**\n"
+
+EXECUTION_FAILURE_HEADER_TEMPLATE = "❌ **Plan Execution Failed**\n\n🚫 **Error:** {error}\n"
+
+EXECUTION_ERROR_TEMPLATE = (
+    "❌ **Execution error:** {error}\n\nThis may indicate a configuration issue with the execution system."
+)
+
+VALIDATION_ERROR_TEMPLATE = (
+    "❌ Validation engine error: {error}\n\nThis may indicate a configuration issue with the validation system."
+)
+
+PERMISSION_ERROR_TEMPLATE = """❌ **Permission Error:** {error}
+
+**Troubleshooting:**
+• Check if you have write permissions in the current directory
+• Try running Cursor with elevated permissions if needed
+• Ensure the target directory is not read-only
+• Check if any files are locked by other processes"""
+
+OS_ERROR_TEMPLATE = """❌ **OS Error:** {error}
+
+**Troubleshooting:**
+• Check disk space and file system permissions
+• Ensure the target path is valid and accessible
+• Try creating the directory manually first"""
+
+# Plan execution error messages by errno; anything else gets OS_ERROR_TEMPLATE
+_OS_ERROR_TEMPLATES = {
+    errno.EACCES: PERMISSION_ERROR_TEMPLATE,
+    errno.EPERM: PERMISSION_ERROR_TEMPLATE,
+}
+
 BASE_PLAN_TEMPLATE = """schema_version: "1.0"
 # Development Plan: {name}
 
@@ -129,951 +176,1190 @@ validation:
     - syntax_check
 """
 
-# Global state to store project context
-_project_context: dict[str, Any] = {}
+FASTAPI_PLAN_TEMPLATE = """schema_version: "1.0"
+# Development Plan: {name}
 
+project:
+  name: "{name}"
+  version: "0.1.0"
+  description: "FastAPI web service with database"
 
-@click.command()
-@click.option("--port", default=8000, help="Port to listen on for SSE")
-@click.option(
-    "--transport",
-    type=click.Choice(["stdio", "sse"]),
-    default="stdio",
-    help="Transport type",
-)
-def main(port: int, transport: str) -> int:
-    """Main entry point for the Cursor Plans MCP server."""
-    app = Server("cursor-plans-mcp")
+target_state:
+  architecture:
+    - language: "Python"
+    - framework: "FastAPI"
+    - database: "SQLAlchemy"
+    - auth: "JWT"
 
-    @app.list_tools()
-    async def list_tools() -> list[types.Tool]:
-        """List all available development planning tools."""
-        return [
-            types.Tool(
-                name="plan_init",
-                title="Initialize Development Planning",
-                description="Initialize development planning",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "context": {
-                            "type": "string",
-                            "description": (
-                                "Path to YAML context file containing project configuration and file patterns"
-                            ),
-                        },
-                        "project_directory": {
-                            "type": "string",
-                            "description": "Project directory (default: current working directory)",
-                            "default": ".",
-                        },
-                        "reset": {
-                            "type": "boolean",
-                            "description": "Reset/start over: purge all .devplan files and reset context",
-                            "default": False,
-                        },
-                    },
-                    "required": ["context"],
-                },
-            ),
-            types.Tool(
-                name="plan_prepare",
-                title="Prepare Development Plan",
-                description="Create a development plan from templates",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "name": {
-                            "type": "string",
-                            "description": "Name of the development plan to create",
-                            "default": "project",
-                        },
-                        "template": {
-                            "type": "string",
-                            "description": "Template to use (basic, fastapi, dotnet, vuejs)",
-                            "default": "basic",
-                        },
-                    },
-                    "required": [],
-                },
-            ),
-            types.Tool(
-                name="plan_validate",
-                title="Validate Development Plan",
-                description="Validate development plan syntax, logic, and compliance",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "plan_file": {
-                            "type": "string",
-                            "description": "Path to .devplan file (default: ./.cursorplans/project.devplan)",
-                            "default": "./project.devplan",
-                        },
-                        "strict_mode": {
-                            "type": "boolean",
-                            "description": "If true, warnings are treated as errors",
-                            "default": False,
-                        },
-                        "check_cursor_rules": {
-                            "type": "boolean",
-                            "description": "If true, validate against .cursorrules file",
-                            "default": True,
-                        },
-                    },
-                },
-            ),
-            types.Tool(
-                name="plan_apply",
-                title="Apply Development Plan",
-                description="Execute a development plan to create/modify files",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "plan_file": {
-                            "type": "string",
-                            "description": "Path to .devplan file (default: ./.cursorplans/project.devplan)",
-                            "default": "./project.devplan",
-                        },
-                        "dry_run": {
-                            "type": "boolean",
-                            "description": "Show what would be executed without making changes",
-                            "default": False,
-                        },
-                    },
-                },
-            ),
-        ]
+  features:
+    - api_endpoints
+    - database_models
+    - authentication
+    - documentation
+    - testing
 
-    @app.call_tool()
-    async def call_tool(name: str, arguments: dict[str, Any]) -> list[types.ContentBlock]:
-        """Handle tool calls for development planning operations."""
+resources:
+  files:
+    - path: "src/main.py"
+      type: "entry_point"
+      template: "fastapi_main"
+    - path: "src/models.py"
+      type: "data_model"
+      template: "fastapi_model"
+    - path: "requirements.txt"
+      type: "dependencies"
+      template: "requirements"
 
-        if name == "plan_init":
-            return await init_dev_planning(arguments)
-        elif name == "plan_prepare":
-            return await prepare_dev_plan(arguments)
-        elif name == "plan_validate":
-            return await validate_dev_plan(arguments)
-        elif name == "plan_apply":
-            return await apply_dev_plan(arguments)
-        else:
-            raise ValueError(f"Unknown tool: {name}")
+  dependencies:
+    - "fastapi>=0.104.0"
+    - "uvicorn>=0.24.0"
+    - "sqlalchemy>=2.0.0"
+    - "pyjwt>=2.8.0"
+    - "python-multipart>=0.0.6"
 
-    # Transport setup
-    if transport == "sse":
-        from mcp.server.sse import SseServerTransport
-        from starlette.applications import Starlette
-        from starlette.requests import Request
-        from starlette.responses import Response
-        from starlette.routing import Mount, Route
+phases:
+  foundation:
+    priority: 1
+    tasks:
+      - setup_project_structure
+      - install_dependencies
 
-        sse = SseServerTransport("/messages/")
+  data_layer:
+    priority: 2
+    dependencies: ["foundation"]
+    tasks:
+      - create_models
+      - setup_database
 
-        async def handle_sse(request: Request):
-            async with sse.connect_sse(request.scope, request.receive, request._send) as streams:
-                await app.run(streams[0], streams[1], app.create_initialization_options())
-            return Response()
+  api_layer:
+    priority: 3
+    dependencies: ["data_layer"]
+    tasks:
+      - create_endpoints
+      - add_validation
 
-        starlette_app = Starlette(
-            debug=True,
-            routes=[
-                Route("/sse", endpoint=handle_sse, methods=["GET"]),
-                Mount("/messages/", app=sse.handle_post_message),
-            ],
-        )
+  security:
+    priority: 4
+    dependencies: ["api_layer"]
+    tasks:
+      - implement_jwt
+      - add_auth_middleware
 
-        import uvicorn
+  testing:
+    priority: 5
+    dependencies: ["security"]
+    tasks:
+      - unit_tests
+      - integration_tests
 
-        uvicorn.run(starlette_app, host="127.0.0.1", port=port)
-    else:
-        from mcp.server.stdio import stdio_server
+validation:
+  pre_apply:
+    - syntax_check
+    - dependency_check
 
-        async def arun():
-            async with stdio_server() as streams:
-                await app.run(streams[0], streams[1], app.create_initialization_options())
+  post_apply:
+    - api_test_validation
+"""
 
-        anyio.run(arun)
+DOTNET_PLAN_TEMPLATE = """schema_version: "1.0"
+# Development Plan: {name}
 
-    return 0
+project:
+  name: "{name}"
+  version: "0.1.0"
+  description: ".NET 8 Web API with Entity Framework"
 
+target_state:
+  architecture:
+    - language: "C#"
+    - framework: ".NET 8"
+    - type: "Web API"
+    - database: "Entity Framework Core"
+    - auth: "JWT Bearer"
 
-async def prepare_dev_plan(arguments: dict[str, Any]) -> list[types.ContentBlock]:
-    """Create a development plan using stored context information."""
-    global _project_context
+  features:
+    - web_api
+    - entity_framework
+    - jwt_authentication
+    - swagger_documentation
+    - unit_testing
 
-    name = arguments.get("name", "project")
-    template = arguments.get("template", "basic")
+resources:
+  files:
+    - path: "Program.cs"
+      type: "entry_point"
+      template: "dotnet_program"
+    - path: "Controllers/BaseController.cs"
+      type: "api_controller"
+      template: "dotnet_controller"
+    - path: "Data/AppDbContext.cs"
+      type: "data_context"
+      template: "ef_dbcontext"
+    - path: "Services/AuthService.cs"
+      type: "service_interface"
+      template: "dotnet_service"
+    - path: "{name}.csproj"
+      type: "project_file"
+      template: "dotnet_csproj"
 
-    # Use stored project context if available
-    if not _project_context:
-        return [
-            types.TextContent(
-                type="text",
-                text=(
-                    "❌ **Error**: No project context found. Please run plan_init first.\n\n"
-                    'Usage: plan_init context="project-context.yaml"'
-                ),
-            )
-        ]
+  dependencies:
+    - name: "Microsoft.AspNetCore.Authentication.JwtBearer"
+      version: "8.0.0"
+    - name: "Microsoft.EntityFrameworkCore.SqlServer"
+      version: "8.0.0"
+    - name: "Swashbuckle.AspNetCore"
+      version: "6.5.0"
 
-    # Use the stored cursorplans_dir from context, or fall back to project directory
-    cursorplans_dir = Path(
-        _project_context.get("cursorplans_dir", _project_context.get("project_directory", ".") + "/.cursorplans")
-    )
-    project_path = cursorplans_dir.parent
+phases:
+  foundation:
+    priority: 1
+    tasks:
+      - setup_project_structure
+      - install_dependencies
 
-    # Ensure .cursorplans directory exists
-    if not cursorplans_dir.exists():
-        cursorplans_dir.mkdir(exist_ok=True)
+  data_layer:
+    priority: 2
+    dependencies: ["foundation"]
+    tasks:
+      - create_models
+      - setup_entity_framework
 
-    # Create the development plan
-    plan_creation_result = await _create_plan_file(
-        name,
-        template,
-        project_path,
-        cursorplans_dir,
-        _project_context.get("project_name", name),
-        _project_context.get("project_type", "unknown"),
-        _project_context.get("project_description", "A software project"),
-        _project_context.get("objectives", []),
-        _project_context.get("architecture_notes", []),
-        _project_context.get("context_files", []),
-    )
+  api_layer:
+    priority: 3
+    dependencies: ["data_layer"]
+    tasks:
+      - create_endpoints
+      - add_controllers
 
-    # Generate success message
-    if plan_creation_result["success"]:
-        success_message = PLAN_CREATION_SUCCESS_TEMPLATE.format(
-            plan_file=plan_creation_result["plan_file"], name=name, template=template
-        )
-    else:
-        success_message = PLAN_CREATION_FAILURE_TEMPLATE.format(error=plan_creation_result["error"])
+  security:
+    priority: 4
+    dependencies: ["api_layer"]
+    tasks:
+      - implement_jwt
+      - add_auth_middleware
 
-    return [types.TextContent(type="text", text=success_message)]
+  testing:
+    priority: 5
+    dependencies: ["security"]
+    tasks:
+      - unit_tests
+      - integration_tests
 
+validation:
+  pre_apply:
+    - syntax_check
+    - dependency_check
 
-async def init_dev_planning(arguments: dict[str, Any]) -> list[types.ContentBlock]:
-    """Initialize development planning."""
-    import shutil
-    from pathlib import Path
+  post_apply:
+    - build_test
+"""
 
-    import yaml
+VUEJS_PLAN_TEMPLATE = """schema_version: "1.0"
+# Development Plan: {name}
 
-    global _project_context
+project:
+  name: "{name}"
+  version: "0.1.0"
+  description: "Vue.js frontend application"
 
-    context_file = arguments.get("context")
-    project_directory = arguments.get("project_directory", ".")
-    reset = arguments.get("reset", False)
+target_state:
+  architecture:
+    - language: "TypeScript"
+    - framework: "Vue 3"
+    - build_tool: "Vite"
+    - state_management: "Pinia"
+    - ui_framework: "Vuetify"
+    - testing: "Vitest + Vue Test Utils"
 
-    if not context_file:
-        return [
-            types.TextContent(
-                type="text",
-                text=(
-                    '❌ **Error**: Context file path is required.\n\nUsage: dev_plan_init context="sample.context.yaml"'
-                ),
-            )
-        ]
+  features:
+    - component_library
+    - routing
+    - state_management
+    - api_integration
+    - responsive_design
+    - unit_testing
 
-    # Load and parse the context file
-    try:
-        context_path = Path(context_file)
-        if not context_path.exists():
-            return [
-                types.TextContent(
-                    type="text",
-                    text=f"❌ **Error**: Context file not found: {context_file}",
-                )
-            ]
+resources:
+  files:
+    - path: "src/main.ts"
+      type: "entry_point"
+      template: "vue_main"
+    - path: "src/App.vue"
+      type: "root_component"
+      template: "vue_app"
+    - path: "src/router/index.ts"
+      type: "router_config"
+      template: "vue_router"
+    - path: "src/stores/main.ts"
+      type: "state_store"
+      template: "pinia_store"
+    - path: "src/components/HelloWorld.vue"
+      type: "component"
+      template: "vue_component"
+    - path: "package.json"
+      type: "dependencies"
+      template: "vue_package_json"
 
-        with open(context_path, "r") as f:
-            context_config = yaml.safe_load(f)
+  dependencies:
+    - name: "vue"
+      version: "^3.4.0"
+    - name: "vue-router"
+      version: "^4.2.0"
+    - name: "pinia"
+      version: "^2.1.0"
+    - name: "vuetify"
+      version: "^3.5.0"
+    - name: "axios"
+      version: "^1.6.0"
 
-        if not context_config or "project" not in context_config:
-            return [
-                types.TextContent(
-                    type="text",
-                    text=f"❌ **Error**: Invalid context file format. Missing 'project' section in {context_file}",
-                )
-            ]
+phases:
+  foundation:
+    priority: 1
+    tasks:
+      - setup_vite_project
+      - configure_typescript
+      - setup_vuetify
 
-    except yaml.YAMLError as e:
-        return [
-            types.TextContent(
-                type="text",
-                text=f"❌ **Error**: Invalid YAML in context file: {str(e)}",
-            )
-        ]
-    except Exception as e:
-        return [types.TextContent(type="text", text=f"❌ **Error**: Could not read context file: {str(e)}")]
+  routing:
+    priority: 2
+    dependencies: ["foundation"]
+    tasks:
+      - configure_vue_router
+      - create_route_components
+      - implement_navigation
 
-    # Extract project configuration
-    project_config = context_config["project"]
-    # Use parameter project_directory if provided, otherwise use context file directory
-    if arguments.get("project_directory") and arguments.get("project_directory") != ".":
-        project_directory = arguments.get("project_directory")
-    else:
-        project_directory = project_config.get("directory", ".")
-    project_name = project_config.get("name", "unknown")
-    project_type = project_config.get("type", "unknown")
-    project_description = project_config.get("description", "")
-    project_objectives = project_config.get("objectives", [])
-    architecture_notes = project_config.get("architecture_notes", [])
+  state_management:
+    priority: 3
+    dependencies: ["routing"]
+    tasks:
+      - setup_pinia_stores
+      - implement_state_logic
+      - connect_components_to_store
 
-    # Resolve the project directory
-    if project_directory == "." or not project_directory:
-        project_directory = os.getcwd()
+  components:
+    priority: 4
+    dependencies: ["state_management"]
+    tasks:
+      - create_reusable_components
+      - implement_forms
+      - add_data_tables
 
-    project_path = Path(project_directory).resolve()
+  api_integration:
+    priority: 5
+    dependencies: ["components"]
+    tasks:
+      - setup_axios_client
+      - implement_api_services
+      - handle_authentication
 
-    # Handle reset functionality
-    if reset:
-        cursorplans_dir = project_path / ".cursorplans"
-        context_files = []
+  testing:
+    priority: 6
+    dependencies: ["api_integration"]
+    tasks:
+      - unit_tests
+      - component_tests
+      - e2e_tests
 
-        # Collect all files to be removed
-        if cursorplans_dir.exists():
-            for file in cursorplans_dir.glob("*.devplan"):
-                context_files.append(str(file))
-            for file in cursorplans_dir.glob("*.yaml"):
-                context_files.append(str(file))
+validation:
+  pre_apply:
+    - typescript_check
+    - vue_template_validation
+    - dependency_audit
+"""
 
-        # Remove .cursorplans directory and all contents
-        if cursorplans_dir.exists():
-            shutil.rmtree(cursorplans_dir)
+# Plan templates selectable by name; anything else gets a context-aware plan
+_PLAN_TEMPLATES: Dict[str, str] = {
+    "basic": BASE_PLAN_TEMPLATE,
+    "fastapi": FASTAPI_PLAN_TEMPLATE,
+    "dotnet": DOTNET_PLAN_TEMPLATE,
+    "vuejs": VUEJS_PLAN_TEMPLATE,
+}
 
-        # Reset global context
-        _project_context = {}
+# Global state to store project context
+_project_context: dict[str, Any] = {}
 
-        # Create fresh .cursorplans directory
-        cursorplans_dir.mkdir(exist_ok=True)
+# ValidationEngine shared by validate calls, built on first use
+_validation_engine: Optional[ValidationEngine] = None
 
-        reset_output = RESET_COMPLETE_TEMPLATE.format(
-            project_path=project_path, file_count=len(context_files), cursorplans_dir=cursorplans_dir
-        )
-        return [types.TextContent(type="text", text=reset_output)]
+# Number of project directories whose PlanExecutor is kept between apply calls
+_PLAN_EXECUTOR_CACHE_SIZE = 16
 
-    # Scan for context files based on the YAML configuration
-    context_files = context_config.get("context_files", {})
-    scanned_files = []
+# Project directories scanned when detecting a codebase without context files
+_DETECTION_DIRS = frozenset({"cursor-plans", "src", "tests", "docs", "examples"})
 
-    # Process each category of context files
-    for category, patterns in context_files.items():
-        for pattern in patterns:
-            try:
-                # Handle glob patterns
-                if pattern.endswith("/"):
-                    # For directory patterns, search recursively for files
-                    matches = list(project_path.glob(pattern + "**/*"))
-                else:
-                    matches = list(project_path.glob(pattern))
+# Directories pruned from codebase detection wherever they appear
+_DETECTION_SKIP_DIRS = frozenset({"node_modules", ".git", "__pycache__", ".pytest_cache", ".venv"})
 
-                for match in matches:
-                    if match.is_file():
-                        rel_path = str(match.relative_to(project_path))
-                        scanned_files.append(f"{category}: {rel_path}")
-            except Exception:
-                # Skip invalid patterns
-                continue
+# Characters that make a glob component match more than one name
+_GLOB_CHARS = frozenset("*?[")
 
-    # Store enhanced project context in global state
-    _project_context = {
-        "project_directory": str(project_path),
-        "project_name": project_name,
-        "project_type": project_type,
-        "project_description": project_description,
-        "objectives": project_objectives,
-        "architecture_notes": architecture_notes,
-        "context_files": scanned_files,
-        "cursorplans_dir": str(project_path / ".cursorplans"),
-        "context_config_path": str(context_path.resolve()),
-    }
+# Characters escaped inside a glob [...] set so the regex set stays literal
+_GLOB_SET_SPECIAL_RE = re.compile(r"([&~|\[\\])")
 
-    # Create .cursorplans directory
-    cursorplans_dir = project_path / ".cursorplans"
-    try:
-        cursorplans_dir.mkdir(exist_ok=True)
-    except FileNotFoundError:
-        return [
-            types.TextContent(
-                type="text",
-                text=f"❌ **Error**: Project directory does not exist: {project_directory}",
-            )
-        ]
 
-    # Generate comprehensive initialization output
-    objectives_text = ""
-    if project_objectives:
-        objectives_text = f"""
-🎯 **Project Objectives**:
-{chr(10).join(f"  • {obj}" for obj in project_objectives)}"""
+# Tool definitions advertised to clients; built once since they never change
+_TOOLS: list[types.Tool] = [
+    types.Tool(
+        name="plan_init",
+        title="Initialize Development Planning",
+        description="Initialize development planning",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "context": {
+                    "type": "string",
+                    "description": "Path to YAML context file containing project configuration and file patterns",
+                },
+                "project_directory": {
+                    "type": "string",
+                    "description": "Project directory (default: current working directory)",
+                    "default": ".",
+                },
+                "reset": {
+                    "type": "boolean",
+                    "description": "Reset/start over: purge all .devplan files and reset context",
+                    "default": False,
+                },
+            },
+            "required": ["context"],
+        },
+    ),
+    types.Tool(
+        name="plan_prepare",
+        title="Prepare Development Plan",
+        description="Create a development plan from templates",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type": "string",
+                    "description": "Name of the development plan to create",
+                    "default": "project",
+                },
+                "template": {
+                    "type": "string",
+                    "description": "Template to use (basic, fastapi, dotnet, vuejs)",
+                    "default": "basic",
+                },
+            },
+            "required": [],
+        },
+    ),
+    types.Tool(
+        name="plan_validate",
+        title="Validate Development Plan",
+        description="Validate development plan syntax, logic, and compliance",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "plan_file": {
+                    "type": "string",
+                    "description": "Path to .devplan file (default: ./.cursorplans/project.devplan)",
+                    "default": "./project.devplan",
+                },
+                "strict_mode": {
+                    "type": "boolean",
+                    "description": "If true, warnings are treated as errors",
+                    "default": False,
+                },
+                "check_cursor_rules": {
+                    "type": "boolean",
+                    "description": "If true, validate against .cursorrules file",
+                    "default": True,
+                },
+            },
+        },
+    ),
+    types.Tool(
+        name="plan_apply",
+        title="Apply Development Plan",
+        description="Execute a development plan to create/modify files",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "plan_file": {
+                    "type": "string",
+                    "description": "Path to .devplan file (default: ./.cursorplans/project.devplan)",
+                    "default": "./project.devplan",
+                },
+                "dry_run": {
+                    "type": "boolean",
+                    "description": "Show what would be executed without making changes",
+                    "default": False,
+                },
+            },
+        },
+    ),
+]
 
-    architecture_text = ""
-    if architecture_notes:
-        architecture_text = f"""
-🏗️ **Architecture Notes**:
-{chr(10).join(f"  • {note}" for note in architecture_notes)}"""
 
-    context_text = ""
-    if scanned_files:
-        context_text = f"""
-📁 **Context Files Found**: {len(scanned_files)} files
-{chr(10).join(f"  • {f}" for f in scanned_files[:10])}
-{"  • ..." if len(scanned_files) > 10 else ""}"""
+@click.command()
+@click.option("--port", default=8000, help="Port to listen on for SSE")
+@click.option(
+    "--transport",
+    type=click.Choice(["stdio", "sse"]),
+    default="stdio",
+    help="Transport type",
+)
+def main(port: int, transport: str) -> int:
+    """Main entry point for the Cursor Plans MCP server."""
+    app = Server("cursor-plans-mcp")
 
-    init_output = INIT_SUCCESS_TEMPLATE.format(
-        project_path=project_path,
-        project_name=project_name,
-        project_type=project_type,
-        project_description=project_description,
-        cursorplans_dir=cursorplans_dir,
-        context_file=context_file,
-        objectives_text=objectives_text,
-        architecture_text=architecture_text,
-        context_text=context_text,
-    )
+    @app.list_tools()
+    async def list_tools() -> list[types.Tool]:
+        """List all available development planning tools."""
+        return _TOOLS
 
-    return [types.TextContent(type="text", text=init_output)]
+    @app.call_tool()
+    async def call_tool(name: str, arguments: dict[str, Any]) -> list[types.ContentBlock]:
+        """Handle tool calls for development planning operations."""
+        handler = _DISPATCH.get(name)
+        if handler is None:
+            raise ValueError(f"Unknown tool: {name}")
+        return await handler(arguments)
 
+    # Transport setup
+    if transport == "sse":
+        from mcp.server.sse import SseServerTransport
+        from starlette.applications import Starlette
+        from starlette.requests import Request
+        from starlette.responses import Response
+        from starlette.routing import Mount, Route
 
-async def _create_plan_file(
-    name: str,
-    template: str,
-    project_path: Path,
-    cursorplans_dir: Path,
-    project_name: str,
-    project_type: str,
-    project_description: str,
-    objectives: list,
-    architecture_notes: list,
-    context_files: list,
-) -> dict:
-    """Helper function to create a plan file."""
-    try:
-        # Load the full context configuration for rich context processing
-        context_config = None
-        if _project_context and _project_context.get("context_config_path"):
-            try:
-                with open(_project_context["context_config_path"], "r") as f:
-                    import yaml
-
-                    context_config = yaml.safe_load(f)
-            except Exception:
-                pass  # Fall back to basic plan generation
-
-        # Generate plan content using context-aware logic
-        def generate_context_aware_plan(name, project_type, project_description, context_config):
-            """Generate plan structure based on context configuration"""
-            if not context_config:
-                # Fall back to basic template
-                return BASE_PLAN_TEMPLATE.format(
-                    name=name, project_type=project_type, project_description=project_description
-                )
+        sse = SseServerTransport("/messages/")
 
-            # Extract context sections
-            components = context_config.get("components", {})
-            languages = context_config.get("languages", {})
-            rules = context_config.get("rules", {})
-
-            # Build features list from components and languages
-            features = []
-            if components:
-                for component_type, component_list in components.items():
-                    if isinstance(component_list, list):
-                        for component in component_list:
-                            if isinstance(component, dict) and "name" in component:
-                                features.append(component["name"])
-                    elif isinstance(component_list, dict):
-                        features.append(component_type)
-
-            # Add language support features
-            if languages:
-                features.extend([f"{lang}_support" for lang in languages.keys()])
-
-            # Build resources from components and languages
-            resources_files = []
-            resources_dependencies = ["requests"]  # Default dependency
-
-            # Ensure we have at least one file resource
-            if not resources_files:
-                resources_files.append({"path": "README.md", "type": "documentation", "template": "basic_readme"})
-
-            # Add component-based files
-            if components:
-                for component_type, component_list in components.items():
-                    if isinstance(component_list, list):
-                        for component in component_list:
-                            if isinstance(component, dict) and "path" in component:
-                                resources_files.append(
-                                    {
-                                        "path": f"{component['path']}/__init__.py",
-                                        "type": "component_init",
-                                        "template": "stub",  # Use stub template for placeholder files
-                                    }
-                                )
-
-            # Add language-specific files
-            if languages:
-                for lang_name, lang_config in languages.items():
-                    if isinstance(lang_config, dict) and "templates" in lang_config:
-                        for template_name in lang_config["templates"]:
-                            resources_files.append(
-                                {
-                                    "path": f"src/cursor_plans_mcp/templates/languages/{lang_name}/{template_name}",
-                                    "type": "language_template",
-                                    "template": "stub",  # Use stub template for placeholder files
-                                }
-                            )
-
-            # Build phases based on components and context
-            phases = {
-                "foundation": {"priority": 1, "tasks": ["setup_project_structure", "create_component_directories"]},
-                "language_detection": {
-                    "priority": 2,
-                    "dependencies": ["foundation"],
-                    "tasks": ["implement_language_detection", "add_file_pattern_support"],
-                },
-                "language_templates": {
-                    "priority": 3,
-                    "dependencies": ["foundation"],
-                    "tasks": ["create_language_templates", "implement_template_engine"],
-                },
-                "language_validation": {
-                    "priority": 4,
-                    "dependencies": ["foundation"],
-                    "tasks": ["implement_language_validators", "add_validation_rules"],
-                },
-                "mcp_integration": {
-                    "priority": 5,
-                    "dependencies": ["language_detection", "language_templates", "language_validation"],
-                    "tasks": ["create_mcp_tools", "implement_language_apis"],
-                },
-                "testing": {
-                    "priority": 6,
-                    "dependencies": ["mcp_integration"],
-                    "tasks": ["unit_tests", "integration_tests", "language_specific_tests"],
-                },
-            }
+        async def handle_sse(request: Request):
+            async with sse.connect_sse(request.scope, request.receive, request._send) as streams:
+                await app.run(streams[0], streams[1], app.create_initialization_options())
+            return Response()
 
-            # Build validation rules
-            validation_rules = ["syntax_check"]
-            if rules:
-                if "code_quality" in rules:
-                    validation_rules.append("code_quality_check")
-                if "mcp_standards" in rules:
-                    validation_rules.append("mcp_compliance_check")
-                if "language_support" in rules:
-                    validation_rules.append("language_support_validation")
-
-            # Generate the enhanced plan
-            # Build the plan content piece by piece to avoid f-string syntax issues
-            plan_parts = [
-                f"""schema_version: "1.0"
-# Development Plan: {name}
+        starlette_app = Starlette(
+            debug=True,
+            routes=[
+                Route("/sse", endpoint=handle_sse, methods=["GET"]),
+                Mount("/messages/", app=sse.handle_post_message),
+            ],
+        )
 
-project:
-  name: "{name}"
-  version: "0.1.0"
-  description: "{project_description}"
+        import uvicorn
 
-target_state:
-  architecture:
-    - language: "python"
-    - project_type: "{project_type}"
-    - components: {list(components.keys()) if components else []}
-    - supported_languages: {list(languages.keys()) if languages else []}
+        uvicorn.run(starlette_app, host="127.0.0.1", port=port)
+    else:
+        from mcp.server.stdio import stdio_server
 
-  features:""",
-                chr(10).join(f"    - {feature}" for feature in features),
-                """
-resources:
-  files:
-""",
-                chr(10).join(
-                    f'    - path: "{file["path"]}"\n      type: "{file["type"]}"\n      template: "{file["template"]}"'
-                    for file in resources_files
-                ),
-                """
-  dependencies:
-""",
-                chr(10).join(f'    - "{dep}"' for dep in resources_dependencies),
-                """
-phases:
-""",
-            ]
-
-            # Add phases
-            for phase_name, phase_config in phases.items():
-                plan_parts.append(f"""  {phase_name}:
-    priority: {phase_config["priority"]}
-    dependencies: {phase_config.get("dependencies", [])}
-    tasks:
-""")
-                plan_parts.append(chr(10).join(f"      - {task}" for task in phase_config["tasks"]))
+        async def arun():
+            async with stdio_server() as streams:
+                await app.run(streams[0], streams[1], app.create_initialization_options())
 
-            plan_parts.append("""
-validation:
-  pre_apply:
-""")
-            plan_parts.append(chr(10).join(f"    - {rule}" for rule in validation_rules))
-            plan_parts.append('"')
-
-            plan_content = "".join(plan_parts)
-
-            return plan_content
-
-        # Generate plan content using context-aware logic
-        if template == "fastapi":
-            plan_content = _get_fastapi_template(name)
-        elif template == "dotnet":
-            plan_content = _get_dotnet_template(name)
-        elif template == "vuejs":
-            plan_content = _get_vuejs_template(name)
-        elif template == "basic":
-            # Use basic template
-            plan_content = BASE_PLAN_TEMPLATE.format(
-                name=name, project_type=project_type, project_description=project_description
-            )
-        else:
-            # Use context-aware plan generation
-            plan_content = generate_context_aware_plan(name, project_type, project_description, context_config)
+        anyio.run(arun)
 
-        # Validate plan content
-        from .schema import validate_plan_content
+    return 0
 
-        is_valid, error_msg, _ = validate_plan_content(plan_content)
-        if not is_valid:
-            return {"success": False, "error": f"Schema validation failed: {error_msg}"}
 
-        # Write the plan file
-        plan_file = cursorplans_dir / f"{name}.devplan"
-        with open(plan_file, "w") as f:
-            f.write(plan_content)
+def _text_result(text: str) -> list[types.ContentBlock]:
+    """Wrap trusted tool output in a single text block, skipping model validation."""
+    return [types.TextContent.model_construct(type="text", text=text)]
 
-        return {"success": True, "plan_file": str(plan_file)}
 
-    except Exception as e:
-        return {"success": False, "error": str(e)}
+async def prepare_dev_plan(arguments: dict[str, Any]) -> list[types.ContentBlock]:
+    """Create a development plan using stored context information."""
+    global _project_context
 
+    name = arguments.get("name", "project")
+    template = arguments.get("template", "basic")
 
-def _get_fastapi_template(name: str) -> str:
-    """Get FastAPI template content."""
-    return f"""schema_version: "1.0"
-# Development Plan: {name}
+    # Use stored project context if available
+    if not _project_context:
+        return _text_result(
+            "❌ **Error**: No project context found. Please run plan_init first.\n\n"
+            'Usage: plan_init context="project-context.yaml"'
+        )
 
-project:
-  name: "{name}"
-  version: "0.1.0"
-  description: "FastAPI web service with database"
+    # Use the stored cursorplans_dir from context, or fall back to project directory
+    cursorplans_dir = Path(
+        _project_context.get("cursorplans_dir", _project_context.get("project_directory", ".") + "/.cursorplans")
+    )
+    project_path = cursorplans_dir.parent
 
-target_state:
-  architecture:
-    - language: "Python"
-    - framework: "FastAPI"
-    - database: "SQLAlchemy"
-    - auth: "JWT"
+    # Ensure .cursorplans directory exists
+    if not cursorplans_dir.exists():
+        cursorplans_dir.mkdir(exist_ok=True)
 
-  features:
-    - api_endpoints
-    - database_models
-    - authentication
-    - documentation
-    - testing
+    # Create the development plan
+    plan_creation_result = await _create_plan_file(
+        name,
+        template,
+        project_path,
+        cursorplans_dir,
+        _project_context.get("project_name", name),
+        _project_context.get("project_type", "unknown"),
+        _project_context.get("project_description", "A software project"),
+        _project_context.get("objectives", []),
+        _project_context.get("architecture_notes", []),
+        _project_context.get("context_files", []),
+    )
 
-resources:
-  files:
-    - path: "src/main.py"
-      type: "entry_point"
-      template: "fastapi_main"
-    - path: "src/models.py"
-      type: "data_model"
-      template: "fastapi_model"
-    - path: "requirements.txt"
-      type: "dependencies"
-      template: "requirements"
+    # Generate success message
+    if plan_creation_result["success"]:
+        success_message = PLAN_CREATION_SUCCESS_TEMPLATE.format(
+            plan_file=plan_creation_result["plan_file"], name=name, template=template
+        )
+    else:
+        success_message = PLAN_CREATION_FAILURE_TEMPLATE.format(error=plan_creation_result["error"])
 
-  dependencies:
-    - "fastapi>=0.104.0"
-    - "uvicorn>=0.24.0"
-    - "sqlalchemy>=2.0.0"
-    - "pyjwt>=2.8.0"
-    - "python-multipart>=0.0.6"
+    return _text_result(success_message)
+
+
+@functools.lru_cache(maxsize=32)
+def _resolve_project_dir(directory: str) -> Path:
+    """Resolve an absolute project directory, remembering the result across calls."""
+    return Path(directory).resolve()
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_context_config(path: str, mtime_ns: int, size: int) -> Any:
+    """Parse a context YAML file; the stat fields in the cache key drop stale entries once it changes."""
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+
+def _load_context_config(context_file: str) -> Any:
+    """Load a context YAML file, reusing the parse while the file is unchanged.
+
+    Callers get their own copy, so changes to it never reach the cached parse.
+    """
+    path = os.path.abspath(context_file)
+    stat = os.stat(path)
+    return copy.deepcopy(_parse_context_config(path, stat.st_mtime_ns, stat.st_size))
+
+
+def _glob_components(pattern: Any) -> Optional[List[str]]:
+    """Split a context-file glob into path components, or None if it cannot match."""
+    if not isinstance(pattern, str) or not pattern or pattern.startswith("/"):
+        return None
+    if pattern.endswith("/"):
+        # Directory patterns select every file below them
+        pattern += "**/*"
+
+    components = [component for component in pattern.split("/") if component not in ("", ".")]
+    if not components or ".." in components or components[-1] == "**":
+        return None
+    return components
+
+
+def _glob_component_regex(component: str) -> str:
+    """Translate one glob component to a regex whose wildcards never match '/'."""
+    parts = []
+    i, n = 0, len(component)
+    while i < n:
+        char = component[i]
+        i += 1
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            j = i
+            if j < n and component[j] == "!":
+                j += 1
+            if j < n and component[j] == "]":
+                j += 1
+            j = component.find("]", j)
+            if j == -1:
+                parts.append(re.escape(char))
+                continue
+            body = _GLOB_SET_SPECIAL_RE.sub(r"\\\1", component[i:j])
+            i = j + 1
+            if body.startswith("!"):
+                body = "^/" + body[1:]
+            elif body.startswith("^"):
+                body = "\\" + body
+            parts.append(f"[{body}]")
+        else:
+            parts.append(re.escape(char))
+    return "".join(parts)
+
+
+def _glob_regex(components: List[str]) -> str:
+    """Translate glob components to a regex over '/'-separated relative paths."""
+    regex = "".join("(?:[^/]+/)*" if c == "**" else _glob_component_regex(c) + "/" for c in components[:-1])
+    return regex + _glob_component_regex(components[-1])
+
+
+def _iter_project_files(
+    root: str,
+    top_level: Optional[FrozenSet[str]] = None,
+    max_depth: Optional[int] = None,
+    skip_dirs: FrozenSet[str] = frozenset(),
+) -> Iterator[str]:
+    """
+    Walk root with os.scandir, yielding '/'-separated relative file paths.
+
+    Below the root only the top_level directories are entered (all of them if None),
+    nothing deeper than max_depth path components is listed, and directories named
+    in skip_dirs are pruned wherever they appear.
+    """
+    pending = [("", 1)]
+
+    while pending:
+        relative_dir, depth = pending.pop()
+        try:
+            with os.scandir(os.path.join(root, relative_dir)) as entries:
+                for entry in entries:
+                    relative_path = relative_dir + entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if max_depth is not None and depth >= max_depth:
+                            continue
+                        if depth == 1 and top_level is not None and entry.name not in top_level:
+                            continue
+                        if entry.name in skip_dirs:
+                            continue
+                        pending.append((relative_path + "/", depth + 1))
+                    elif entry.is_file():
+                        yield relative_path
+        except OSError:
+            continue
+
+
+def _scan_context_files(project_path: Path, context_files: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """
+    Match the context-file globs of each category against a single walk of the project.
+
+    Each category's globs are combined into one regex, so a file is tested once per
+    category and listed at most once for it.
+    """
+    category_regexes: Dict[str, List[str]] = {}
+    top_level: Optional[set] = set()
+    max_depth: Optional[int] = 0
 
-phases:
-  foundation:
-    priority: 1
-    tasks:
-      - setup_project_structure
-      - install_dependencies
+    for category, patterns in context_files.items():
+        for pattern in patterns:
+            components = _glob_components(pattern)
+            if components is None:
+                # Skip invalid patterns
+                continue
+            category_regexes.setdefault(category, []).append(_glob_regex(components))
 
-  data_layer:
-    priority: 2
-    dependencies: ["foundation"]
-    tasks:
-      - create_models
-      - setup_database
+            if "**" in components:
+                max_depth = None
+            elif max_depth is not None:
+                max_depth = max(max_depth, len(components))
 
-  api_layer:
-    priority: 3
-    dependencies: ["data_layer"]
-    tasks:
-      - create_endpoints
-      - add_validation
+            if len(components) > 1 and top_level is not None:
+                if components[0] == "**" or not _GLOB_CHARS.isdisjoint(components[0]):
+                    top_level = None
+                else:
+                    top_level.add(components[0])
 
-  security:
-    priority: 4
-    dependencies: ["api_layer"]
-    tasks:
-      - implement_jwt
-      - add_auth_middleware
+    if not category_regexes:
+        return []
 
-  testing:
-    priority: 5
-    dependencies: ["security"]
-    tasks:
-      - unit_tests
-      - integration_tests
+    matchers = [
+        (category, re.compile("|".join(f"(?:{regex})" for regex in regexes)))
+        for category, regexes in category_regexes.items()
+    ]
 
-validation:
-  pre_apply:
-    - syntax_check
-    - dependency_check
+    # Stream the walk and keep only matches, sorting each category's (small) hit list
+    category_matches: Dict[str, List[str]] = {category: [] for category, _ in matchers}
+    for rel_path in _iter_project_files(
+        str(project_path), frozenset(top_level) if top_level is not None else None, max_depth
+    ):
+        for category, pattern_re in matchers:
+            if pattern_re.fullmatch(rel_path):
+                category_matches[category].append(rel_path)
 
-  post_apply:
-    - api_test_validation
-"""
+    return [(category, rel_path) for category, rel_paths in category_matches.items() for rel_path in sorted(rel_paths)]
 
 
-def _get_dotnet_template(name: str) -> str:
-    """Get .NET template content."""
-    return f"""schema_version: "1.0"
-# Development Plan: {name}
+async def init_dev_planning(arguments: dict[str, Any]) -> list[types.ContentBlock]:
+    """Initialize development planning."""
+    global _project_context
 
-project:
-  name: "{name}"
-  version: "0.1.0"
-  description: ".NET 8 Web API with Entity Framework"
+    context_file = arguments.get("context")
+    project_directory = arguments.get("project_directory", ".")
+    reset = arguments.get("reset", False)
 
-target_state:
-  architecture:
-    - language: "C#"
-    - framework: ".NET 8"
-    - type: "Web API"
-    - database: "Entity Framework Core"
-    - auth: "JWT Bearer"
+    if not context_file:
+        return _text_result(
+            '❌ **Error**: Context file path is required.\n\nUsage: dev_plan_init context="sample.context.yaml"'
+        )
 
-  features:
-    - web_api
-    - entity_framework
-    - jwt_authentication
-    - swagger_documentation
-    - unit_testing
+    # Load and parse the context file
+    try:
+        context_config = _load_context_config(context_file)
 
-resources:
-  files:
-    - path: "Program.cs"
-      type: "entry_point"
-      template: "dotnet_program"
-    - path: "Controllers/BaseController.cs"
-      type: "api_controller"
-      template: "dotnet_controller"
-    - path: "Data/AppDbContext.cs"
-      type: "data_context"
-      template: "ef_dbcontext"
-    - path: "Services/AuthService.cs"
-      type: "service_interface"
-      template: "dotnet_service"
-    - path: "{name}.csproj"
-      type: "project_file"
-      template: "dotnet_csproj"
+        if not context_config or "project" not in context_config:
+            return _text_result(
+                f"❌ **Error**: Invalid context file format. Missing 'project' section in {context_file}"
+            )
 
-  dependencies:
-    - name: "Microsoft.AspNetCore.Authentication.JwtBearer"
-      version: "8.0.0"
-    - name: "Microsoft.EntityFrameworkCore.SqlServer"
-      version: "8.0.0"
-    - name: "Swashbuckle.AspNetCore"
-      version: "6.5.0"
+    except FileNotFoundError:
+        return _text_result(f"❌ **Error**: Context file not found: {context_file}")
+    except yaml.YAMLError as e:
+        return _text_result(f"❌ **Error**: Invalid YAML in context file: {str(e)}")
+    except Exception as e:
+        return _text_result(f"❌ **Error**: Could not read context file: {str(e)}")
 
-phases:
-  foundation:
-    priority: 1
-    tasks:
-      - setup_project_structure
-      - install_dependencies
+    # Extract project configuration
+    project_config = context_config["project"]
+    # Use parameter project_directory if provided, otherwise use context file directory
+    if arguments.get("project_directory") and arguments.get("project_directory") != ".":
+        project_directory = arguments.get("project_directory")
+    else:
+        project_directory = project_config.get("directory", ".")
+    project_name = project_config.get("name", "unknown")
+    project_type = project_config.get("type", "unknown")
+    project_description = project_config.get("description", "")
+    project_objectives = project_config.get("objectives", [])
+    architecture_notes = project_config.get("architecture_notes", [])
 
-  data_layer:
-    priority: 2
-    dependencies: ["foundation"]
-    tasks:
-      - create_models
-      - setup_entity_framework
+    # Resolve the project directory
+    if project_directory == "." or not project_directory:
+        project_directory = os.getcwd()
+
+    project_path = _resolve_project_dir(os.path.abspath(project_directory))
+
+    # Handle reset functionality
+    if reset:
+        cursorplans_dir = project_path / ".cursorplans"
+        purged_count = 0
+
+        # Count the plan and context files to be removed, then remove
+        # the .cursorplans directory and all contents if there is one
+        try:
+            with os.scandir(cursorplans_dir) as entries:
+                purged_count = sum(
+                    1 for entry in entries if entry.name.endswith((".devplan", ".yaml")) and entry.is_file()
+                )
+        except FileNotFoundError:
+            pass
+        else:
+            shutil.rmtree(cursorplans_dir)
+
+        # Reset global context
+        _project_context = {}
+
+        # Create fresh .cursorplans directory
+        cursorplans_dir.mkdir(exist_ok=True)
+
+        reset_output = RESET_COMPLETE_TEMPLATE.format(
+            project_path=project_path, file_count=purged_count, cursorplans_dir=cursorplans_dir
+        )
+        return _text_result(reset_output)
+
+    # Scan for context files based on the YAML configuration
+    context_files = context_config.get("context_files", {})
 
-  api_layer:
-    priority: 3
-    dependencies: ["data_layer"]
-    tasks:
-      - create_endpoints
-      - add_controllers
+    # Process each category of context files
+    scanned_files = await anyio.to_thread.run_sync(_scan_context_files, project_path, context_files)
 
-  security:
-    priority: 4
-    dependencies: ["api_layer"]
-    tasks:
-      - implement_jwt
-      - add_auth_middleware
+    # Store enhanced project context in global state
+    _project_context = {
+        "project_directory": str(project_path),
+        "project_name": project_name,
+        "project_type": project_type,
+        "project_description": project_description,
+        "objectives": project_objectives,
+        "architecture_notes": architecture_notes,
+        "context_files": scanned_files,
+        "cursorplans_dir": str(project_path / ".cursorplans"),
+        "context_config_path": str(Path(context_file).resolve()),
+    }
 
-  testing:
-    priority: 5
-    dependencies: ["security"]
-    tasks:
-      - unit_tests
-      - integration_tests
+    # Create .cursorplans directory
+    cursorplans_dir = project_path / ".cursorplans"
+    try:
+        cursorplans_dir.mkdir(exist_ok=True)
+    except FileNotFoundError:
+        return _text_result(f"❌ **Error**: Project directory does not exist: {project_directory}")
 
-validation:
-  pre_apply:
-    - syntax_check
-    - dependency_check
+    # Generate comprehensive initialization output
+    objectives_text = ""
+    if project_objectives:
+        objectives_text = "\n🎯 **Project Objectives**:\n" + "\n".join(f"  • {obj}" for obj in project_objectives)
 
-  post_apply:
-    - build_test
-"""
+    architecture_text = ""
+    if architecture_notes:
+        architecture_text = "\n🏗️ **Architecture Notes**:\n" + "\n".join(f"  • {note}" for note in architecture_notes)
 
+    context_text = ""
+    if scanned_files:
+        context_text = (
+            f"\n📁 **Context Files Found**: {len(scanned_files)} files\n"
+            + "\n".join(f"  • {category}: {rel_path}" for category, rel_path in scanned_files[:10])
+            + ("\n  • ..." if len(scanned_files) > 10 else "\n")
+        )
 
-def _get_vuejs_template(name: str) -> str:
-    """Get Vue.js template content."""
-    return f"""schema_version: "1.0"
-# Development Plan: {name}
+    init_output = INIT_SUCCESS_TEMPLATE.format(
+        project_path=project_path,
+        project_name=project_name,
+        project_type=project_type,
+        project_description=project_description,
+        cursorplans_dir=cursorplans_dir,
+        context_file=context_file,
+        objectives_text=objectives_text,
+        architecture_text=architecture_text,
+        context_text=context_text,
+    )
 
-project:
-  name: "{name}"
-  version: "0.1.0"
-  description: "Vue.js frontend application"
+    return _text_result(init_output)
+
+
+# Phases of a context-aware plan; they do not depend on the context
+_CONTEXT_PLAN_PHASES: Dict[str, Dict[str, Any]] = {
+    "foundation": {"priority": 1, "tasks": ["setup_project_structure", "create_component_directories"]},
+    "language_detection": {
+        "priority": 2,
+        "dependencies": ["foundation"],
+        "tasks": ["implement_language_detection", "add_file_pattern_support"],
+    },
+    "language_templates": {
+        "priority": 3,
+        "dependencies": ["foundation"],
+        "tasks": ["create_language_templates", "implement_template_engine"],
+    },
+    "language_validation": {
+        "priority": 4,
+        "dependencies": ["foundation"],
+        "tasks": ["implement_language_validators", "add_validation_rules"],
+    },
+    "mcp_integration": {
+        "priority": 5,
+        "dependencies": ["language_detection", "language_templates", "language_validation"],
+        "tasks": ["create_mcp_tools", "implement_language_apis"],
+    },
+    "testing": {
+        "priority": 6,
+        "dependencies": ["mcp_integration"],
+        "tasks": ["unit_tests", "integration_tests", "language_specific_tests"],
+    },
+}
+
+# Context rule sections and the pre_apply check each one adds, in plan order
+_CONTEXT_RULE_CHECKS = (
+    ("code_quality", "code_quality_check"),
+    ("mcp_standards", "mcp_compliance_check"),
+    ("language_support", "language_support_validation"),
+)
 
-target_state:
-  architecture:
-    - language: "TypeScript"
-    - framework: "Vue 3"
-    - build_tool: "Vite"
-    - state_management: "Pinia"
-    - ui_framework: "Vuetify"
-    - testing: "Vitest + Vue Test Utils"
 
-  features:
-    - component_library
-    - routing
-    - state_management
-    - api_integration
-    - responsive_design
-    - unit_testing
+def _generate_context_aware_plan(
+    name: str, project_type: str, project_description: str, context_config: Optional[Dict[str, Any]]
+) -> str:
+    """Generate plan structure based on context configuration"""
+    if not context_config:
+        # Fall back to basic template
+        return BASE_PLAN_TEMPLATE.format(name=name, project_type=project_type, project_description=project_description)
+
+    # Extract context sections
+    components = context_config.get("components", {})
+    languages = context_config.get("languages", {})
+    rules = context_config.get("rules", {})
+
+    # Build features list from components and languages
+    features = []
+    if components:
+        for component_type, component_list in components.items():
+            if isinstance(component_list, list):
+                for component in component_list:
+                    if isinstance(component, dict) and "name" in component:
+                        features.append(component["name"])
+            elif isinstance(component_list, dict):
+                features.append(component_type)
+
+    # Add language support features
+    if languages:
+        features.extend([f"{lang}_support" for lang in languages.keys()])
+
+    # Build resources from components and languages, starting with a README
+    resources_files = [{"path": "README.md", "type": "documentation", "template": "basic_readme"}]
+    resources_dependencies = ["requests"]  # Default dependency
+
+    # Add component-based files
+    if components:
+        for component_list in components.values():
+            if isinstance(component_list, list):
+                for component in component_list:
+                    if isinstance(component, dict) and "path" in component:
+                        resources_files.append(
+                            {
+                                "path": f"{component['path']}/__init__.py",
+                                "type": "component_init",
+                                "template": "stub",  # Use stub template for placeholder files
+                            }
+                        )
+
+    # Add language-specific files
+    if languages:
+        for lang_name, lang_config in languages.items():
+            if isinstance(lang_config, dict) and "templates" in lang_config:
+                for template_name in lang_config["templates"]:
+                    resources_files.append(
+                        {
+                            "path": f"src/cursor_plans_mcp/templates/languages/{lang_name}/{template_name}",
+                            "type": "language_template",
+                            "template": "stub",  # Use stub template for placeholder files
+                        }
+                    )
+
+    # Build validation rules
+    validation_rules = ["syntax_check"]
+    if rules:
+        validation_rules.extend(check for rule, check in _CONTEXT_RULE_CHECKS if rule in rules)
+
+    # Compose the plan line by line and join it once
+    lines = [
+        'schema_version: "1.0"',
+        f"# Development Plan: {name}",
+        "",
+        "project:",
+        f'  name: "{name}"',
+        '  version: "0.1.0"',
+        f'  description: "{project_description}"',
+        "",
+        "target_state:",
+        "  architecture:",
+        '    - language: "python"',
+        f'    - project_type: "{project_type}"',
+        f"    - components: {list(components.keys()) if components else []}",
+        f"    - supported_languages: {list(languages.keys()) if languages else []}",
+        "",
+        "  features:" if features else "  features: []",
+    ]
+    lines.extend(f"    - {feature}" for feature in features)
+
+    lines += ["", "resources:", "  files:"]
+    for file in resources_files:
+        lines += [
+            f'    - path: "{file["path"]}"',
+            f'      type: "{file["type"]}"',
+            f'      template: "{file["template"]}"',
+        ]
+    lines.append("  dependencies:")
+    lines.extend(f'    - "{dep}"' for dep in resources_dependencies)
+
+    lines += ["", "phases:"]
+    for phase_name, phase_config in _CONTEXT_PLAN_PHASES.items():
+        lines += [
+            f"  {phase_name}:",
+            f"    priority: {phase_config['priority']}",
+            f"    dependencies: {phase_config.get('dependencies', [])}",
+            "    tasks:",
+        ]
+        lines.extend(f"      - {task}" for task in phase_config["tasks"])
 
-resources:
-  files:
-    - path: "src/main.ts"
-      type: "entry_point"
-      template: "vue_main"
-    - path: "src/App.vue"
-      type: "root_component"
-      template: "vue_app"
-    - path: "src/router/index.ts"
-      type: "router_config"
-      template: "vue_router"
-    - path: "src/stores/main.ts"
-      type: "state_store"
-      template: "pinia_store"
-    - path: "src/components/HelloWorld.vue"
-      type: "component"
-      template: "vue_component"
-    - path: "package.json"
-      type: "dependencies"
-      template: "vue_package_json"
+    lines += ["", "validation:", "  pre_apply:"]
+    lines.extend(f"    - {rule}" for rule in validation_rules)
 
-  dependencies:
-    - name: "vue"
-      version: "^3.4.0"
-    - name: "vue-router"
-      version: "^4.2.0"
-    - name: "pinia"
-      version: "^2.1.0"
-    - name: "vuetify"
-      version: "^3.5.0"
-    - name: "axios"
-      version: "^1.6.0"
+    return "\n".join(lines) + "\n"
 
-phases:
-  foundation:
-    priority: 1
-    tasks:
-      - setup_vite_project
-      - configure_typescript
-      - setup_vuetify
 
-  routing:
-    priority: 2
-    dependencies: ["foundation"]
-    tasks:
-      - configure_vue_router
-      - create_route_components
-      - implement_navigation
+@functools.lru_cache(maxsize=32)
+def _render_plan_template(
+    template: str, name: str, project_type: str, project_description: str
+) -> Tuple[str, bool, str]:
+    """Render and validate a named plan template, once per distinct set of arguments."""
+    plan_content = _PLAN_TEMPLATES[template].format(
+        name=name, project_type=project_type, project_description=project_description
+    )
+    is_valid, error_msg, _ = validate_plan_content(plan_content)
+    return plan_content, is_valid, error_msg
 
-  state_management:
-    priority: 3
-    dependencies: ["routing"]
-    tasks:
-      - setup_pinia_stores
-      - implement_state_logic
-      - connect_components_to_store
 
-  components:
-    priority: 4
-    dependencies: ["state_management"]
-    tasks:
-      - create_reusable_components
-      - implement_forms
-      - add_data_tables
+async def _create_plan_file(
+    name: str,
+    template: str,
+    project_path: Path,
+    cursorplans_dir: Path,
+    project_name: str,
+    project_type: str,
+    project_description: str,
+    objectives: list,
+    architecture_notes: list,
+    context_files: list,
+) -> dict:
+    """Helper function to create a plan file."""
+    try:
+        if template in _PLAN_TEMPLATES:
+            # Named templates only depend on their arguments; str.format would
+            # str() them anyway, and doing it first keeps the cache key hashable
+            plan_content, is_valid, error_msg = _render_plan_template(
+                template, str(name), str(project_type), str(project_description)
+            )
+        else:
+            # Load the full context configuration for rich context processing
+            context_config = None
+            if _project_context and _project_context.get("context_config_path"):
+                try:
+                    context_config = _load_context_config(_project_context["context_config_path"])
+                except Exception:
+                    pass  # Fall back to basic plan generation
 
-  api_integration:
-    priority: 5
-    dependencies: ["components"]
-    tasks:
-      - setup_axios_client
-      - implement_api_services
-      - handle_authentication
+            plan_content = _generate_context_aware_plan(name, project_type, project_description, context_config)
+            is_valid, error_msg, _ = validate_plan_content(plan_content)
 
-  testing:
-    priority: 6
-    dependencies: ["api_integration"]
-    tasks:
-      - unit_tests
-      - component_tests
-      - e2e_tests
+        if not is_valid:
+            return {"success": False, "error": f"Schema validation failed: {error_msg}"}
 
-validation:
-  pre_apply:
-    - typescript_check
-    - vue_template_validation
-    - dependency_audit
-"""
+        # Write the plan file
+        plan_file = cursorplans_dir / f"{name}.devplan"
+        # A single unbuffered write of the encoded plan; the loop only covers short writes
+        fd = os.open(plan_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            remaining = memoryview(plan_content.encode("utf-8"))
+            while remaining:
+                remaining = remaining[os.write(fd, remaining) :]
+        finally:
+            os.close(fd)
+
+        return {"success": True, "plan_file": str(plan_file)}
+
+    except Exception as e:
+        return {"success": False, "error": str(e)}
 
 
 async def load_context_file(context_file_path: str) -> list[str]:
     """Load context files from a text file."""
-    context_files = []
     try:
-        with open(context_file_path, "r") as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#"):
-                    context_files.append(line)
+        text = Path(context_file_path).read_text(encoding="utf-8")
     except FileNotFoundError:
-        pass
-    return context_files
+        return []
+
+    return [line for line in map(str.strip, text.splitlines()) if line and not line.startswith("#")]
+
+
+# Key files collected for context, as globs relative to the project root
+_KEY_FILE_PATTERNS = (
+    "*.csproj",
+    "*.sln",
+    "Program.cs",
+    "Startup.cs",  # .NET
+    "package.json",
+    "vite.config.*",
+    "vue.config.*",
+    "src/main.*",  # Vue/JS
+    "requirements.txt",
+    "pyproject.toml",
+    "main.py",
+    "app.py",  # Python
+    "README.*",
+    "LICENSE",
+    ".gitignore",
+    "Dockerfile",  # Common
+)
+
+# All key file patterns as one regex, plus the directories and depth a walk needs to match them
+_KEY_FILE_COMPONENTS = [pattern.split("/") for pattern in _KEY_FILE_PATTERNS]
+_KEY_FILE_RE = re.compile("|".join(f"(?:{_glob_regex(components)})" for components in _KEY_FILE_COMPONENTS))
+_KEY_FILE_TOP_LEVEL = frozenset(components[0] for components in _KEY_FILE_COMPONENTS if len(components) > 1)
+_KEY_FILE_MAX_DEPTH = max(len(components) for components in _KEY_FILE_COMPONENTS)
+
+
+@functools.lru_cache(maxsize=64)
+def _load_package_info(path: str, mtime_ns: int, size: int) -> Tuple[Optional[str], FrozenSet[str]]:
+    """Read a package.json's name and dependency names; the stat fields in the cache key drop stale entries."""
+    with open(path, "rb") as f:
+        package_data = json.load(f)
+    deps = {
+        **package_data.get("dependencies", {}),
+        **package_data.get("devDependencies", {}),
+    }
+    return package_data.get("name"), frozenset(deps)
+
+
+def _detect_dotnet_project(
+    directory: str, names: FrozenSet[str], extensions: FrozenSet[str]
+) -> Optional[Dict[str, Any]]:
+    """Detect a .NET project from .csproj/.sln files."""
+    if ".csproj" not in extensions and ".sln" not in extensions:
+        return None
+
+    project_names = sorted(os.path.splitext(name)[0] for name in names if name.endswith(".csproj"))
+    return {
+        "framework": "dotnet",
+        "language": "C#",
+        "structure": "dotnet_project",
+        "suggested_name": project_names[0] if project_names else None,
+    }
+
+
+def _detect_node_project(directory: str, names: FrozenSet[str], extensions: FrozenSet[str]) -> Optional[Dict[str, Any]]:
+    """Detect a Vue.js or React project from the root package.json."""
+    if "package.json" not in names:
+        return None
+
+    package_json_path = os.path.join(directory, "package.json")
+    try:
+        stat = os.stat(package_json_path)
+        package_name, deps = _load_package_info(package_json_path, stat.st_mtime_ns, stat.st_size)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return {}
+
+    if "vue" in deps:
+        return {
+            "framework": "vuejs",
+            "language": "JavaScript/TypeScript",
+            "structure": "vue_project",
+            "suggested_name": package_name or "vue-app",
+        }
+    if "react" in deps:
+        return {
+            "framework": "react",
+            "language": "JavaScript/TypeScript",
+            "structure": "react_project",
+            "suggested_name": package_name or "react-app",
+        }
+    return {}
+
+
+def _detect_python_project(
+    directory: str, names: FrozenSet[str], extensions: FrozenSet[str]
+) -> Optional[Dict[str, Any]]:
+    """Detect a Python project, narrowing the framework from requirements.txt."""
+    if names.isdisjoint(("requirements.txt", "pyproject.toml", "setup.py")):
+        return None
+
+    detected = {"framework": "fastapi", "language": "Python", "structure": "python_project"}
+
+    # Check if it's specifically FastAPI
+    if "requirements.txt" in names:
+        try:
+            with open(os.path.join(directory, "requirements.txt"), "r") as f:
+                reqs = f.read().lower()
+        except FileNotFoundError:
+            return detected
+        if "fastapi" in reqs:
+            detected["framework"] = "fastapi"
+        elif "django" in reqs:
+            detected["framework"] = "django"
+        elif "flask" in reqs:
+            detected["framework"] = "flask"
+    return detected
+
+
+# Codebase detectors in priority order; the first one returning a dict wins
+_CODEBASE_DETECTORS: Tuple[Callable[[str, FrozenSet[str], FrozenSet[str]], Optional[Dict[str, Any]]], ...] = (
+    _detect_dotnet_project,
+    _detect_node_project,
+    _detect_python_project,
+)
 
 
 async def detect_existing_codebase(
-    directory: str, context_files: Optional[list[str]] = None, suggest_name: bool = True
+    directory: str,
+    context_files: Optional[list[str]] = None,
+    suggest_name: bool = True,
+    include_key_files: bool = True,
 ) -> dict[str, Any]:
     """Detect the framework and structure of an existing codebase."""
-    current_dir = Path(directory)
+    # The scan is blocking filesystem work; keep it off the event loop
+    return await anyio.to_thread.run_sync(_detect_codebase, directory, context_files, suggest_name, include_key_files)
+
+
+def _detect_codebase(
+    directory: str, context_files: Optional[list[str]], suggest_name: bool, include_key_files: bool
+) -> dict[str, Any]:
+    """Synchronous body of detect_existing_codebase."""
     detected_info: Dict[str, Any] = {
         "framework": None,
         "language": None,
@@ -1082,142 +1368,50 @@ async def detect_existing_codebase(
         "structure": "unknown",
     }
 
-    # If suggest_name is False, we won't set any suggested_name
-    if not suggest_name:
-        detected_info["suggested_name"] = None
-
     try:
         # If context files are provided, focus on those first
         if context_files:
-            context_paths = []
+            file_names = set()
             for context_file in context_files:
-                context_path = current_dir / context_file
-                if context_path.exists():
-                    if context_path.is_file():
-                        context_paths.append(context_path)
-                    else:
-                        # If it's a directory, add all files in it (limited scope)
-                        try:
-                            for item in context_path.rglob("*"):
-                                if item.is_file():
-                                    context_paths.append(item)
-                        except (PermissionError, OSError):
-                            pass
-            files = context_paths
+                context_path = os.path.join(directory, context_file)
+                if os.path.isfile(context_path):
+                    file_names.add(os.path.basename(context_path))
+                elif os.path.isdir(context_path):
+                    # If it's a directory, add all files in it (limited scope)
+                    file_names.update(
+                        rel_path.rpartition("/")[2]
+                        for rel_path in _iter_project_files(context_path, skip_dirs=_DETECTION_SKIP_DIRS)
+                    )
         else:
-            # Check for various framework indicators (limited scope)
-            files = []
-            # Get immediate files only
-            for item in current_dir.iterdir():
-                if item.is_file():
-                    files.append(item)
-
-            # Only scan specific known project directories
-            project_dirs = ["cursor-plans", "src", "tests", "docs", "examples"]
-            for dir_name in project_dirs:
-                project_dir = current_dir / dir_name
-                if project_dir.exists() and project_dir.is_dir():
-                    try:
-                        for item in project_dir.rglob("*"):
-                            if item.is_file():
-                                files.append(item)
-                    except (PermissionError, OSError):
-                        pass
-
-        file_names = [f.name for f in files if f.is_file()]
-
-        # .NET detection
-        if any(f.endswith(".csproj") or f.endswith(".sln") for f in file_names):
-            detected_info["framework"] = "dotnet"
-            detected_info["language"] = "C#"
-            detected_info["structure"] = "dotnet_project"
-
-            # Try to get project name from .csproj
-            if suggest_name:
-                for f in files:
-                    if f.name.endswith(".csproj"):
-                        detected_info["suggested_name"] = f.stem
-                        break
-            else:
-                # Ensure suggested_name stays None when suggest_name is False
-                detected_info["suggested_name"] = None
-
-        # Vue.js detection
-        elif "package.json" in file_names:
-            try:
-                package_json_path = current_dir / "package.json"
-                if package_json_path.exists():
-                    with open(package_json_path, "r") as f:
-                        package_data = json.loads(f.read())
-                        deps = {
-                            **package_data.get("dependencies", {}),
-                            **package_data.get("devDependencies", {}),
-                        }
-
-                        if "vue" in deps:
-                            detected_info["framework"] = "vuejs"
-                            detected_info["language"] = "JavaScript/TypeScript"
-                            detected_info["structure"] = "vue_project"
-                            if suggest_name:
-                                detected_info["suggested_name"] = package_data.get("name", "vue-app")
-                            else:
-                                detected_info["suggested_name"] = None
-                        elif "react" in deps:
-                            detected_info["framework"] = "react"
-                            detected_info["language"] = "JavaScript/TypeScript"
-                            detected_info["structure"] = "react_project"
-                            if suggest_name:
-                                detected_info["suggested_name"] = package_data.get("name", "react-app")
-                            else:
-                                detected_info["suggested_name"] = None
-            except (json.JSONDecodeError, FileNotFoundError):
-                pass
-
-        # Python/FastAPI detection
-        elif any(f in file_names for f in ["requirements.txt", "pyproject.toml", "setup.py"]):
-            detected_info["framework"] = "fastapi"
-            detected_info["language"] = "Python"
-            detected_info["structure"] = "python_project"
-
-            # Check if it's specifically FastAPI
-            try:
-                if "requirements.txt" in file_names:
-                    reqs_path = current_dir / "requirements.txt"
-                    with open(reqs_path, "r") as f:
-                        reqs = f.read().lower()
-                        if "fastapi" in reqs:
-                            detected_info["framework"] = "fastapi"
-                        elif "django" in reqs:
-                            detected_info["framework"] = "django"
-                        elif "flask" in reqs:
-                            detected_info["framework"] = "flask"
-            except FileNotFoundError:
-                pass
-
-        # Collect key files for context
-        key_patterns = [
-            "*.csproj",
-            "*.sln",
-            "Program.cs",
-            "Startup.cs",  # .NET
-            "package.json",
-            "vite.config.*",
-            "vue.config.*",
-            "src/main.*",  # Vue/JS
-            "requirements.txt",
-            "pyproject.toml",
-            "main.py",
-            "app.py",  # Python
-            "README.*",
-            "LICENSE",
-            ".gitignore",
-            "Dockerfile",  # Common
-        ]
+            # Immediate files plus the known project directories only (limited scope)
+            file_names = {
+                rel_path.rpartition("/")[2]
+                for rel_path in _iter_project_files(
+                    directory, top_level=_DETECTION_DIRS, skip_dirs=_DETECTION_SKIP_DIRS
+                )
+            }
 
-        for pattern in key_patterns:
-            matches = list(current_dir.glob(pattern))
-            if isinstance(detected_info["key_files"], list):
-                detected_info["key_files"].extend([str(f.relative_to(current_dir)) for f in matches])
+        names = frozenset(file_names)
+        extensions = frozenset(os.path.splitext(name)[1] for name in names)
+        for detector in _CODEBASE_DETECTORS:
+            detected = detector(directory, names, extensions)
+            if detected is not None:
+                detected_info.update(detected)
+                break
+
+        # Ensure suggested_name stays None when suggest_name is False
+        if not suggest_name:
+            detected_info["suggested_name"] = None
+
+        if not include_key_files:
+            return detected_info
+
+        # Collect key files for context in one bounded walk
+        detected_info["key_files"] = sorted(
+            rel_path
+            for rel_path in _iter_project_files(directory, _KEY_FILE_TOP_LEVEL, _KEY_FILE_MAX_DEPTH)
+            if _KEY_FILE_RE.fullmatch(rel_path)
+        )
 
     except Exception as e:
         print(f"Error detecting codebase: {e}")
@@ -1225,6 +1419,43 @@ async def detect_existing_codebase(
     return detected_info
 
 
+def _resolve_plan_file(plan_file: str) -> str:
+    """
+    Locate a plan file, stat-ing each fallback location at most once.
+
+    A missing relative path is looked up in the project's (cwd) and then the user's
+    .cursorplans directory, then with a .devplan extension, then as <stem>.devplan in
+    those same directories. The first existing candidate wins; otherwise plan_file is
+    returned unchanged.
+    """
+    plan_path = Path(plan_file)
+    if plan_path.exists():
+        return plan_file
+
+    project_plans = Path.cwd() / ".cursorplans"
+    home_plans = Path.home() / ".cursorplans"
+
+    candidates = []
+    if not plan_path.is_absolute():
+        candidates += [project_plans / plan_path.name, home_plans / plan_path.name]
+    if not plan_file.endswith(".devplan"):
+        candidates.append(Path(f"{plan_file}.devplan"))
+    candidates += [project_plans / f"{plan_path.stem}.devplan", home_plans / f"{plan_path.stem}.devplan"]
+
+    for candidate in dict.fromkeys(candidates):
+        if candidate.exists():
+            return str(candidate)
+    return plan_file
+
+
+def _get_validation_engine() -> ValidationEngine:
+    """Return the shared ValidationEngine; its validators keep no per-plan state."""
+    global _validation_engine
+    if _validation_engine is None:
+        _validation_engine = ValidationEngine()
+    return _validation_engine
+
+
 async def validate_dev_plan(arguments: dict[str, Any]) -> list[types.ContentBlock]:
     """Validate development plan syntax, logic, and compliance."""
     plan_file = arguments.get("plan_file", "./project.devplan")
@@ -1238,8 +1469,7 @@ async def validate_dev_plan(arguments: dict[str, Any]) -> list[types.ContentBloc
             if cursorplans_path.exists():
                 plan_file = str(cursorplans_path)
 
-        # Initialize validation engine
-        validation_engine = ValidationEngine()
+        validation_engine = _get_validation_engine()
 
         # Run validation
         result = await validation_engine.validate_plan_file(
@@ -1251,18 +1481,64 @@ async def validate_dev_plan(arguments: dict[str, Any]) -> list[types.ContentBloc
         # Format results for Cursor chat
         formatted_result = result.format_for_cursor()
 
-        return [types.TextContent(type="text", text=formatted_result)]
+        return _text_result(formatted_result)
 
     except Exception as e:
-        return [
-            types.TextContent(
-                type="text",
-                text=(
-                    f"❌ Validation engine error: {str(e)}\n\n"
-                    "This may indicate a configuration issue with the validation system."
-                ),
-            )
-        ]
+        return _text_result(VALIDATION_ERROR_TEMPLATE.format(error=e))
+
+
+def _format_dry_run(result: ExecutionResult) -> str:
+    """Format a successful dry run for Cursor chat."""
+    parts = [DRY_RUN_HEADER_TEMPLATE.format(phase_count=len(result.executed_phases))]
+    parts.extend(f"  - {phase}\n" for phase in result.executed_phases)
+
+    if result.changes_made:
+        parts.append("\n📝 **Would create/modify:**\n")
+        parts.extend(f"  - {change}\n" for change in result.changes_made)
+    return "".join(parts)
+
+
+def _format_execution_success(result: ExecutionResult) -> str:
+    """Format a completed plan execution for Cursor chat."""
+    parts = [EXECUTION_SUCCESS_HEADER_TEMPLATE.format(phase_count=len(result.executed_phases))]
+    parts.extend(f"  - {phase}\n" for phase in result.executed_phases)
+
+    if result.changes_made:
+        parts.append("\n📝 **Changes made:**\n")
+        parts.extend(f"  - {change}\n" for change in result.changes_made)
+
+    if result.snapshot_id:
+        parts.append(f"\n💾 **Snapshot created:** {result.snapshot_id}\n")
+
+    if result.execution_time:
+        parts.append(f"⏱️ **Execution time:** {result.execution_time:.2f}s\n")
+    return "".join(parts)
+
+
+def _format_execution_failure(result: ExecutionResult) -> str:
+    """Format a failed plan execution, dry run or not, for Cursor chat."""
+    parts = [EXECUTION_FAILURE_HEADER_TEMPLATE.format(error=result.error_message)]
+
+    if result.failed_phase:
+        parts.append(f"📋 **Failed at phase:** {result.failed_phase}\n")
+
+    if result.executed_phases:
+        parts.append(f"✅ **Completed phases:** {', '.join(result.executed_phases)}\n")
+
+    if result.snapshot_id:
+        parts.append(f"🔄 **Rollback attempted to:** {result.snapshot_id}\n")
+    return "".join(parts)
+
+
+@functools.lru_cache(maxsize=_PLAN_EXECUTOR_CACHE_SIZE)
+def _plan_executor_for(project_dir: str) -> PlanExecutor:
+    """Build the PlanExecutor for an absolute project directory, reused across apply calls."""
+    return PlanExecutor(project_dir)
+
+
+def _get_plan_executor(project_dir: str) -> PlanExecutor:
+    """Return the shared PlanExecutor for a project directory."""
+    return _plan_executor_for(os.path.abspath(project_dir))
 
 
 async def apply_dev_plan(arguments: dict[str, Any]) -> list[types.ContentBlock]:
@@ -1272,49 +1548,9 @@ async def apply_dev_plan(arguments: dict[str, Any]) -> list[types.ContentBlock]:
 
     try:
         # Resolve plan file path
-        plan_path = Path(plan_file)
-
-        # If it's a relative path and doesn't exist, try looking in .cursorplans directory
-        if not plan_path.is_absolute() and not plan_path.exists():
-            # Try .cursorplans directory in current working directory (project-specific)
-            cursorplans_path = Path.cwd() / ".cursorplans" / plan_path.name
-            if cursorplans_path.exists():
-                plan_file = str(cursorplans_path)
-            else:
-                # Try .cursorplans directory relative to the plan file (project-specific)
-                cursorplans_path = Path(".cursorplans") / plan_path.name
-                if cursorplans_path.exists():
-                    plan_file = str(cursorplans_path)
-                else:
-                    # Only as last resort, try user's home .cursorplans directory
-                    home_cursorplans = Path.home() / ".cursorplans" / plan_path.name
-                    if home_cursorplans.exists():
-                        plan_file = str(home_cursorplans)
-
-        # If still not found, try with .devplan extension if not already present
-        if not Path(plan_file).exists() and not plan_file.endswith(".devplan"):
-            plan_file_with_ext = f"{plan_file}.devplan"
-            if Path(plan_file_with_ext).exists():
-                plan_file = plan_file_with_ext
-
-        # Final check - if still not found, try .cursorplans directory with .devplan extension
-        if not Path(plan_file).exists():
-            # Try project-specific .cursorplans directory first
-            cursorplans_path = Path.cwd() / ".cursorplans" / f"{plan_path.stem}.devplan"
-            if cursorplans_path.exists():
-                plan_file = str(cursorplans_path)
-            else:
-                # Try relative .cursorplans directory
-                cursorplans_path = Path(".cursorplans") / f"{plan_path.stem}.devplan"
-                if cursorplans_path.exists():
-                    plan_file = str(cursorplans_path)
-                else:
-                    # Only as last resort, try user's home .cursorplans directory
-                    home_cursorplans = Path.home() / ".cursorplans" / f"{plan_path.stem}.devplan"
-                    if home_cursorplans.exists():
-                        plan_file = str(home_cursorplans)
+        plan_file = _resolve_plan_file(plan_file)
 
-                # Initialize execution engine with the project directory
+        # Initialize execution engine with the project directory.
         # Determine the project directory by finding the .cursorplans folder
         # Start from the resolved plan file path and work backwards
         plan_path = Path(plan_file)
@@ -1329,85 +1565,37 @@ async def apply_dev_plan(arguments: dict[str, Any]) -> list[types.ContentBlock]:
             # Fallback: use the directory containing the plan file
             project_dir = plan_path.parent
 
-        executor = PlanExecutor(str(project_dir))
+        executor = _get_plan_executor(str(project_dir))
 
         # Execute the plan
         result = await executor.execute_plan(plan_file, dry_run=dry_run)
 
         # Format results for Cursor chat
-        if result.success:
-            if dry_run:
-                output = "🔍 **Dry Run Results**\n\n"
-                output += f"✅ Would execute {len(result.executed_phases)} phases:\n"
-                for phase in result.executed_phases:
-                    output += f"  - {phase}\n"
-
-                if result.changes_made:
-                    output += "\n📝 **Would create/modify:**\n"
-                    for change in result.changes_made:
-                        output += f"  - {change}\n"
-            else:
-                output = "✅ **Plan Execution Completed**\n\n"
-                output += f"🎯 **Executed {len(result.executed_phases)} phases:**\n"
-                for phase in result.executed_phases:
-                    output += f"  - {phase}\n"
-
-                if result.changes_made:
-                    output += "\n📝 **Changes made:**\n"
-                    for change in result.changes_made:
-                        output += f"  - {change}\n"
-
-                if result.snapshot_id:
-                    output += f"\n💾 **Snapshot created:** {result.snapshot_id}\n"
-
-                if result.execution_time:
-                    output += f"⏱️ **Execution time:** {result.execution_time:.2f}s\n"
+        if not result.success:
+            output = _format_execution_failure(result)
+        elif dry_run:
+            output = _format_dry_run(result)
         else:
-            output = "❌ **Plan Execution Failed**\n\n"
-            output += f"🚫 **Error:** {result.error_message}\n"
-
-            if result.failed_phase:
-                output += f"📋 **Failed at phase:** {result.failed_phase}\n"
-
-            if result.executed_phases:
-                output += f"✅ **Completed phases:** {', '.join(result.executed_phases)}\n"
-
-            if result.snapshot_id:
-                output += f"🔄 **Rollback attempted to:** {result.snapshot_id}\n"
+            output = _format_execution_success(result)
 
-        return [types.TextContent(type="text", text=output)]
+        return _text_result(output)
 
-    except PermissionError as e:
-        return [
-            types.TextContent(
-                type="text",
-                text=f"❌ **Permission Error:** {str(e)}\n\n**Troubleshooting:**\n"
-                f"• Check if you have write permissions in the current directory\n"
-                f"• Try running Cursor with elevated permissions if needed\n"
-                f"• Ensure the target directory is not read-only\n"
-                f"• Check if any files are locked by other processes",
-            )
-        ]
     except OSError as e:
-        return [
-            types.TextContent(
-                type="text",
-                text=f"❌ **OS Error:** {str(e)}\n\n**Troubleshooting:**\n"
-                f"• Check disk space and file system permissions\n"
-                f"• Ensure the target path is valid and accessible\n"
-                f"• Try creating the directory manually first",
-            )
-        ]
+        # PermissionError covers EACCES/EPERM even when raised without an errno
+        error_code = errno.EACCES if isinstance(e, PermissionError) else e.errno
+        error_template = _OS_ERROR_TEMPLATES.get(error_code, OS_ERROR_TEMPLATE)
+        return _text_result(error_template.format(error=e))
     except Exception as e:
-        return [
-            types.TextContent(
-                type="text",
-                text=(
-                    f"❌ **Execution error:** {str(e)}\n\n"
-                    "This may indicate a configuration issue with the execution system."
-                ),
-            )
-        ]
+        return _text_result(EXECUTION_ERROR_TEMPLATE.format(error=e))
+
+
+# Tool name -> handler used by call_tool
+_DISPATCH: Dict[str, Callable[[dict[str, Any]], Awaitable[list[types.ContentBlock]]]] = {
+    "plan_init": init_dev_planning,
+    "plan_prepare": prepare_dev_plan,
+    "plan_validate": validate_dev_plan,
+    "plan_apply": apply_dev_plan,
+}
 
 
 if __name__ == "__main__":
@@ -1,10 +1,14 @@
 """Template engine for command-based project generation."""
 
 import pathlib
+import re
 from typing import Any, Dict, List
 
 from jinja2 import Environment, Template
 
+# Matches simple {{ param }} placeholders in template sources
+_TEMPLATE_PARAM_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
 
 class TemplateEngine:
     """Engine for processing command templates."""
@@ -41,21 +45,19 @@ class TemplateEngine:
         # This is a simplified approach - in practice you'd want more robust parsing
         # Get the template source by rendering with empty context and capturing the original
         # Look for {{ param }} patterns
-        import re
-
         try:
             # Try to get the source from the template's internal structure
             content = str(template)
             # Ensure content is a string (should always be true, but mypy needs this)
             assert isinstance(content, str)
 
-            params = re.findall(r"\{\{\s*(\w+)\s*\}\}", content)
+            params = _TEMPLATE_PARAM_RE.findall(content)
             return list(set(params))
         except Exception:
             # Fallback: return empty list if we can't extract parameters
             return []
 
-    def process_template_type(
+    async def process_template_type(
         self, template_type: str, template_name: str, output_path: str, parameters: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Process a template based on its type."""
@@ -65,7 +67,7 @@ class TemplateEngine:
         elif template_type == "csharp_project":
             return self._process_csharp_project(template_name, output_path, parameters)
         elif template_type == "command_template":
-            return self._process_command_template(template_name, output_path, parameters)
+            return await self._process_command_template(template_name, output_path, parameters)
         elif template_type == "file_template":
             return self._process_file_template(template_name, output_path, parameters)
         else:
@@ -120,7 +122,7 @@ class TemplateEngine:
         except Exception as e:
             return {"success": False, "type": "csharp_project_generation", "error": str(e)}
 
-    def _process_command_template(
+    async def _process_command_template(
         self, template_name: str, output_path: str, parameters: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Process a command-based template."""
@@ -131,7 +133,7 @@ class TemplateEngine:
             command = template_name
             args = parameters.get("args", [])
 
-            result = executor.execute(command, args, cwd=pathlib.Path(output_path).parent)
+            result = await executor.execute(command, args, cwd=pathlib.Path(output_path).parent)
 
             return {
                 "success": result.success,
@@ -17,6 +17,11 @@ from .validators import (
     SyntaxValidator,
 )
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
 
 class ValidationEngine:
     """
@@ -179,7 +184,7 @@ class ValidationEngine:
 
         # Parse YAML
         try:
-            data = yaml.safe_load(content)
+            data = yaml.load(content, Loader=_YamlLoader)
             if data is None:
                 raise ValueError("Plan file is empty or contains only comments")
             if not isinstance(data, dict):
@@ -115,49 +115,39 @@ class ValidationResult:
     def format_for_cursor(self) -> str:
         """Format validation results for Cursor's chat interface."""
         if not self.issues:
-            output = "✅ **Plan validation passed!**\n\n"
-            output += "All validation layers completed successfully:\n"
-            for layer in self.layers_passed:
-                output += f"✅ {layer}\n"
-            return output
+            lines = ["✅ **Plan validation passed!**", "", "All validation layers completed successfully:"]
+            lines.extend(f"✅ {layer}" for layer in self.layers_passed)
+            return "\n".join(lines) + "\n"
 
         # Summary
-        error_count = len(self.errors)
-        warning_count = len(self.warnings)
-        suggestion_count = len(self.suggestions)
+        errors, warnings, suggestions = self.errors, self.warnings, self.suggestions
+        error_count = len(errors)
+        warning_count = len(warnings)
+        suggestion_count = len(suggestions)
 
         if error_count > 0:
-            output = f"❌ **Plan validation failed** ({error_count} errors, {warning_count} warnings)\n\n"
+            summary = f"❌ **Plan validation failed** ({error_count} errors, {warning_count} warnings)"
         elif warning_count > 0:
-            output = (
-                f"⚠️ **Plan validation passed with warnings** "
-                f"({warning_count} warnings, {suggestion_count} suggestions)\n\n"
+            summary = (
+                f"⚠️ **Plan validation passed with warnings** ({warning_count} warnings, {suggestion_count} suggestions)"
             )
         else:
-            output = f"✅ **Plan validation passed** ({suggestion_count} suggestions for improvement)\n\n"
+            summary = f"✅ **Plan validation passed** ({suggestion_count} suggestions for improvement)"
 
         # Validation layers status
-        output += "**Validation Layers:**\n"
-        for layer in self.layers_passed:
-            output += f"✅ {layer}\n"
-        for layer in self.layers_failed:
-            output += f"❌ {layer}\n"
-        output += "\n"
-
-        # Detailed issues
-        if self.errors:
-            output += "**🚫 Errors (must fix):**\n"
-            for error in self.errors:
-                output += error.format_for_display() + "\n"
-
-        if self.warnings:
-            output += "**⚠️ Warnings (best practices):**\n"
-            for warning in self.warnings:
-                output += warning.format_for_display() + "\n"
-
-        if self.suggestions:
-            output += "**💡 Suggestions (improvements):**\n"
-            for suggestion in self.suggestions:
-                output += suggestion.format_for_display() + "\n"
-
-        return output
+        lines = [summary, "", "**Validation Layers:**"]
+        lines.extend(f"✅ {layer}" for layer in self.layers_passed)
+        lines.extend(f"❌ {layer}" for layer in self.layers_failed)
+        lines.append("")
+
+        # Detailed issues; each formatted issue ends with its own newline
+        for heading, issues in (
+            ("**🚫 Errors (must fix):**", errors),
+            ("**⚠️ Warnings (best practices):**", warnings),
+            ("**💡 Suggestions (improvements):**", suggestions),
+        ):
+            if issues:
+                lines.append(heading)
+                lines.extend(issue.format_for_display() for issue in issues)
+
+        return "\n".join(lines) + "\n"
@@ -3,7 +3,10 @@ Context validation for development plans.
 """
 
 import os
-from typing import Any, Dict
+from pathlib import Path
+from typing import Any, Dict, FrozenSet
+
+import anyio
 
 from ..results import ValidationResult
 from .base import BaseValidator
@@ -37,21 +40,23 @@ class ContextValidator(BaseValidator):
         """Check for existence and accessibility of context files."""
         # Check for default context file
         default_context = os.path.join(plan_dir, "context.txt")
-        if os.path.exists(default_context):
-            try:
-                with open(default_context, "r") as f:
-                    content = f.read().strip()
-                    if not content:
-                        result.add_warning(
-                            "Default context file is empty",
-                            "context.txt",
-                            "Add relevant files and folders to provide context for development planning",
-                        )
-            except Exception as e:
-                result.add_error(
-                    f"Cannot read context file: {str(e)}",
+        try:
+            # Emptiness only needs the raw bytes, so skip the open/decode of a text read
+            content = Path(default_context).read_bytes().strip()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            result.add_error(
+                f"Cannot read context file: {str(e)}",
+                "context.txt",
+                "Ensure the context file has proper read permissions",
+            )
+        else:
+            if not content:
+                result.add_warning(
+                    "Default context file is empty",
                     "context.txt",
-                    "Ensure the context file has proper read permissions",
+                    "Add relevant files and folders to provide context for development planning",
                 )
 
         # Check for story-specific context files
@@ -88,37 +93,79 @@ class ContextValidator(BaseValidator):
         except Exception:
             pass
 
-        # Validate paths in each context file
-        for context_name, context_path in context_files_to_check:
-            try:
-                with open(context_path, "r") as f:
-                    lines = f.readlines()
-
-                for line_num, line in enumerate(lines, 1):
-                    line = line.strip()
-
-                    # Skip comments and empty lines
-                    if not line or line.startswith("#"):
-                        continue
-
-                    # Check if path exists (relative to plan directory)
-                    full_path = os.path.join(plan_dir, line)
-                    if not os.path.exists(full_path):
-                        # Also try absolute path
-                        if not os.path.isabs(line) or not os.path.exists(line):
-                            result.add_warning(
-                                f"Context path does not exist: {line}",
-                                f"{context_name}:line {line_num}",
-                                "Remove invalid paths or ensure they exist before planning",
-                            )
-
-            except Exception as e:
-                result.add_error(
-                    f"Cannot validate context file: {str(e)}",
+        # Directory listings shared by every path checked in this call
+        listings: Dict[str, FrozenSet[str]] = {}
+
+        # Check the context files in worker threads so their reads overlap, collecting
+        # each file's issues separately to keep the reported order stable
+        file_results = [ValidationResult() for _ in context_files_to_check]
+        async with anyio.create_task_group() as task_group:
+            for (context_name, context_path), file_result in zip(context_files_to_check, file_results):
+                task_group.start_soon(
+                    anyio.to_thread.run_sync,
+                    self._check_context_file,
+                    plan_dir,
                     context_name,
-                    "Ensure the context file is readable and properly formatted",
+                    context_path,
+                    listings,
+                    file_result,
                 )
 
+        for file_result in file_results:
+            result.issues.extend(file_result.issues)
+
+    def _check_context_file(
+        self,
+        plan_dir: str,
+        context_name: str,
+        context_path: str,
+        listings: Dict[str, FrozenSet[str]],
+        result: ValidationResult,
+    ):
+        """Validate the paths listed in one context file."""
+        try:
+            with open(context_path, "r") as f:
+                lines = f.readlines()
+
+            for line_num, line in enumerate(lines, 1):
+                line = line.strip()
+
+                # Skip comments and empty lines
+                if not line or line.startswith("#"):
+                    continue
+
+                # Check if path exists (relative to plan directory)
+                full_path = os.path.join(plan_dir, line)
+                if not self._path_exists(full_path, listings):
+                    # Also try absolute path
+                    if not os.path.isabs(line) or not os.path.exists(line):
+                        result.add_warning(
+                            f"Context path does not exist: {line}",
+                            f"{context_name}:line {line_num}",
+                            "Remove invalid paths or ensure they exist before planning",
+                        )
+
+        except Exception as e:
+            result.add_error(
+                f"Cannot validate context file: {str(e)}",
+                context_name,
+                "Ensure the context file is readable and properly formatted",
+            )
+
+    def _path_exists(self, path: str, listings: Dict[str, FrozenSet[str]]) -> bool:
+        """Check a path against one cached scandir listing of its parent, stat-ing only on a miss."""
+        parent, name = os.path.split(os.path.normpath(path))
+        if parent not in listings:
+            # Symlinks are left out so they are followed below; a dangling one does not exist
+            try:
+                with os.scandir(parent) as entries:
+                    listings[parent] = frozenset(entry.name for entry in entries if not entry.is_symlink())
+            except OSError:
+                listings[parent] = frozenset()
+
+        # A miss may still exist, e.g. on case-insensitive filesystems
+        return name in listings[parent] or os.path.exists(path)
+
     def _validate_plan_context_usage(
         self,
         plan_data: Dict[str, Any],
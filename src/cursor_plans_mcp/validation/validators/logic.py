@@ -60,25 +60,33 @@ class LogicValidator(BaseValidator):
                         f"Remove '{dep}' or add it as a phase",
                     )
 
-        # Check for circular dependencies using DFS
-        def has_cycle(node: str, visited: Set[str], rec_stack: Set[str]) -> bool:
-            visited.add(node)
-            rec_stack.add(node)
-
-            for neighbor in dependencies.get(node, []):
-                if neighbor not in visited:
-                    if has_cycle(neighbor, visited, rec_stack):
+        # Check for circular dependencies using an iterative DFS, so deep
+        # dependency chains cannot hit the recursion limit
+        def has_cycle(start: str, visited: Set[str]) -> bool:
+            rec_stack = {start}
+            stack = [(start, iter(dependencies.get(start, [])))]
+            visited.add(start)
+
+            while stack:
+                node, neighbors = stack[-1]
+                for neighbor in neighbors:
+                    if neighbor in rec_stack:
                         return True
-                elif neighbor in rec_stack:
-                    return True
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        rec_stack.add(neighbor)
+                        stack.append((neighbor, iter(dependencies.get(neighbor, []))))
+                        break
+                else:
+                    stack.pop()
+                    rec_stack.discard(node)
 
-            rec_stack.remove(node)
             return False
 
         visited: set[str] = set()
         for phase_name in phase_names:
             if phase_name not in visited:
-                if has_cycle(phase_name, visited, set()):
+                if has_cycle(phase_name, visited):
                     result.add_error(
                         f"Circular dependency detected involving phase '{phase_name}'",
                         f"phases section in {plan_file_path}",
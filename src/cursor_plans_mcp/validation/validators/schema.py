@@ -70,8 +70,9 @@ class SchemaValidator(BaseValidator):
         result = ValidationResult()
 
         try:
-            # Attempt to parse with Pydantic
-            DevPlanSchema(**plan_data)
+            # Attempt to parse with Pydantic; the model's validator is built
+            # once at class creation, so this only runs the compiled core
+            DevPlanSchema.model_validate(plan_data)
 
         except ValidationError as e:
             # Convert Pydantic validation errors to our format
@@ -1,9 +1,10 @@
 """Tests for command executor functionality."""
 
+import asyncio
 import shutil
 import tempfile
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -84,18 +85,23 @@ class TestCommandExecutor:
         # Should be a copy, not the same object
         assert commands is not executor.allowed_commands
 
-    @patch("subprocess.run")
-    def test_execute_successful_command(self, mock_run):
+    @staticmethod
+    def _mock_process(returncode=0, stdout=b"", stderr=b""):
+        """Build a mock asyncio subprocess."""
+        process = MagicMock()
+        process.returncode = returncode
+        process.communicate = AsyncMock(return_value=(stdout, stderr))
+        process.wait = AsyncMock(return_value=returncode)
+        return process
+
+    @pytest.mark.asyncio
+    @patch("asyncio.create_subprocess_exec")
+    async def test_execute_successful_command(self, mock_exec):
         """Test successful command execution."""
-        # Mock successful subprocess result
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_result.stdout = "Success output"
-        mock_result.stderr = ""
-        mock_run.return_value = mock_result
+        mock_exec.return_value = self._mock_process(stdout=b"Success output")
 
         executor = CommandExecutor()
-        result = executor.execute("python", ["--version"])
+        result = await executor.execute("python", ["--version"])
 
         assert result.success is True
         assert result.stdout == "Success output"
@@ -103,18 +109,14 @@ class TestCommandExecutor:
         assert result.return_code == 0
         assert result.executed_command == "python --version"
 
-    @patch("subprocess.run")
-    def test_execute_failed_command(self, mock_run):
+    @pytest.mark.asyncio
+    @patch("asyncio.create_subprocess_exec")
+    async def test_execute_failed_command(self, mock_exec):
         """Test failed command execution."""
-        # Mock failed subprocess result
-        mock_result = MagicMock()
-        mock_result.returncode = 1
-        mock_result.stdout = ""
-        mock_result.stderr = "Error message"
-        mock_run.return_value = mock_result
+        mock_exec.return_value = self._mock_process(returncode=1, stderr=b"Error message")
 
         executor = CommandExecutor()
-        result = executor.execute("python", ["nonexistent_script.py"])
+        result = await executor.execute("python", ["nonexistent_script.py"])
 
         assert result.success is False
         assert result.stdout == ""
@@ -122,99 +124,94 @@ class TestCommandExecutor:
         assert result.return_code == 1
         assert result.executed_command == "python nonexistent_script.py"
 
-    def test_execute_disallowed_command(self):
+    @pytest.mark.asyncio
+    async def test_execute_disallowed_command(self):
         """Test that disallowed commands raise ValueError."""
         executor = CommandExecutor()
 
         with pytest.raises(ValueError, match="Command 'rm' is not allowed"):
-            executor.execute("rm", ["-rf", "/"])
+            await executor.execute("rm", ["-rf", "/"])
 
-    @patch("subprocess.run")
-    def test_execute_with_custom_working_directory(self, mock_run):
+    @pytest.mark.asyncio
+    @patch("asyncio.create_subprocess_exec")
+    async def test_execute_with_custom_working_directory(self, mock_exec):
         """Test command execution with custom working directory."""
         temp_dir = Path(tempfile.mkdtemp())
         try:
-            # Mock successful subprocess result
-            mock_result = MagicMock()
-            mock_result.returncode = 0
-            mock_result.stdout = "Success"
-            mock_result.stderr = ""
-            mock_run.return_value = mock_result
+            mock_exec.return_value = self._mock_process(stdout=b"Success")
 
             executor = CommandExecutor()
-            result = executor.execute("python", ["--version"], cwd=temp_dir)
+            result = await executor.execute("python", ["--version"], cwd=temp_dir)
 
-            # Verify subprocess.run was called with correct cwd
-            mock_run.assert_called_once()
-            call_args = mock_run.call_args
-            assert call_args[1]["cwd"] == temp_dir
+            # Verify the subprocess was spawned with correct cwd
+            mock_exec.assert_called_once()
+            call_args = mock_exec.call_args
+            assert call_args[1]["cwd"] == str(temp_dir)
 
             assert result.success is True
         finally:
             shutil.rmtree(temp_dir)
 
-    @patch("subprocess.run")
-    def test_execute_timeout(self, mock_run):
+    @pytest.mark.asyncio
+    @patch("asyncio.create_subprocess_exec")
+    async def test_execute_timeout(self, mock_exec):
         """Test command execution timeout."""
-        # Mock timeout exception
-        mock_run.side_effect = TimeoutError("Command timed out")
+        process = self._mock_process()
+        process.communicate = AsyncMock(side_effect=asyncio.TimeoutError())
+        mock_exec.return_value = process
 
         executor = CommandExecutor()
-        result = executor.execute("python", ["--version"])
+        result = await executor.execute("python", ["--version"])
 
         assert result.success is False
-        assert result.stderr == "Command timed out"
+        assert result.stderr == "Command timed out after 5 minutes"
         assert result.return_code == -1
+        process.kill.assert_called_once()
 
-    @patch("subprocess.run")
-    def test_execute_exception(self, mock_run):
+    @pytest.mark.asyncio
+    @patch("asyncio.create_subprocess_exec")
+    async def test_execute_exception(self, mock_exec):
         """Test command execution with general exception."""
-        # Mock general exception
-        mock_run.side_effect = Exception("Unexpected error")
+        mock_exec.side_effect = Exception("Unexpected error")
 
         executor = CommandExecutor()
-        result = executor.execute("python", ["--version"])
+        result = await executor.execute("python", ["--version"])
 
         assert result.success is False
         assert result.stderr == "Unexpected error"
         assert result.return_code == -1
 
-    @patch("subprocess.run")
-    def test_execute_with_complex_args(self, mock_run):
+    @pytest.mark.asyncio
+    @patch("asyncio.create_subprocess_exec")
+    async def test_execute_with_complex_args(self, mock_exec):
         """Test command execution with complex arguments."""
-        # Mock successful subprocess result
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_result.stdout = "Success"
-        mock_result.stderr = ""
-        mock_run.return_value = mock_result
+        mock_exec.return_value = self._mock_process(stdout=b"Success")
 
         executor = CommandExecutor()
         args = ["new", "console", "-n", "MyApp", "-o", "./output"]
-        result = executor.execute("dotnet", args)
+        result = await executor.execute("dotnet", args)
 
         assert result.success is True
         assert result.executed_command == "dotnet new console -n MyApp -o ./output"
 
-    def test_execute_empty_args(self):
+    @pytest.mark.asyncio
+    async def test_execute_empty_args(self):
         """Test command execution with empty arguments."""
         executor = CommandExecutor()
 
         with pytest.raises(ValueError, match="Command 'rm' is not allowed"):
-            executor.execute("rm", [])
+            await executor.execute("rm", [])
 
-    @patch("subprocess.run")
-    def test_execute_with_unicode_output(self, mock_run):
+    @pytest.mark.asyncio
+    @patch("asyncio.create_subprocess_exec")
+    async def test_execute_with_unicode_output(self, mock_exec):
         """Test command execution with unicode output."""
-        # Mock subprocess result with unicode
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_result.stdout = "Hello 世界"
-        mock_result.stderr = "Error 错误"
-        mock_run.return_value = mock_result
+        mock_exec.return_value = self._mock_process(
+            stdout="Hello 世界".encode("utf-8"), stderr="Error 错误".encode("utf-8")
+        )
 
         executor = CommandExecutor()
-        result = executor.execute("python", ["--version"])
+        result = await executor.execute("python", ["--version"])
 
         assert result.success is True
         assert result.stdout == "Hello 世界"
@@ -231,49 +228,53 @@ class TestCommandExecutorIntegration:
         yield Path(temp_dir)
         shutil.rmtree(temp_dir)
 
-    def test_execute_echo_command(self, temp_workspace):
+    @pytest.mark.asyncio
+    async def test_execute_echo_command(self, temp_workspace):
         """Test executing a simple echo command (if available)."""
         executor = CommandExecutor(working_directory=temp_workspace)
 
         # Try to execute echo if it's available (Unix-like systems)
         try:
-            result = executor.execute("echo", ["Hello World"])
+            result = await executor.execute("echo", ["Hello World"])
             if result.success:
                 assert "Hello World" in result.stdout
         except ValueError:
             # echo might not be in allowed commands, which is fine
             pass
 
-    def test_execute_python_version(self, temp_workspace):
+    @pytest.mark.asyncio
+    async def test_execute_python_version(self, temp_workspace):
         """Test executing python --version."""
         executor = CommandExecutor(working_directory=temp_workspace)
 
-        result = executor.execute("python", ["--version"])
+        result = await executor.execute("python", ["--version"])
 
         # Should succeed and contain version info
         assert result.success is True
         assert "Python" in result.stdout
         assert result.return_code == 0
 
-    def test_execute_python_help(self, temp_workspace):
+    @pytest.mark.asyncio
+    async def test_execute_python_help(self, temp_workspace):
         """Test executing python --help."""
         executor = CommandExecutor(working_directory=temp_workspace)
 
-        result = executor.execute("python", ["--help"])
+        result = await executor.execute("python", ["--help"])
 
         # Should succeed and contain help text
         assert result.success is True
         assert len(result.stdout) > 0
         assert result.return_code == 0
 
-    def test_execute_nonexistent_command(self, temp_workspace):
+    @pytest.mark.asyncio
+    async def test_execute_nonexistent_command(self, temp_workspace):
         """Test executing a command that doesn't exist."""
         executor = CommandExecutor(working_directory=temp_workspace)
 
         # Add a fake command to allowed list
         executor.add_allowed_command("fake_command")
 
-        result = executor.execute("fake_command", [])
+        result = await executor.execute("fake_command", [])
 
         # Should fail because command doesn't exist
         assert result.success is False
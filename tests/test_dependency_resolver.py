@@ -2,9 +2,14 @@
 Tests for the dependency resolver and execution planning.
 """
 
+import copy
+import datetime
+from unittest.mock import patch
+
 import pytest
 
 from cursor_plans_mcp.execution import DependencyResolver, ExecutionPlan, Phase
+from cursor_plans_mcp.schema import DevelopmentPlan
 
 
 class TestDependencyResolver:
@@ -134,51 +139,19 @@ class TestDependencyResolver:
         with pytest.raises(ValueError, match="depends on unknown phase"):
             resolver._validate_dependencies(phases)
 
-    def test_validate_dependencies_circular(self, resolver):
-        """Test dependency validation with circular dependencies."""
-        phases = [
-            Phase(name="phase1", data={}, priority=1, dependencies=["phase2"]),
-            Phase(name="phase2", data={}, priority=2, dependencies=["phase1"]),
-        ]
-
-        with pytest.raises(ValueError, match="Circular dependency"):
-            resolver._validate_dependencies(phases)
-
-    def test_has_cycles_detection(self, resolver):
-        """Test cycle detection in dependency graph."""
-        # Simple cycle: A -> B -> A
-        phases = [
-            Phase(name="A", data={}, priority=1, dependencies=["B"]),
-            Phase(name="B", data={}, priority=2, dependencies=["A"]),
-        ]
-
-        assert resolver._has_cycles(phases) is True
-
-    def test_has_cycles_no_cycles(self, resolver):
-        """Test cycle detection with no cycles."""
-        # Linear: A -> B -> C
-        phases = [
-            Phase(name="A", data={}, priority=1, dependencies=[]),
-            Phase(name="B", data={}, priority=2, dependencies=["A"]),
-            Phase(name="C", data={}, priority=3, dependencies=["B"]),
-        ]
-
-        assert resolver._has_cycles(phases) is False
-
-    @pytest.mark.skip(reason="Complex cycle detection algorithm has known bug")
-    def test_has_cycles_complex_graph(self, resolver):
-        """Test cycle detection in complex dependency graph."""
-        # Complex graph with cycle: A -> B -> C -> B
+    def test_resolve_execution_order_circular(self, resolver):
+        """Test ordering reports the phases caught in a dependency cycle."""
         phases = [
             Phase(name="A", data={}, priority=1, dependencies=[]),
-            Phase(name="B", data={}, priority=2, dependencies=["A"]),
+            Phase(name="B", data={}, priority=2, dependencies=["A", "C"]),
             Phase(name="C", data={}, priority=3, dependencies=["B"]),
             Phase(name="D", data={}, priority=4, dependencies=["C"]),
         ]
-        # Add cycle: C depends on B
-        phases[2].dependencies.append("B")
 
-        assert resolver._has_cycles(phases) is True
+        resolver._validate_dependencies(phases)
+
+        with pytest.raises(ValueError, match="Circular dependency detected among phases: B, C, D"):
+            resolver._resolve_execution_order(phases)
 
     def test_resolve_execution_order_simple(self, resolver, simple_plan_data):
         """Test execution order resolution for simple plan."""
@@ -237,6 +210,18 @@ class TestDependencyResolver:
         b_idx = phase_names.index("B")
         assert c_idx < b_idx
 
+    def test_resolve_execution_order_equal_priority_keeps_declaration_order(self, resolver):
+        """Test phases with equal priority run in the order they were declared."""
+        phases = [
+            Phase(name="zeta", data={}, priority=1, dependencies=[]),
+            Phase(name="alpha", data={}, priority=1, dependencies=[]),
+            Phase(name="mid", data={}, priority=1, dependencies=[]),
+        ]
+
+        ordered_phases = resolver._resolve_execution_order(phases)
+
+        assert [phase.name for phase in ordered_phases] == ["zeta", "alpha", "mid"]
+
     def test_create_execution_plan_success(self, resolver, sample_plan_data):
         """Test successful execution plan creation."""
         execution_plan = resolver.create_execution_plan(sample_plan_data)
@@ -249,6 +234,139 @@ class TestDependencyResolver:
         phase_names = [phase.name for phase in execution_plan.phases]
         assert phase_names[0] == "foundation"  # No dependencies
 
+    def test_create_execution_plan_builds_graph_once(self, resolver, sample_plan_data):
+        """Test validation and ordering share a single dependency graph."""
+        with patch.object(resolver, "_build_graph", wraps=resolver._build_graph) as mock_build:
+            resolver.create_execution_plan(sample_plan_data)
+
+        mock_build.assert_called_once()
+
+    def test_create_execution_plan_cached(self, resolver, sample_plan_data):
+        """Test identical plan data reuses the resolved order."""
+        first = resolver.create_execution_plan(sample_plan_data)
+        same_data = copy.deepcopy(sample_plan_data)
+
+        with patch.object(resolver, "_build_graph", wraps=resolver._build_graph) as mock_build:
+            second = resolver.create_execution_plan(same_data)
+
+        mock_build.assert_not_called()
+        assert [phase.name for phase in second.phases] == [phase.name for phase in first.phases]
+        assert second.plan_data is same_data
+        assert all(phase.data is same_data["phases"][phase.name] for phase in second.phases)
+        assert second.levels[0][0] is second.phases[0]
+
+        # Callers get their own lists
+        second.phases.reverse()
+        assert resolver.create_execution_plan(sample_plan_data).phases[0].name == "foundation"
+
+    def test_create_execution_plan_cache_misses_on_change(self, resolver, sample_plan_data):
+        """Test changed plan data is resolved again."""
+        resolver.create_execution_plan(sample_plan_data)
+        sample_plan_data["phases"]["testing"]["priority"] = 0
+
+        with patch.object(resolver, "_build_graph", wraps=resolver._build_graph) as mock_build:
+            resolver.create_execution_plan(sample_plan_data)
+
+        mock_build.assert_called_once()
+
+    def test_create_execution_plan_cache_respects_declaration_order(self, resolver):
+        """Test plans differing only in phase order are not served from each other's entry."""
+        first = resolver.create_execution_plan({"phases": {"a": {"priority": 1}, "b": {"priority": 1}}})
+        second = resolver.create_execution_plan({"phases": {"b": {"priority": 1}, "a": {"priority": 1}}})
+
+        assert [phase.name for phase in first.phases] == ["a", "b"]
+        assert [phase.name for phase in second.phases] == ["b", "a"]
+
+    def test_create_execution_plan_with_non_string_keys(self, resolver):
+        """Test plans with YAML keys that are not strings, such as dates, are resolved."""
+        plan_data = {
+            "milestones": {datetime.date(2024, 1, 1): "kickoff"},
+            "phases": {"a": {"priority": 1}, 2: {"priority": 2, "dependencies": ["a"]}},
+        }
+
+        for _ in range(2):
+            execution_plan = resolver.create_execution_plan(plan_data)
+            assert [phase.name for phase in execution_plan.phases] == ["a", 2]
+
+        other = resolver.create_execution_plan({"phases": {"a": {"priority": 1}, "2": {"priority": 2}}})
+        assert [phase.name for phase in other.phases] == ["a", "2"]
+
+    def test_plan_cache_key_unhashable_dependencies(self, resolver):
+        """Test phases whose dependencies cannot be hashed are left out of the cache."""
+        phases = [Phase(name="a", data={}, priority=1, dependencies=[{"b": 1}])]
+
+        assert resolver._plan_cache_key(phases) is None
+
+    def test_create_execution_plan_cache_is_bounded(self, resolver):
+        """Test the plan cache evicts the least recently used plan."""
+        for i in range(40):
+            resolver.create_execution_plan({"phases": {f"phase{i}": {"priority": 1}}})
+
+        assert len(resolver._plan_cache) == 32
+
+    def test_create_execution_plan_from_validated_plan(self, resolver):
+        """Test schema-validated plans skip the defensive phase parsing."""
+        plan = DevelopmentPlan.model_validate(
+            {
+                "project": {"name": "test", "version": "1.0.0", "description": "Test"},
+                "target_state": {"architecture": [], "features": []},
+                "resources": {
+                    "files": [{"path": "src/main.py", "type": "file", "template": "basic"}],
+                    "dependencies": [],
+                },
+                "phases": {
+                    "testing": {"priority": 2, "dependencies": ["foundation"], "tasks": ["unit_tests"]},
+                    "foundation": {"priority": 1, "tasks": ["setup_project"]},
+                },
+                "validation": {"pre_apply": []},
+            }
+        )
+
+        with patch.object(resolver, "_parse_phases") as mock_parse:
+            execution_plan = resolver.create_execution_plan(plan)
+
+        mock_parse.assert_not_called()
+        assert [phase.name for phase in execution_plan.phases] == ["foundation", "testing"]
+        assert execution_plan.phases[0].dependencies == []
+        assert execution_plan.plan_data["project"]["name"] == "test"
+        assert [file_spec.path for file_spec in execution_plan.files] == ["src/main.py"]
+
+    def test_build_graph(self, resolver, sample_plan_data):
+        """Test graph construction from parsed phases."""
+        phases = resolver._parse_phases(sample_plan_data)
+        graph = resolver._build_graph(phases)
+
+        assert graph.phase_map["security"].priority == 4
+        assert graph.dependents["foundation"] == ["data_layer"]
+        assert graph.dependents["testing"] == []
+        assert graph.in_degree == {
+            "foundation": 0,
+            "data_layer": 1,
+            "api_layer": 1,
+            "security": 1,
+            "testing": 1,
+        }
+
+    def test_create_execution_plan_levels(self, resolver):
+        """Test independent phases are grouped into the same level."""
+        plan_data = {
+            "phases": {
+                "foundation": {"priority": 1},
+                "frontend": {"priority": 3, "dependencies": ["foundation"]},
+                "backend": {"priority": 2, "dependencies": ["foundation"]},
+                "docs": {"priority": 5},
+                "integration": {"priority": 4, "dependencies": ["frontend", "backend"]},
+            }
+        }
+
+        execution_plan = resolver.create_execution_plan(plan_data)
+
+        assert [[phase.name for phase in level] for level in execution_plan.levels] == [
+            ["foundation", "docs"],
+            ["backend", "frontend"],
+            ["integration"],
+        ]
+
     def test_create_execution_plan_with_circular_dependencies(self, resolver):
         """Test execution plan creation with circular dependencies."""
         plan_data = {
@@ -278,6 +396,16 @@ class TestDependencyResolver:
         assert "data_layer" in graph["foundation"]
         assert "api_layer" in graph["data_layer"]
 
+    def test_get_execution_graph_items(self, resolver, sample_plan_data):
+        """Test execution graph edges match the graph mapping."""
+        phases = resolver._parse_phases(sample_plan_data)
+        graph = resolver.get_execution_graph(phases)
+
+        edges = list(resolver.get_execution_graph_items(phases))
+
+        assert ("foundation", "data_layer") in edges
+        assert edges == [(phase_name, dependent) for phase_name, names in graph.items() for dependent in names]
+
     def test_get_phase_dependencies(self, resolver, sample_plan_data):
         """Test getting dependencies for a specific phase."""
         phases = resolver._parse_phases(sample_plan_data)
@@ -302,6 +430,31 @@ class TestDependencyResolver:
         dependents = resolver.get_dependent_phases("testing", phases)
         assert len(dependents) == 0
 
+    def test_dependency_queries_use_execution_plan_dependents(self, resolver, sample_plan_data):
+        """Test queries on a resolved plan use the dependents map built with it."""
+        execution_plan = resolver.create_execution_plan(sample_plan_data)
+        cached_plan = resolver.create_execution_plan(sample_plan_data)
+
+        with patch.object(resolver, "_build_graph", wraps=resolver._build_graph) as mock_build:
+            for plan in (execution_plan, cached_plan):
+                assert resolver.get_dependent_phases("foundation", plan) == ["data_layer"]
+                assert resolver.get_phase_dependencies("testing", plan) == ["security"]
+                assert resolver.get_execution_graph(plan) == resolver.get_execution_graph(plan.phases)
+
+        assert mock_build.call_count == 2
+        cached_plan.dependents["foundation"].append("extra")
+        assert resolver.create_execution_plan(sample_plan_data).dependents["foundation"] == ["data_layer"]
+
+    def test_dependency_queries_see_list_edits(self, resolver, sample_plan_data):
+        """Test queries reflect phases appended to a list that was queried before."""
+        phases = resolver._parse_phases(sample_plan_data)
+        assert resolver.get_dependent_phases("testing", phases) == []
+
+        phases.append(Phase(name="release", data={}, priority=9, dependencies=["testing"]))
+
+        assert resolver.get_dependent_phases("testing", phases) == ["release"]
+        assert resolver.get_phase_dependencies("release", phases) == ["testing"]
+
 
 class TestPhase:
     """Test the Phase dataclass."""
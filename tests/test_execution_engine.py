@@ -13,9 +13,11 @@ from cursor_plans_mcp.execution import (
     ExecutionPlan,
     ExecutionResult,
     ExecutionStatus,
+    FileSpec,
     Phase,
     PlanExecutor,
 )
+from cursor_plans_mcp.execution.engine import _create_new_file
 
 
 class TestPlanExecutor:
@@ -104,6 +106,33 @@ class TestPlanExecutor:
         with pytest.raises(ValueError, match="Missing required section"):
             await executor._load_plan(str(plan_file))
 
+    @pytest.mark.asyncio
+    async def test_load_plan_cached(self, executor, sample_plan_file):
+        """Test unchanged plans are not re-parsed and are shared read-only."""
+        first = await executor._load_plan(sample_plan_file)
+
+        with patch("yaml.load") as mock_load:
+            second = await executor._load_plan(sample_plan_file)
+
+        mock_load.assert_not_called()
+        assert second is first
+        with pytest.raises(TypeError):
+            second["project"] = {"name": "mutated"}
+
+    @pytest.mark.asyncio
+    async def test_load_plan_cache_invalidated_on_change(self, executor, sample_plan_file):
+        """Test edited plans are re-parsed."""
+        import yaml
+
+        await executor._load_plan(sample_plan_file)
+
+        plan_data = yaml.safe_load(Path(sample_plan_file).read_text())
+        plan_data["project"]["name"] = "renamed-project"
+        Path(sample_plan_file).write_text(yaml.dump(plan_data))
+
+        reloaded = await executor._load_plan(sample_plan_file)
+        assert reloaded["project"]["name"] == "renamed-project"
+
     @pytest.mark.asyncio
     async def test_dry_run_execution(self, executor, sample_plan_file):
         """Test dry run execution."""
@@ -138,6 +167,36 @@ class TestPlanExecutor:
             assert "api_layer" in result.executed_phases
             assert "Would create: src/main.py" in result.changes_made
 
+    def test_execution_plan_normalizes_files(self):
+        """Test malformed file resources are dropped when the plan is built."""
+        plan = ExecutionPlan(
+            phases=[],
+            plan_data={"resources": {"files": [{"path": "src/main.py"}, "README.md", {"type": "file"}]}},
+        )
+
+        assert plan.files == [FileSpec(path="src/main.py", type="file", template="basic")]
+
+    @pytest.mark.asyncio
+    async def test_dry_run_skips_snapshot(self, executor, sample_plan_file):
+        """Test dry runs do not snapshot the project."""
+        with patch.object(executor.snapshot_manager, "create_snapshot") as mock_snapshot:
+            result = await executor.execute_plan(sample_plan_file, dry_run=True)
+
+        assert result.success is True
+        mock_snapshot.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_invalid_plan_discards_snapshot(self, executor, temp_project_dir):
+        """Test the pre-execution snapshot is dropped when the plan fails to load."""
+        plan_file = temp_project_dir / "invalid.devplan"
+        plan_file.write_text("project:\n  name: test\n")
+
+        result = await executor.execute_plan(str(plan_file), dry_run=False)
+
+        assert result.success is False
+        assert "Missing required section" in result.error_message
+        assert await executor.list_snapshots() == []
+
     @pytest.mark.asyncio
     async def test_actual_execution_success(self, executor, sample_plan_file):
         """Test successful actual execution."""
@@ -167,6 +226,23 @@ class TestPlanExecutor:
                     assert "Test error" in result.error_message
                     mock_restore.assert_called_once_with("test-snapshot-id")
 
+    @pytest.mark.asyncio
+    async def test_phase_failure_rolls_back_once(self, executor, sample_plan_file):
+        """Test a failed rollback inside the plan is not retried by execute_plan."""
+        with patch.object(executor.snapshot_manager, "create_snapshot") as mock_snapshot:
+            with patch.object(executor.snapshot_manager, "restore_snapshot") as mock_restore:
+                mock_snapshot.return_value = "test-snapshot-id"
+                mock_restore.side_effect = Exception("Restore error")
+
+                with patch.object(executor, "_execute_phase", side_effect=Exception("Phase error")):
+                    result = await executor.execute_plan(sample_plan_file, dry_run=False)
+
+                assert result.success is False
+                assert result.failed_phase == "foundation"
+                assert "Phase error" in result.error_message
+                assert "rollback failed: Restore error" in result.error_message
+                mock_restore.assert_called_once_with("test-snapshot-id")
+
     @pytest.mark.asyncio
     async def test_rollback_to_snapshot(self, executor):
         """Test rollback functionality."""
@@ -220,11 +296,54 @@ class TestPlanExecutor:
         with patch.object(executor, "_execute_task") as mock_task:
             mock_task.return_value = ["Created directory: src"]
 
-            changes = await executor._execute_phase(phase, sample_plan_data)
+            changes = await executor._execute_phase(phase, ExecutionPlan(phases=[phase], plan_data=sample_plan_data))
 
             assert len(changes) > 0
             mock_task.assert_called_once_with("setup_project_structure", sample_plan_data)
 
+    @pytest.mark.asyncio
+    async def test_execute_phase_task_dependencies(self, executor, sample_plan_data):
+        """Test tasks wait for their declared dependencies."""
+        phase = Phase(
+            name="api_layer",
+            data={
+                "tasks": ["create_endpoints", "create_models", "setup_testing"],
+                "task_dependencies": {"create_endpoints": ["create_models"]},
+            },
+            priority=1,
+            dependencies=[],
+        )
+        calls = []
+
+        async def record_task(task, plan_data):
+            calls.append(task)
+            return [f"Executed task: {task}"]
+
+        with patch.object(executor, "_execute_task", side_effect=record_task):
+            changes = await executor._execute_phase(phase, ExecutionPlan(phases=[phase], plan_data={}))
+
+        assert calls == ["create_models", "setup_testing", "create_endpoints"]
+        assert changes == [f"Executed task: {task}" for task in calls]
+
+    @pytest.mark.asyncio
+    async def test_execute_phase_task_dependency_cycle(self, executor):
+        """Test circular task dependencies are rejected."""
+        phase = Phase(
+            name="api_layer",
+            data={
+                "tasks": ["create_models", "create_endpoints"],
+                "task_dependencies": {
+                    "create_models": ["create_endpoints"],
+                    "create_endpoints": ["create_models"],
+                },
+            },
+            priority=1,
+            dependencies=[],
+        )
+
+        with pytest.raises(ValueError, match="Circular task dependency"):
+            await executor._execute_phase(phase, ExecutionPlan(phases=[phase], plan_data={}))
+
     @pytest.mark.asyncio
     async def test_execute_task_mapping(self, executor, sample_plan_data):
         """Test task execution mapping."""
@@ -248,12 +367,8 @@ class TestPlanExecutor:
     async def test_create_files(self, executor):
         """Test file creation from resources."""
         files = [
-            {"path": "src/main.py", "type": "entry_point", "template": "fastapi_main"},
-            {
-                "path": "requirements.txt",
-                "type": "dependencies",
-                "template": "requirements",
-            },
+            FileSpec(path="src/main.py", type="entry_point", template="fastapi_main"),
+            FileSpec(path="requirements.txt", type="dependencies", template="requirements"),
         ]
 
         with patch.object(executor, "_create_file") as mock_create:
@@ -266,10 +381,38 @@ class TestPlanExecutor:
             assert "Created: requirements.txt" in changes
             assert mock_create.call_count == 2
 
+    @pytest.mark.asyncio
+    async def test_create_files_shared_directory(self, executor, temp_project_dir):
+        """Test files sharing a directory create it only once."""
+        files = [
+            FileSpec(path="src/models/user.py", type="model", template="fastapi_model"),
+            FileSpec(path="src/models/item.py", type="model", template="fastapi_model"),
+        ]
+
+        with patch.object(executor, "_create_directories", wraps=executor._create_directories) as mock_dirs:
+            changes = await executor._create_files(files, "foundation")
+
+        mock_dirs.assert_called_once_with({temp_project_dir / "src" / "models"})
+        assert changes == ["Created: src/models/user.py", "Created: src/models/item.py"]
+        assert (temp_project_dir / "src" / "models" / "item.py").exists()
+
+    @pytest.mark.asyncio
+    async def test_create_files_renders_once(self, executor, temp_project_dir):
+        """Test templates are rendered once and reused by later phases."""
+        files = [FileSpec(path="src/main.py", type="entry_point", template="fastapi_main")]
+
+        with patch.object(executor, "_generate_file_content", wraps=executor._generate_file_content) as mock_render:
+            await executor._create_files(files, "foundation")
+            await executor._create_files(files, "api")
+
+        mock_render.assert_called_once_with("src/main.py", "entry_point", "fastapi_main")
+        assert "app = FastAPI" in files[0].content
+        assert (temp_project_dir / "src" / "main.py").read_text() == files[0].content
+
     @pytest.mark.asyncio
     async def test_create_file_success(self, executor, temp_project_dir):
         """Test successful file creation."""
-        result = await executor._create_file("test.py", "python", "basic")
+        result = await executor._create_file("test.py", "# test\n")
 
         assert result is True
         assert (temp_project_dir / "test.py").exists()
@@ -300,6 +443,16 @@ class TestPlanExecutor:
         assert len(changes) == 1
         assert "Created: requirements.txt" in changes[0]
 
+    @pytest.mark.asyncio
+    async def test_install_dependencies_keeps_existing(self, executor, sample_plan_data, temp_project_dir):
+        """Test an existing requirements.txt is left untouched."""
+        (temp_project_dir / "requirements.txt").write_text("flask\n")
+
+        changes = await executor._install_dependencies(sample_plan_data)
+
+        assert changes == []
+        assert (temp_project_dir / "requirements.txt").read_text() == "flask\n"
+
     @pytest.mark.asyncio
     async def test_create_models(self, executor, sample_plan_data):
         """Test model creation."""
@@ -341,6 +494,20 @@ class TestPlanExecutor:
         assert "Created: tests/test_main.py" in changes
         assert "Created: tests/conftest.py" in changes
 
+    @pytest.mark.asyncio
+    async def test_setup_testing_keeps_existing_files(self, executor, sample_plan_data):
+        """Test existing test files are neither overwritten nor reported as created."""
+        conftest = executor.project_dir / "tests" / "conftest.py"
+        conftest.parent.mkdir(parents=True, exist_ok=True)
+        conftest.write_text("# existing")
+
+        with patch("cursor_plans_mcp.execution.engine._create_new_file", wraps=_create_new_file) as mock_create:
+            changes = await executor._setup_testing(sample_plan_data)
+
+        assert changes == ["Created: tests/test_main.py"]
+        assert conftest.read_text() == "# existing"
+        assert mock_create.call_count == 2
+
 
 class TestExecutionResult:
     """Test the ExecutionResult dataclass."""
@@ -369,6 +536,14 @@ class TestExecutionResult:
 
         assert result.changes_made == ["Created: src/main.py"]
 
+    def test_execution_result_has_no_instance_dict(self):
+        """Test ExecutionResult uses slots."""
+        result = ExecutionResult(success=True, status=ExecutionStatus.COMPLETED, executed_phases=[])
+
+        assert not hasattr(result, "__dict__")
+        with pytest.raises(AttributeError):
+            result.unknown_field = "value"
+
     def test_execution_result_failure(self):
         """Test ExecutionResult for failed execution."""
         result = ExecutionResult(
@@ -1,5 +1,6 @@
 """Tests for the dev_plan_init tool functionality."""
 
+import os
 import tempfile
 from pathlib import Path
 
@@ -60,6 +61,25 @@ class TestDevPlanInit:
             assert cursorplans_dir.exists()
             assert cursorplans_dir.is_dir()
 
+    @pytest.mark.asyncio
+    async def test_init_dev_planning_relative_directory_follows_cwd(self):
+        """Test a relative project directory is resolved against the current directory on each call."""
+        with tempfile.TemporaryDirectory() as first_dir, tempfile.TemporaryDirectory() as second_dir:
+            for temp_dir in (first_dir, second_dir):
+                (Path(temp_dir) / "app").mkdir()
+                context_content = {"project": {"directory": "app", "name": "relative", "type": "python"}}
+                (Path(temp_dir) / "relative.context.yaml").write_text(yaml.dump(context_content))
+
+            from cursor_plans_mcp import server
+
+            try:
+                for temp_dir in (first_dir, second_dir):
+                    os.chdir(temp_dir)
+                    await init_dev_planning({"context": "relative.context.yaml", "reset": False})
+                    assert server._project_context["project_directory"] == str((Path(temp_dir) / "app").resolve())
+            finally:
+                os.chdir(Path(__file__).parent)
+
     @pytest.mark.asyncio
     async def test_init_dev_planning_with_reset(self):
         """Test initialization with reset flag."""
@@ -78,12 +98,24 @@ class TestDevPlanInit:
             assert len(result) == 1
             assert "Development Planning Reset Complete" in result[0].text  # type: ignore[attr-defined]
             assert "reset" in result[0].text.lower()  # type: ignore[attr-defined]
+            assert "**Purged Files**: 2 files" in result[0].text  # type: ignore[attr-defined]
 
             # Check that .cursorplans directory still exists but old files are gone
             assert cursorplans_dir.exists()
             assert not (cursorplans_dir / "existing.devplan").exists()
             assert not (cursorplans_dir / "old.yaml").exists()
 
+    @pytest.mark.asyncio
+    async def test_init_dev_planning_reset_without_plans_directory(self):
+        """Test reset works when there is no .cursorplans directory yet."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            context_file = self.create_sample_context_file(temp_dir)
+
+            result = await init_dev_planning({"context": context_file, "reset": True})
+
+            assert "**Purged Files**: 0 files" in result[0].text  # type: ignore[attr-defined]
+            assert (Path(temp_dir) / ".cursorplans").is_dir()
+
     @pytest.mark.asyncio
     async def test_init_dev_planning_missing_context_file(self):
         """Test error handling when context file is missing."""
@@ -152,6 +184,34 @@ class TestDevPlanInit:
             assert "source: src/main.py" in result[0].text  # type: ignore[attr-defined]
             assert "docs: README.md" in result[0].text  # type: ignore[attr-defined]
 
+    @pytest.mark.asyncio
+    async def test_init_dev_planning_context_patterns_match_like_glob(self):
+        """Test context patterns select the files Path.glob would, once per category."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for rel_path in ("docs/top.md", "docs/guide/intro.md", "src/app/main.py", "notes.md", "vendor/lib.md"):
+                (Path(temp_dir) / rel_path).parent.mkdir(parents=True, exist_ok=True)
+                (Path(temp_dir) / rel_path).write_text("content")
+
+            context_content = {
+                "project": {"directory": temp_dir, "name": "glob-project", "type": "python"},
+                "context_files": {"docs": ["docs/*.md", "docs/top.md"], "all_docs": ["**/*.md"], "source": ["src/"]},
+            }
+            context_path = Path(temp_dir) / "glob.context.yaml"
+            context_path.write_text(yaml.dump(context_content))
+
+            await init_dev_planning({"context": str(context_path), "reset": False})
+
+            from cursor_plans_mcp.server import _project_context
+
+            assert sorted(_project_context["context_files"]) == [
+                ("all_docs", "docs/guide/intro.md"),
+                ("all_docs", "docs/top.md"),
+                ("all_docs", "notes.md"),
+                ("all_docs", "vendor/lib.md"),
+                ("docs", "docs/top.md"),
+                ("source", "src/app/main.py"),
+            ]
+
     @pytest.mark.asyncio
     async def test_init_dev_planning_with_objectives_and_architecture(self):
         """Test that objectives and architecture notes are displayed correctly."""
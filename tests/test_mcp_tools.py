@@ -4,6 +4,7 @@ Integration tests for MCP tools.
 
 import os
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 import yaml
@@ -165,6 +166,106 @@ project:
         assert "api_endpoints" in features
         assert "database_models" in features
 
+    @pytest.mark.asyncio
+    async def test_prepare_named_template_validates_once(self, temp_dir):
+        """Test repeated plans from the same named template reuse the validated content."""
+        from cursor_plans_mcp import server
+
+        os.chdir(temp_dir)
+        context_file = temp_dir / "context.yaml"
+        context_file.write_text("project:\n  name: cached-project\n  type: python\n")
+        await init_dev_planning({"context": str(context_file), "project_directory": str(temp_dir)})
+
+        server._render_plan_template.cache_clear()
+        with patch.object(server, "validate_plan_content", wraps=server.validate_plan_content) as mock_validate:
+            for _ in range(2):
+                result = await prepare_dev_plan({"name": "cached-project", "template": "fastapi"})
+                assert "Development Plan Created" in result[0].text
+
+        mock_validate.assert_called_once()
+        assert "FastAPI" in (temp_dir / ".cursorplans" / "cached-project.devplan").read_text()
+
+    @pytest.mark.asyncio
+    async def test_prepare_template_with_non_string_context_values(self, temp_dir):
+        """Test list values from the context YAML render into named templates as before."""
+        os.chdir(temp_dir)
+        context_file = temp_dir / "context.yaml"
+        context_file.write_text("project:\n  name: listed\n  type: python\n  description: [first, second]\n")
+        await init_dev_planning({"context": str(context_file), "project_directory": str(temp_dir)})
+
+        result = await prepare_dev_plan({"name": "listed", "template": "basic"})
+
+        assert "unhashable" not in result[0].text
+        assert "first" in (temp_dir / ".cursorplans" / "listed.devplan").read_text()
+
+    @pytest.mark.asyncio
+    async def test_prepare_context_aware_plan(self, temp_dir):
+        """Test preparing a plan from the components and languages in the context."""
+        os.chdir(temp_dir)
+
+        context_content = """
+project:
+  name: rich-project
+  type: python
+  description: A project with components
+components:
+  core:
+    - name: engine
+      path: src/engine
+languages:
+  python:
+    templates: ["module.py"]
+rules:
+  code_quality: true
+"""
+        context_file = temp_dir / "context.yaml"
+        context_file.write_text(context_content)
+
+        await init_dev_planning({"context": str(context_file), "project_directory": str(temp_dir)})
+        result = await prepare_dev_plan({"name": "rich-project", "template": "context"})
+
+        assert "Development Plan Created" in result[0].text
+
+        plan_data = yaml.safe_load((temp_dir / ".cursorplans" / "rich-project.devplan").read_text())
+        assert plan_data["target_state"]["features"] == ["engine", "python_support"]
+        assert {"path": "src/engine/__init__.py", "type": "component_init", "template": "stub"} in plan_data[
+            "resources"
+        ]["files"]
+        assert plan_data["phases"]["testing"]["dependencies"] == ["mcp_integration"]
+        assert plan_data["validation"]["pre_apply"] == ["syntax_check", "code_quality_check"]
+
+    @pytest.mark.asyncio
+    async def test_prepare_reuses_parsed_context_until_it_changes(self, temp_dir):
+        """Test the context file parsed by init is reused by prepare until it is edited."""
+        from cursor_plans_mcp import server
+
+        os.chdir(temp_dir)
+        context_file = temp_dir / "context.yaml"
+        context_file.write_text("project:\n  name: cached-context\n  type: python\nlanguages:\n  python: {}\n")
+
+        server._parse_context_config.cache_clear()
+        await init_dev_planning({"context": str(context_file), "project_directory": str(temp_dir)})
+        await prepare_dev_plan({"name": "cached-context", "template": "context"})
+        assert server._parse_context_config.cache_info().misses == 1
+
+        context_file.write_text("project:\n  name: cached-context\n  type: python\nlanguages:\n  rust: {}\n")
+        await prepare_dev_plan({"name": "cached-context", "template": "context"})
+
+        plan_data = yaml.safe_load((temp_dir / ".cursorplans" / "cached-context.devplan").read_text())
+        assert plan_data["target_state"]["features"] == ["rust_support"]
+
+    def test_loaded_context_is_a_private_copy(self, temp_dir):
+        """Test changes to a loaded context config do not leak into later loads."""
+        from cursor_plans_mcp import server
+
+        context_file = temp_dir / "context.yaml"
+        context_file.write_text("project:\n  name: copied\n  objectives: [one]\n")
+
+        first = server._load_context_config(str(context_file))
+        first["project"]["objectives"].append("two")
+
+        assert server._load_context_config(str(context_file))["project"]["objectives"] == ["one"]
+
     @pytest.mark.asyncio
     async def test_prepare_without_init(self, temp_dir):
         """Test preparing a plan without initializing first."""
@@ -260,6 +361,15 @@ class TestPlanValidate:
         assert len(normal_result) == 1
         assert len(strict_result) == 1
 
+    def test_validation_engine_shared(self):
+        """Test validate calls share one ValidationEngine."""
+        from cursor_plans_mcp import server
+
+        with patch("cursor_plans_mcp.server._validation_engine", None):
+            engine = server._get_validation_engine()
+            assert server._get_validation_engine() is engine
+            assert server._validation_engine is engine
+
 
 class TestErrorHandling:
     """Test error handling in MCP tools."""
@@ -338,3 +448,95 @@ class TestExecutionTools:
         assert len(result) == 1
         assert result[0].type == "text"
         assert "error" in result[0].text.lower()
+
+    def test_resolve_plan_file_fallbacks(self, temp_dir):
+        """Test plan names resolve against the project's .cursorplans directory and extension."""
+        from cursor_plans_mcp.server import _resolve_plan_file
+
+        os.chdir(temp_dir)
+        plans_dir = temp_dir / ".cursorplans"
+        plans_dir.mkdir()
+        (plans_dir / "feature.devplan").write_text("")
+        (temp_dir / "local.devplan").write_text("")
+
+        assert _resolve_plan_file("local.devplan") == "local.devplan"
+        assert _resolve_plan_file("local") == "local.devplan"
+        assert _resolve_plan_file("feature.devplan") == str(plans_dir / "feature.devplan")
+        assert _resolve_plan_file("feature") == str(plans_dir / "feature.devplan")
+        assert _resolve_plan_file("missing-plan-xyz") == "missing-plan-xyz"
+
+    @pytest.mark.asyncio
+    async def test_apply_plan_report(self, temp_dir):
+        """Test the execution report lists phases, changes and the snapshot."""
+        from unittest.mock import AsyncMock
+
+        from cursor_plans_mcp.execution import ExecutionResult, ExecutionStatus
+
+        os.chdir(temp_dir)
+        plan_file = temp_dir / "report.devplan"
+        plan_file.write_text("")
+        execution_result = ExecutionResult(
+            success=True,
+            status=ExecutionStatus.COMPLETED,
+            executed_phases=["setup", "core"],
+            snapshot_id="snap-1",
+            execution_time=1.5,
+            changes_made=["Created src/main.py"],
+        )
+
+        with patch("cursor_plans_mcp.server._get_plan_executor") as mock_get_executor:
+            mock_get_executor.return_value.execute_plan = AsyncMock(return_value=execution_result)
+            result = await apply_dev_plan({"plan_file": str(plan_file), "dry_run": False})
+
+        assert result[0].text == (
+            "✅ **Plan Execution Completed**\n\n"
+            "🎯 **Executed 2 phases:**\n"
+            "  - setup\n"
+            "  - core\n"
+            "\n📝 **Changes made:**\n"
+            "  - Created src/main.py\n"
+            "\n💾 **Snapshot created:** snap-1\n"
+            "⏱️ **Execution time:** 1.50s\n"
+        )
+
+    def test_plan_executor_reused_per_project(self, temp_dir):
+        """Test apply calls share one executor per absolute project directory."""
+        from cursor_plans_mcp import server
+
+        server._plan_executor_for.cache_clear()
+        os.chdir(temp_dir)
+        executor = server._get_plan_executor(str(temp_dir))
+        assert server._get_plan_executor(".") is executor
+        assert server._get_plan_executor(str(temp_dir / "sub")) is not executor
+        assert server._plan_executor_for.cache_info().maxsize == server._PLAN_EXECUTOR_CACHE_SIZE
+
+    def test_format_dry_run_and_failure_reports(self):
+        """Test the dry-run and failure report formatters."""
+        from cursor_plans_mcp.execution import ExecutionResult, ExecutionStatus
+        from cursor_plans_mcp.server import _format_dry_run, _format_execution_failure
+
+        dry_run = ExecutionResult(
+            success=True,
+            status=ExecutionStatus.COMPLETED,
+            executed_phases=["setup"],
+            changes_made=["Would create a.py"],
+        )
+        assert _format_dry_run(dry_run) == (
+            "🔍 **Dry Run Results**\n\n✅ Would execute 1 phases:\n  - setup\n"
+            "\n📝 **Would create/modify:**\n  - Would create a.py\n"
+        )
+
+        failure = ExecutionResult(
+            success=False,
+            status=ExecutionStatus.FAILED,
+            executed_phases=["setup"],
+            failed_phase="core",
+            error_message="boom",
+            snapshot_id="snap-2",
+        )
+        assert _format_execution_failure(failure) == (
+            "❌ **Plan Execution Failed**\n\n🚫 **Error:** boom\n"
+            "📋 **Failed at phase:** core\n"
+            "✅ **Completed phases:** setup\n"
+            "🔄 **Rollback attempted to:** snap-2\n"
+        )
@@ -7,6 +7,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from src.cursor_plans_mcp.execution.engine import PlanExecutor
+from src.cursor_plans_mcp.execution.planner import FileSpec
 
 
 class TestPermissionHandling:
@@ -18,9 +19,9 @@ class TestPermissionHandling:
         executor = PlanExecutor(temp_dir)
 
         # Mock the file creation to simulate a permission error
-        with patch("builtins.open", side_effect=PermissionError("Permission denied")):
+        with patch("pathlib.Path.write_text", side_effect=PermissionError("Permission denied")):
             with pytest.raises(PermissionError) as exc_info:
-                await executor._create_file("test.py", "file", "basic")
+                await executor._create_file("test.py", "# test\n")
 
             assert "File creation failed for test.py" in str(exc_info.value)
             assert "Permission denied" in str(exc_info.value)
@@ -31,9 +32,9 @@ class TestPermissionHandling:
         executor = PlanExecutor(temp_dir)
 
         # Mock the file creation to simulate an OS error
-        with patch("builtins.open", side_effect=OSError("No space left on device")):
+        with patch("pathlib.Path.write_text", side_effect=OSError("No space left on device")):
             with pytest.raises(OSError) as exc_info:
-                await executor._create_file("test.py", "file", "basic")
+                await executor._create_file("test.py", "# test\n")
 
             assert "File creation failed for test.py" in str(exc_info.value)
             assert "No space left on device" in str(exc_info.value)
@@ -43,10 +44,12 @@ class TestPermissionHandling:
         """Test that permission errors are properly handled when creating directories."""
         executor = PlanExecutor(temp_dir)
 
+        files = [FileSpec(path="subdir/test.py", type="file", template="basic")]
+
         # Mock the directory creation to simulate a permission error
         with patch("pathlib.Path.mkdir", side_effect=PermissionError("Permission denied")):
             with pytest.raises(PermissionError) as exc_info:
-                await executor._create_file("subdir/test.py", "file", "basic")
+                await executor._create_files(files, "test_phase")
 
             assert "Cannot create directory" in str(exc_info.value)
             assert "Permission denied" in str(exc_info.value)
@@ -56,7 +59,7 @@ class TestPermissionHandling:
         """Test that permission errors in _create_files are properly propagated."""
         executor = PlanExecutor(temp_dir)
 
-        files = [{"path": "test.py", "type": "file", "template": "basic"}]
+        files = [FileSpec(path="test.py", type="file", template="basic")]
 
         # Mock the file creation to simulate a permission error
         with patch.object(executor, "_create_file", side_effect=PermissionError("Permission denied")):
@@ -89,9 +92,9 @@ resources:
         plan_file.write_text(plan_content)
 
         # Mock the PlanExecutor to simulate a permission error
-        with patch("src.cursor_plans_mcp.server.PlanExecutor") as mock_executor_class:
+        with patch("src.cursor_plans_mcp.server._get_plan_executor") as mock_get_executor:
             mock_executor = MagicMock()
-            mock_executor_class.return_value = mock_executor
+            mock_get_executor.return_value = mock_executor
             mock_executor.execute_plan.side_effect = PermissionError("Cannot write to file src/main.py")
 
             result = await apply_dev_plan({"plan_file": str(plan_file), "dry_run": False})
@@ -126,9 +129,9 @@ resources:
         plan_file.write_text(plan_content)
 
         # Mock the PlanExecutor to simulate an OS error
-        with patch("src.cursor_plans_mcp.server.PlanExecutor") as mock_executor_class:
+        with patch("src.cursor_plans_mcp.server._get_plan_executor") as mock_get_executor:
             mock_executor = MagicMock()
-            mock_executor_class.return_value = mock_executor
+            mock_get_executor.return_value = mock_executor
             mock_executor.execute_plan.side_effect = OSError("No space left on device")
 
             result = await apply_dev_plan({"plan_file": str(plan_file), "dry_run": False})
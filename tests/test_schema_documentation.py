@@ -198,6 +198,47 @@ validation:
             assert not is_valid, f"Unknown template '{template}' should be invalid"
             assert "Unknown template" in error, f"Error should mention unknown template: {error}"
 
+    def test_unknown_templates_are_reported_together(self):
+        """Test that every unknown template in a plan is named in one error."""
+        plan_content = """
+schema_version: "1.0"
+project:
+  name: "test-project"
+  version: "1.0.0"
+  description: "Test project"
+target_state:
+  architecture:
+    - language: "python"
+  features:
+    - "api_endpoints"
+resources:
+  files:
+    - path: "src/main.py"
+      type: "entry_point"
+      template: "not_a_template"
+    - path: "src/app.py"
+      type: "entry_point"
+      template: "fastapi_main"
+    - path: "src/other.py"
+      type: "module"
+      template: "also_unknown"
+  dependencies:
+    - "fastapi"
+phases:
+  testing:
+    priority: 5
+    tasks:
+      - "unit_tests"
+validation:
+  pre_apply:
+    - "syntax_check"
+"""
+        is_valid, error, _ = validate_plan_content(plan_content)
+
+        assert not is_valid
+        assert "Unknown template 'not_a_template', 'also_unknown'" in error
+        assert "'custom_not_a_template', 'custom_also_unknown'" in error
+
     def test_template_count_matches_documentation(self):
         """Test that the number of templates matches documentation."""
         # Count from schema validation
@@ -2,10 +2,16 @@
 Tests for the snapshot system and rollback functionality.
 """
 
+import asyncio
 import json
+import os
 import shutil
+import stat
 import tempfile
+import threading
+import time
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
@@ -58,6 +64,12 @@ class TestSnapshotManager:
         assert snapshot_id.startswith("snapshot-")
         assert len(snapshot_id.split("-")) >= 3  # timestamp-date-time-hash
 
+    def test_generate_snapshot_id_unique_within_a_second(self, snapshot_manager):
+        """Test IDs generated back to back by one process do not collide."""
+        ids = {snapshot_manager._generate_snapshot_id() for _ in range(50)}
+
+        assert len(ids) == 50
+
     @pytest.mark.asyncio
     async def test_copy_project_files(self, snapshot_manager, sample_project_files):
         """Test copying project files to snapshot."""
@@ -90,6 +102,56 @@ class TestSnapshotManager:
         # Check that excluded files are not included
         assert ".git/config" not in files
 
+    @pytest.mark.asyncio
+    async def test_get_project_file_list_prunes_excluded(self, snapshot_manager, sample_project_files):
+        """Test excluded directories and files are skipped wherever they appear."""
+        project_dir = snapshot_manager.project_dir
+        (project_dir / "src" / "__pycache__").mkdir()
+        (project_dir / "src" / "__pycache__" / "main.cpython-310.pyc").write_bytes(b"")
+        (project_dir / "src" / "node_modules" / "pkg").mkdir(parents=True)
+        (project_dir / "src" / "stale.pyc").write_bytes(b"")
+        (project_dir / "other").mkdir()
+        (project_dir / "other" / "data.txt").write_text("not walked")
+
+        files = await snapshot_manager._get_project_file_list()
+
+        assert sorted(files) == ["README.md", "other", "src", "src/main.py", "tests", "tests/test_main.py"]
+
+    @pytest.mark.asyncio
+    async def test_get_project_file_list_matches_whole_names(self, snapshot_manager, sample_project_files):
+        """Test names merely containing an excluded name are kept."""
+        project_dir = snapshot_manager.project_dir
+        (project_dir / "src" / "foo.devstate.bak").write_text("kept")
+        (project_dir / "src" / "my.git").mkdir()
+        (project_dir / "src" / "my.git" / "notes.md").write_text("kept")
+
+        files = await snapshot_manager._get_project_file_list()
+
+        assert {"src/foo.devstate.bak", "src/my.git", "src/my.git/notes.md"} <= set(files)
+
+    @pytest.mark.asyncio
+    async def test_create_snapshot_walks_once(self, snapshot_manager, sample_project_files):
+        """Test a snapshot walks the project tree a single time."""
+        with patch.object(snapshot_manager, "_walk_project", wraps=snapshot_manager._walk_project) as mock_walk:
+            await snapshot_manager.create_snapshot("Test snapshot")
+
+        mock_walk.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_create_snapshot_walks_off_the_event_loop(self, snapshot_manager, sample_project_files):
+        """Test the project walk runs in a worker thread so callers can overlap other work."""
+        walk_project = snapshot_manager._walk_project
+        walk_threads = []
+
+        def record_thread():
+            walk_threads.append(threading.get_ident())
+            return walk_project()
+
+        with patch.object(snapshot_manager, "_walk_project", side_effect=record_thread):
+            await snapshot_manager.create_snapshot("Test snapshot")
+
+        assert walk_threads and walk_threads[0] != threading.get_ident()
+
     @pytest.mark.asyncio
     async def test_create_snapshot_success(self, snapshot_manager, sample_project_files):
         """Test successful snapshot creation."""
@@ -132,6 +194,25 @@ class TestSnapshotManager:
 
         assert metadata["description"] == ""
 
+    @pytest.mark.asyncio
+    async def test_cancelled_snapshot_is_removed(self, snapshot_manager, sample_project_files):
+        """Test cancelling a snapshot mid-copy leaves no partial snapshot or stored objects."""
+        snapshot_file = snapshot_manager._snapshot_file
+
+        def slow_snapshot_file(*args):
+            time.sleep(0.1)
+            return snapshot_file(*args)
+
+        with patch.object(snapshot_manager, "_snapshot_file", side_effect=slow_snapshot_file):
+            task = asyncio.create_task(snapshot_manager.create_snapshot("Cancelled"))
+            await asyncio.sleep(0.02)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        assert list(snapshot_manager.snapshots_dir.iterdir()) == []
+        assert not [name for _, _, names in os.walk(snapshot_manager.objects_dir) for name in names]
+
     @pytest.mark.skip(reason="Snapshot restoration feature not fully implemented")
     @pytest.mark.asyncio
     async def test_restore_snapshot_success(self, snapshot_manager, sample_project_files):
@@ -286,53 +367,249 @@ class TestSnapshotManager:
         assert (snapshot_manager.project_dir / "src" / "main.py").read_text() == "print('Hello')"
         assert not (snapshot_manager.project_dir / "new_file.txt").exists()
 
+    @pytest.mark.asyncio
+    async def test_snapshots_share_stored_objects(self, snapshot_manager, sample_project_files):
+        """Test unchanged files are stored once and linked from each snapshot."""
+        with patch.object(snapshot_manager, "_generate_snapshot_id", side_effect=["snapshot-1", "snapshot-2"]):
+            first_id = await snapshot_manager.create_snapshot("First")
+            second_id = await snapshot_manager.create_snapshot("Second")
+
+        first = snapshot_manager.snapshots_dir / first_id / "src" / "main.py"
+        second = snapshot_manager.snapshots_dir / second_id / "src" / "main.py"
+        assert os.path.samefile(first, second)
+
+        manifest = json.loads((snapshot_manager.snapshots_dir / first_id / "manifest.json").read_text())
+        assert set(manifest) == {"README.md", "src/main.py", "tests/test_main.py"}
+        assert snapshot_manager._object_path(manifest["src/main.py"]["hash"]).read_text() == "print('Hello')"
+
+    @pytest.mark.asyncio
+    async def test_copy_project_files_in_parallel(self, snapshot_manager, sample_project_files):
+        """Test many files, including duplicate content, are stored and restored concurrently."""
+        project_dir = snapshot_manager.project_dir
+        for i in range(40):
+            package = project_dir / "src" / f"pkg{i % 5}"
+            package.mkdir(exist_ok=True)
+            (package / f"module{i}.py").write_text(f"VALUE = {i % 3}\n")
+
+        snapshot_id = await snapshot_manager.create_snapshot("Many files")
+        snapshot_dir = snapshot_manager.snapshots_dir / snapshot_id
+        metadata = json.loads((snapshot_dir / "metadata.json").read_text())
+        manifest = json.loads((snapshot_dir / "manifest.json").read_text())
+
+        assert metadata["file_count"] == 43
+        assert len({entry["hash"] for path, entry in manifest.items() if "/pkg" in path}) == 3
+
+        shutil.rmtree(project_dir / "src")
+        await snapshot_manager._restore_project_files(snapshot_dir, metadata["project_files"])
+
+        assert (project_dir / "src" / "pkg4" / "module39.py").read_text() == "VALUE = 0\n"
+
+    @pytest.mark.asyncio
+    async def test_unchanged_files_are_not_rehashed(self, snapshot_manager, sample_project_files):
+        """Test files whose size and mtime are unchanged reuse the cached hash."""
+        project_dir = snapshot_manager.project_dir
+        for path in ("src/main.py", "tests/test_main.py", "README.md"):
+            os.utime(project_dir / path, ns=(1_000_000_000, 1_000_000_000))
+
+        await snapshot_manager.create_snapshot("First")
+        (project_dir / "README.md").write_text("# Changed")
+
+        with patch.object(snapshot_manager, "_store_object", wraps=snapshot_manager._store_object) as mock_store:
+            snapshot_id = await snapshot_manager.create_snapshot("Second")
+
+        mock_store.assert_called_once_with(project_dir / "README.md")
+        snapshot_dir = snapshot_manager.snapshots_dir / snapshot_id
+        assert (snapshot_dir / "src" / "main.py").read_text() == "print('Hello')"
+        assert (snapshot_dir / "README.md").read_text() == "# Changed"
+
+    @pytest.mark.asyncio
+    async def test_recently_modified_files_are_not_cached(self, snapshot_manager, sample_project_files):
+        """Test files modified right before a snapshot are hashed again next time."""
+        await snapshot_manager.create_snapshot("First")
+
+        hash_cache = json.loads(snapshot_manager.hash_cache_file.read_text())
+        assert "src/main.py" not in hash_cache
+
+    @pytest.mark.asyncio
+    async def test_restore_copies_objects_with_mode(self, snapshot_manager, sample_project_files):
+        """Test restored files are independent copies with their recorded permissions."""
+        script = snapshot_manager.project_dir / "src" / "main.py"
+        script.chmod(0o755)
+        snapshot_id = await snapshot_manager.create_snapshot("Test snapshot")
+        snapshot_dir = snapshot_manager.snapshots_dir / snapshot_id
+        metadata = json.loads((snapshot_dir / "metadata.json").read_text())
+
+        script.write_text("Modified")
+        await snapshot_manager._restore_project_files(snapshot_dir, metadata["project_files"])
+
+        assert script.read_text() == "print('Hello')"
+        assert stat.S_IMODE(script.stat().st_mode) == 0o755
+        assert not os.path.samefile(script, snapshot_dir / "src" / "main.py")
+
+    @pytest.mark.asyncio
+    async def test_restore_swaps_in_staged_tree(self, snapshot_manager, sample_project_files):
+        """Test restore keeps uncaptured directories and leaves no staging trees behind."""
+        snapshot_id = await snapshot_manager.create_snapshot("Test snapshot")
+        snapshot_dir = snapshot_manager.snapshots_dir / snapshot_id
+        metadata = json.loads((snapshot_dir / "metadata.json").read_text())
+
+        await snapshot_manager._restore_project_files(snapshot_dir, metadata["project_files"])
+
+        devstate = snapshot_manager.project_dir / ".devstate"
+        assert (snapshot_manager.project_dir / ".git" / "config").read_text() == "git config"
+        assert not [p for p in devstate.iterdir() if p.name.startswith(("restore-", "replaced-"))]
+
+    @pytest.mark.asyncio
+    async def test_failed_restore_leaves_project_untouched(self, snapshot_manager, sample_project_files):
+        """Test a failure while materialising the snapshot does not modify the project."""
+        snapshot_id = await snapshot_manager.create_snapshot("Test snapshot")
+        snapshot_dir = snapshot_manager.snapshots_dir / snapshot_id
+        metadata = json.loads((snapshot_dir / "metadata.json").read_text())
+
+        (snapshot_manager.project_dir / "src" / "main.py").write_text("Modified")
+        with patch.object(snapshot_manager, "_restore_file", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                await snapshot_manager._restore_project_files(snapshot_dir, metadata["project_files"])
+
+        assert (snapshot_manager.project_dir / "src" / "main.py").read_text() == "Modified"
+        assert (snapshot_manager.project_dir / "README.md").exists()
+
+    @pytest.mark.asyncio
+    async def test_failed_swap_removes_replaced_dir(self, snapshot_manager, sample_project_files):
+        """Test a failure while swapping in the restored tree leaves no replaced-* directory."""
+        snapshot_id = await snapshot_manager.create_snapshot("Test snapshot")
+        snapshot_dir = snapshot_manager.snapshots_dir / snapshot_id
+        metadata = json.loads((snapshot_dir / "metadata.json").read_text())
+        replace = os.replace
+        calls = []
+
+        def failing_replace(src, dst):
+            calls.append(src)
+            if len(calls) == 2:
+                raise OSError("device busy")
+            return replace(src, dst)
+
+        with patch("cursor_plans_mcp.execution.snapshot.os.replace", side_effect=failing_replace):
+            with pytest.raises(OSError):
+                await snapshot_manager._restore_project_files(snapshot_dir, metadata["project_files"])
+
+        devstate = snapshot_manager.project_dir / ".devstate"
+        assert not [p for p in devstate.iterdir() if p.name.startswith(("restore-", "replaced-"))]
+        assert (snapshot_manager.project_dir / "src" / "main.py").read_text() == "print('Hello')"
+
+    @pytest.mark.asyncio
+    async def test_delete_snapshot_sweeps_unreferenced_objects(self, snapshot_manager, sample_project_files):
+        """Test deleting a snapshot removes only objects no other snapshot uses."""
+        with patch.object(snapshot_manager, "_generate_snapshot_id", side_effect=["snapshot-1", "snapshot-2"]):
+            first_id = await snapshot_manager.create_snapshot("First")
+            (snapshot_manager.project_dir / "src" / "main.py").write_text("print('Changed')")
+            second_id = await snapshot_manager.create_snapshot("Second")
+
+        first_manifest = json.loads((snapshot_manager.snapshots_dir / first_id / "manifest.json").read_text())
+        old_object = snapshot_manager._object_path(first_manifest["src/main.py"]["hash"])
+        shared_object = snapshot_manager._object_path(first_manifest["README.md"]["hash"])
+
+        assert await snapshot_manager.delete_snapshot(first_id) is True
+
+        assert not old_object.exists()
+        assert shared_object.exists()
+        assert (snapshot_manager.snapshots_dir / second_id / "README.md").exists()
+
+    @pytest.mark.asyncio
+    async def test_delete_snapshot_keeps_objects_copied_without_links(self, snapshot_manager, sample_project_files):
+        """Test objects referenced by a manifest survive a sweep when hard links are unsupported."""
+        with patch("cursor_plans_mcp.execution.snapshot.os.link", side_effect=OSError("not supported")):
+            first_id = await snapshot_manager.create_snapshot("First")
+            second_id = await snapshot_manager.create_snapshot("Second")
+
+        assert await snapshot_manager.delete_snapshot(first_id) is True
+
+        manifest = json.loads((snapshot_manager.snapshots_dir / second_id / "manifest.json").read_text())
+        assert all(snapshot_manager._object_path(entry["hash"]).exists() for entry in manifest.values())
+
+    @pytest.mark.asyncio
+    async def test_restore_falls_back_to_snapshot_tree(self, snapshot_manager, sample_project_files):
+        """Test files are restored from the snapshot tree when their stored object is missing."""
+        snapshot_id = await snapshot_manager.create_snapshot("Test snapshot")
+        snapshot_dir = snapshot_manager.snapshots_dir / snapshot_id
+        metadata = json.loads((snapshot_dir / "metadata.json").read_text())
+
+        shutil.rmtree(snapshot_manager.objects_dir)
+        (snapshot_manager.project_dir / "src" / "main.py").write_text("Modified")
+        await snapshot_manager._restore_project_files(snapshot_dir, metadata["project_files"])
+
+        assert (snapshot_manager.project_dir / "src" / "main.py").read_text() == "print('Hello')"
+
+    def test_store_object_hashes_the_stored_copy(self, snapshot_manager, sample_project_files):
+        """Test a file changed between hashing and copying is stored under the copied content's hash."""
+        source = snapshot_manager.project_dir / "src" / "main.py"
+        hash_file = snapshot_manager._hash_file
+
+        def hash_then_modify(path):
+            digest = hash_file(path)
+            source.write_text("print('Changed')")
+            return digest
+
+        with patch.object(snapshot_manager, "_hash_file", side_effect=hash_then_modify):
+            digest = snapshot_manager._store_object(source)
+
+        assert digest == hash_file(source)
+        assert snapshot_manager._object_path(digest).read_text() == "print('Changed')"
+
     @pytest.mark.asyncio
     async def test_metadata_file_operations(self, snapshot_manager):
-        """Test metadata file operations."""
+        """Test metadata index operations."""
         # Test adding snapshot to index
-        test_metadata = {"description": "Test", "file_count": 5}
+        test_metadata = {"description": "Test", "file_count": 5, "project_files": ["README.md"]}
         await snapshot_manager._add_snapshot_to_index("test-snapshot", test_metadata)
 
-        # Verify it was added
-        with open(snapshot_manager.metadata_file, "r") as f:
-            data = json.load(f)
+        # Verify it was added; the file list stays in the snapshot's own metadata.json
+        data = snapshot_manager._read_index()
 
         assert "test-snapshot" in data
-        assert data["test-snapshot"]["description"] == "Test"
+        assert data["test-snapshot"] == {"description": "Test", "file_count": 5}
 
         # Test updating metadata
-        await snapshot_manager._update_snapshot_metadata("test-snapshot", {"updated": True})
+        await snapshot_manager._update_snapshot_metadata("test-snapshot", {"updated": True, "restored_at": "now"})
 
-        with open(snapshot_manager.metadata_file, "r") as f:
-            data = json.load(f)
+        data = snapshot_manager._read_index()
 
         assert data["test-snapshot"]["updated"] is True
+        assert data["test-snapshot"]["restored_at"] == "now"
+        assert data["test-snapshot"]["description"] == "Test"
 
         # Test removing from index
         await snapshot_manager._remove_snapshot_from_index("test-snapshot")
 
-        with open(snapshot_manager.metadata_file, "r") as f:
-            data = json.load(f)
+        data = snapshot_manager._read_index()
 
         assert "test-snapshot" not in data
 
     def test_ensure_metadata_file(self, temp_project_dir):
-        """Test metadata file creation."""
-        # Remove existing metadata file if it exists
-        metadata_file = temp_project_dir / ".devstate" / "snapshots.json"
-        if metadata_file.exists():
-            metadata_file.unlink()
+        """Test metadata index creation."""
+        # Create manager (should create metadata index)
+        manager = SnapshotManager(temp_project_dir)
+
+        assert manager.metadata_file == temp_project_dir / ".devstate" / "snapshots.db"
+        assert manager.metadata_file.exists()
 
-        # Create manager (should create metadata file)
-        SnapshotManager(temp_project_dir)
+        # Check that the index starts empty
+        assert manager._read_index() == {}
 
-        assert metadata_file.exists()
+    @pytest.mark.asyncio
+    async def test_legacy_json_index_is_migrated(self, temp_project_dir):
+        """Test snapshots from an existing snapshots.json are carried over."""
+        legacy_file = temp_project_dir / ".devstate" / "snapshots.json"
+        legacy_file.parent.mkdir()
+        legacy_file.write_text(
+            json.dumps({"snapshot-old": {"description": "Old", "created_at": "2024-01-01T00:00:00", "file_count": 2}})
+        )
 
-        # Check that it contains empty JSON object
-        with open(metadata_file, "r") as f:
-            data = json.load(f)
+        manager = SnapshotManager(temp_project_dir)
+        snapshots = await manager.list_snapshots()
 
-        assert data == {}
+        assert not legacy_file.exists()
+        assert [(s["id"], s["description"], s["file_count"]) for s in snapshots] == [("snapshot-old", "Old", 2)]
 
 
 class TestStateSnapshot:
@@ -3,7 +3,7 @@
 import shutil
 import tempfile
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -116,11 +116,12 @@ class TestTemplateEngineProcessing:
         yield Path(temp_dir)
         shutil.rmtree(temp_dir)
 
-    def test_process_default_template(self, temp_workspace):
+    @pytest.mark.asyncio
+    async def test_process_default_template(self, temp_workspace):
         """Test processing default template."""
         engine = TemplateEngine()
 
-        result = engine.process_template_type(
+        result = await engine.process_template_type(
             "default_template", "test_template", str(temp_workspace / "test.py"), {"param1": "value1"}
         )
 
@@ -135,7 +136,8 @@ class TestTemplateEngineProcessing:
         assert "test_template" in content
         assert "param1" in content
 
-    def test_process_file_template_success(self, temp_workspace):
+    @pytest.mark.asyncio
+    async def test_process_file_template_success(self, temp_workspace):
         """Test processing file template successfully."""
         engine = TemplateEngine()
 
@@ -143,7 +145,7 @@ class TestTemplateEngineProcessing:
         template_content = "Hello {{ name }}! Age: {{ age }}"
         engine.register_template("greeting", template_content)
 
-        result = engine.process_template_type(
+        result = await engine.process_template_type(
             "file_template", "greeting", str(temp_workspace / "greeting.txt"), {"name": "Alice", "age": 30}
         )
 
@@ -157,17 +159,21 @@ class TestTemplateEngineProcessing:
         content = output_file.read_text()
         assert content == "Hello Alice! Age: 30"
 
-    def test_process_file_template_not_found(self, temp_workspace):
+    @pytest.mark.asyncio
+    async def test_process_file_template_not_found(self, temp_workspace):
         """Test processing file template that doesn't exist."""
         engine = TemplateEngine()
 
-        result = engine.process_template_type("file_template", "nonexistent", str(temp_workspace / "test.txt"), {})
+        result = await engine.process_template_type(
+            "file_template", "nonexistent", str(temp_workspace / "test.txt"), {}
+        )
 
         assert result["success"] is False
         assert "Template 'nonexistent' not found" in result["error"]
 
+    @pytest.mark.asyncio
     @patch("src.cursor_plans_mcp.execution.command_executor.CommandExecutor")
-    def test_process_command_template_success(self, mock_executor_class, temp_workspace):
+    async def test_process_command_template_success(self, mock_executor_class, temp_workspace):
         """Test processing command template successfully."""
         # Mock command executor
         mock_executor = MagicMock()
@@ -175,12 +181,12 @@ class TestTemplateEngineProcessing:
         mock_result.success = True
         mock_result.stdout = "Command executed successfully"
         mock_result.stderr = ""
-        mock_executor.execute.return_value = mock_result
+        mock_executor.execute = AsyncMock(return_value=mock_result)
         mock_executor_class.return_value = mock_executor
 
         engine = TemplateEngine()
 
-        result = engine.process_template_type(
+        result = await engine.process_template_type(
             "command_template", "python", str(temp_workspace / "output"), {"args": ["--version"]}
         )
 
@@ -191,8 +197,9 @@ class TestTemplateEngineProcessing:
         # Verify command executor was called
         mock_executor.execute.assert_called_once_with("python", ["--version"], cwd=temp_workspace)
 
+    @pytest.mark.asyncio
     @patch("src.cursor_plans_mcp.execution.command_executor.CommandExecutor")
-    def test_process_command_template_failure(self, mock_executor_class, temp_workspace):
+    async def test_process_command_template_failure(self, mock_executor_class, temp_workspace):
         """Test processing command template with failure."""
         # Mock command executor failure
         mock_executor = MagicMock()
@@ -200,12 +207,12 @@ class TestTemplateEngineProcessing:
         mock_result.success = False
         mock_result.stdout = ""
         mock_result.stderr = "Command failed"
-        mock_executor.execute.return_value = mock_result
+        mock_executor.execute = AsyncMock(return_value=mock_result)
         mock_executor_class.return_value = mock_executor
 
         engine = TemplateEngine()
 
-        result = engine.process_template_type(
+        result = await engine.process_template_type(
             "command_template", "python", str(temp_workspace / "output"), {"args": ["--invalid"]}
         )
 
@@ -213,8 +220,9 @@ class TestTemplateEngineProcessing:
         assert result["type"] == "command_execution"
         assert "Command failed" in result["error"]
 
+    @pytest.mark.asyncio
     @patch("src.cursor_plans_mcp.templates.languages.csharp.generators.CSharpProjectGenerator")
-    def test_process_csharp_console_success(self, mock_generator_class, temp_workspace):
+    async def test_process_csharp_console_success(self, mock_generator_class, temp_workspace):
         """Test processing C# console template successfully."""
         # Mock C# generator
         mock_generator = MagicMock()
@@ -229,7 +237,7 @@ class TestTemplateEngineProcessing:
 
         engine = TemplateEngine()
 
-        result = engine.process_template_type(
+        result = await engine.process_template_type(
             "csharp_console",
             "console",
             str(temp_workspace / "TestConsole"),
@@ -249,8 +257,9 @@ class TestTemplateEngineProcessing:
             framework="net8.0",
         )
 
+    @pytest.mark.asyncio
     @patch("src.cursor_plans_mcp.templates.languages.csharp.generators.CSharpProjectGenerator")
-    def test_process_csharp_project_success(self, mock_generator_class, temp_workspace):
+    async def test_process_csharp_project_success(self, mock_generator_class, temp_workspace):
         """Test processing C# project template successfully."""
         # Mock C# generator
         mock_generator = MagicMock()
@@ -265,7 +274,7 @@ class TestTemplateEngineProcessing:
 
         engine = TemplateEngine()
 
-        result = engine.process_template_type(
+        result = await engine.process_template_type(
             "csharp_project",
             "webapi",
             str(temp_workspace / "TestWebApi"),
@@ -277,7 +286,8 @@ class TestTemplateEngineProcessing:
         assert result["project_type"] == "webapi"
         assert result["project_name"] == "TestWebApi"
 
-    def test_process_csharp_console_import_error(self, temp_workspace):
+    @pytest.mark.asyncio
+    async def test_process_csharp_console_import_error(self, temp_workspace):
         """Test processing C# console template with import error."""
         engine = TemplateEngine()
 
@@ -285,7 +295,7 @@ class TestTemplateEngineProcessing:
         with patch(
             "src.cursor_plans_mcp.templates.languages.csharp.generators.CSharpProjectGenerator", side_effect=ImportError
         ):
-            result = engine.process_template_type(
+            result = await engine.process_template_type(
                 "csharp_console", "console", str(temp_workspace / "TestConsole"), {"project_name": "TestConsole"}
             )
 
@@ -293,23 +303,25 @@ class TestTemplateEngineProcessing:
         assert result["type"] == "csharp_console_generation"
         assert "C# generators not available" in result["error"]
 
-    def test_process_unknown_template_type(self, temp_workspace):
+    @pytest.mark.asyncio
+    async def test_process_unknown_template_type(self, temp_workspace):
         """Test processing unknown template type."""
         engine = TemplateEngine()
 
-        result = engine.process_template_type("unknown_type", "test", str(temp_workspace / "test.txt"), {})
+        result = await engine.process_template_type("unknown_type", "test", str(temp_workspace / "test.txt"), {})
 
         assert result["success"] is True
         assert result["type"] == "default_template"
 
-    def test_process_template_with_directory_creation(self, temp_workspace):
+    @pytest.mark.asyncio
+    async def test_process_template_with_directory_creation(self, temp_workspace):
         """Test that template processing creates directories as needed."""
         engine = TemplateEngine()
 
         # Try to create a file in a nested directory
         nested_path = temp_workspace / "nested" / "deep" / "test.py"
 
-        result = engine.process_template_type("default_template", "test_template", str(nested_path), {})
+        result = await engine.process_template_type("default_template", "test_template", str(nested_path), {})
 
         assert result["success"] is True
         assert nested_path.exists()
@@ -327,7 +339,8 @@ class TestTemplateEngineIntegration:
         yield Path(temp_dir)
         shutil.rmtree(temp_dir)
 
-    def test_full_template_workflow(self, temp_workspace):
+    @pytest.mark.asyncio
+    async def test_full_template_workflow(self, temp_workspace):
         """Test complete template workflow."""
         engine = TemplateEngine()
 
@@ -348,7 +361,7 @@ if __name__ == "__main__":
         # Process the template
         parameters = {"project_name": "MyApp", "framework": "Python 3.9", "author": "Alice"}
 
-        result = engine.process_template_type(
+        result = await engine.process_template_type(
             "file_template", "python_app", str(temp_workspace / "main.py"), parameters
         )
 
@@ -364,7 +377,8 @@ if __name__ == "__main__":
         assert "Alice" in content
         assert "def main():" in content
 
-    def test_template_with_complex_parameters(self, temp_workspace):
+    @pytest.mark.asyncio
+    async def test_template_with_complex_parameters(self, temp_workspace):
         """Test template with complex parameter types."""
         engine = TemplateEngine()
 
@@ -387,7 +401,7 @@ class {{ project.name }}:
             "config": {"environment": "production"},
         }
 
-        result = engine.process_template_type(
+        result = await engine.process_template_type(
             "file_template", "complex_app", str(temp_workspace / "app.py"), parameters
         )
 
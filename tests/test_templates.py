@@ -248,6 +248,62 @@ class TestExistingCodebaseDetection:
 
         assert detected["framework"] == "vuejs"
         assert detected["language"] == "JavaScript/TypeScript"
+        assert sorted(detected["key_files"]) == ["package.json", "src/main.js"]
+
+    @pytest.mark.asyncio
+    async def test_detect_ignores_skipped_directories(self, temp_dir):
+        """Test files under node_modules or .git do not drive detection."""
+        for rel_path in ("src/node_modules/lib/package.json", "src/.git/App.csproj", "src/app/main.py"):
+            (temp_dir / rel_path).parent.mkdir(parents=True, exist_ok=True)
+            (temp_dir / rel_path).write_text("{}")
+
+        detected = await detect_existing_codebase(str(temp_dir))
+        assert detected["framework"] is None
+
+        (temp_dir / "src" / "app" / "setup.py").write_text("")
+        detected = await detect_existing_codebase(str(temp_dir), context_files=["src"])
+        assert detected["language"] == "Python"
+
+    @pytest.mark.asyncio
+    async def test_detect_without_key_files(self, temp_dir):
+        """Test framework-only detection skips key file collection."""
+        (temp_dir / "package.json").write_text('{"name": "web", "devDependencies": {"react": "^18.0.0"}}')
+        (temp_dir / "requirements.txt").write_text("flask\n")
+
+        detected = await detect_existing_codebase(str(temp_dir), include_key_files=False)
+
+        assert detected["framework"] == "react"
+        assert detected["suggested_name"] == "web"
+        assert detected["key_files"] == []
+
+    @pytest.mark.asyncio
+    async def test_detect_reuses_parsed_package_json_until_it_changes(self, temp_dir):
+        """Test package.json is parsed once per version of the file."""
+        from cursor_plans_mcp import server
+
+        package_file = temp_dir / "package.json"
+        package_file.write_text('{"name": "web", "dependencies": {"vue": "^3.0.0"}}')
+
+        server._load_package_info.cache_clear()
+        for _ in range(2):
+            detected = await detect_existing_codebase(str(temp_dir), include_key_files=False)
+            assert detected["framework"] == "vuejs"
+        assert server._load_package_info.cache_info().misses == 1
+
+        package_file.write_text('{"name": "web", "dependencies": {"react": "^18.0.0", "react-dom": "^18.0.0"}}')
+        detected = await detect_existing_codebase(str(temp_dir), include_key_files=False)
+        assert detected["framework"] == "react"
+
+    @pytest.mark.asyncio
+    async def test_detect_key_files_match_like_glob(self, temp_dir):
+        """Test key file patterns only match at the depth their glob allows."""
+        for rel_path in ("README.md", "Api.sln", "src/main.ts", "src/app/main.ts", "docs/README.md", "src/Program.cs"):
+            (temp_dir / rel_path).parent.mkdir(parents=True, exist_ok=True)
+            (temp_dir / rel_path).write_text("")
+
+        detected = await detect_existing_codebase(str(temp_dir))
+
+        assert detected["key_files"] == ["Api.sln", "README.md", "src/main.ts"]
 
     @pytest.mark.asyncio
     async def test_detect_unknown_project(self, temp_dir):
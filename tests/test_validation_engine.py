@@ -238,6 +238,88 @@ class TestLogicValidator:
         assert len(result.errors) >= 1
         assert any("Circular dependency" in error.message for error in result.errors)
 
+    @pytest.mark.asyncio
+    async def test_deep_dependency_chain(self):
+        """Test long dependency chains are checked without recursion."""
+        import sys
+
+        from cursor_plans_mcp.validation.validators.logic import LogicValidator
+
+        depth = sys.getrecursionlimit() + 100
+        phases = {f"phase_{i}": {"priority": i, "dependencies": [f"phase_{i - 1}"] if i else []} for i in range(depth)}
+
+        validator = LogicValidator()
+        result = await validator.validate({"phases": phases}, "test.devplan")
+        assert not any("Circular dependency" in error.message for error in result.errors)
+
+        phases["phase_0"]["dependencies"] = [f"phase_{depth - 1}"]
+        result = await validator.validate({"phases": phases}, "test.devplan")
+        assert any("Circular dependency" in error.message for error in result.errors)
+
+
+class TestContextValidator:
+    """Test the ContextValidator."""
+
+    @pytest.mark.asyncio
+    async def test_missing_context_paths(self, temp_dir):
+        """Test only paths missing from the project are reported."""
+        from cursor_plans_mcp.validation.validators.context import ContextValidator
+
+        (temp_dir / "src").mkdir()
+        (temp_dir / "src" / "main.py").write_text("")
+        (temp_dir / "context.txt").write_text("# context\nsrc/main.py\nsrc/\nsrc/missing.py\n\nREADME.md\n")
+
+        validator = ContextValidator()
+        result = await validator.validate({"resources": {"files": []}}, str(temp_dir / "plan.devplan"))
+
+        missing = [w.message for w in result.warnings if "Context path does not exist" in w.message]
+        assert missing == ["Context path does not exist: src/missing.py", "Context path does not exist: README.md"]
+
+    @pytest.mark.asyncio
+    async def test_dangling_symlink_context_path(self, temp_dir):
+        """Test a context path that is a broken symlink is reported as missing."""
+        from cursor_plans_mcp.validation.validators.context import ContextValidator
+
+        (temp_dir / "target.py").write_text("")
+        (temp_dir / "linked.py").symlink_to(temp_dir / "target.py")
+        (temp_dir / "dangling.py").symlink_to(temp_dir / "gone.py")
+        (temp_dir / "context.txt").write_text("linked.py\ndangling.py\n")
+
+        validator = ContextValidator()
+        result = await validator.validate({}, str(temp_dir / "plan.devplan"))
+
+        missing = [w.message for w in result.warnings if "Context path does not exist" in w.message]
+        assert missing == ["Context path does not exist: dangling.py"]
+
+    @pytest.mark.asyncio
+    async def test_story_context_files_report_in_order(self, temp_dir):
+        """Test issues from several context files keep the order the files are checked in."""
+        from cursor_plans_mcp.validation.validators.context import ContextValidator
+
+        (temp_dir / "context.txt").write_text("gone-default.py\n")
+        (temp_dir / "context-story.txt").write_text("gone-story.py\n")
+
+        validator = ContextValidator()
+        result = await validator.validate({}, str(temp_dir / "plan.devplan"))
+
+        locations = [w.location for w in result.warnings if "Context path does not exist" in w.message]
+        assert locations == ["context.txt:line 1", "context-story.txt:line 1"]
+
+    @pytest.mark.asyncio
+    async def test_empty_context_file(self, temp_dir):
+        """Test a whitespace-only context.txt is reported as empty."""
+        from cursor_plans_mcp.validation.validators.context import ContextValidator
+
+        validator = ContextValidator()
+        plan_file = str(temp_dir / "plan.devplan")
+
+        result = await validator.validate({}, plan_file)
+        assert not any("empty" in w.message for w in result.warnings)
+
+        (temp_dir / "context.txt").write_text("\n  \n")
+        result = await validator.validate({}, plan_file)
+        assert any(w.message == "Default context file is empty" for w in result.warnings)
+
 
 class TestCursorRulesValidator:
     """Test the CursorRulesValidator."""